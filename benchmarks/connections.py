@@ -0,0 +1,77 @@
+"""Measure the time and memory needed to configure many aliases, and to use a few of them.
+
+Configuring the registries only stores the configuration of each alias, and
+clients are created the first time they are retrieved. This is compared to
+creating both clients of every alias upfront from a deep copy of the
+configuration, as the previous implementation of `configure()` did.
+
+Usage: python -m benchmarks.connections [-a ALIASES] [-u USED]
+"""
+
+import argparse
+import copy
+import time
+import tracemalloc
+
+from eternaltwin.clients.asyncio.clients import Eternaltwin as AsyncEternaltwin
+from eternaltwin.clients.sync.clients import Eternaltwin
+from eternaltwin.connections import Connections
+from eternaltwin.keys import HS256Key
+
+
+def eager(config: dict, used: int) -> None:
+    """Create every client upfront, then retrieve the `used` first aliases."""
+    connections, async_connections = Connections(Eternaltwin), Connections(AsyncEternaltwin)
+    for alias, kwargs in copy.deepcopy(config).items():
+        connections.create_connection(alias, **kwargs)
+    for alias, kwargs in config.items():
+        async_connections.create_connection(alias, **kwargs)
+    for alias in list(config)[:used]:
+        connections.get_connection(alias)
+
+
+def lazy(config: dict, used: int) -> None:
+    """Configure the registries, then retrieve the `used` first aliases."""
+    connections, async_connections = Connections(Eternaltwin), Connections(AsyncEternaltwin)
+    connections.configure(**config)
+    async_connections.configure(**config)
+    for alias in list(config)[:used]:
+        connections.get_connection(alias)
+
+
+def measure(fn, config: dict, used: int) -> tuple[float, float]:
+    """Return the time in milliseconds and the peak memory in MiB taken by `fn`."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn(config, used)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed * 1000, peak / 2**20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-a", "--aliases", type=int, default=500, help="Number of configured aliases.")
+    parser.add_argument("-u", "--used", type=int, default=5, help="Number of aliases actually used.")
+    args = parser.parse_args()
+
+    key = HS256Key("a" * 64)
+    config = {
+        f"tenant{i}": {
+            "url": f"https://tenant{i}.example.com/",
+            "client_id": f"client{i}",
+            "client_secret": "secret",
+            "redirect_uri": f"https://tenant{i}.example.com/callback",
+            "state_key": key,
+        }
+        for i in range(args.aliases)
+    }
+    print(f"{'Registries':<10} {'time (ms)':>10} {'peak memory (MiB)':>18}")
+    for name, fn in (("eager", eager), ("lazy", lazy)):
+        elapsed, peak = measure(fn, config, args.used)
+        print(f"{name:<10} {elapsed:>10.1f} {peak:>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
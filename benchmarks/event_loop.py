@@ -0,0 +1,91 @@
+"""Measure the event loop lag caused by generating and validating states with every key.
+
+For each algorithm, authorizations (a state generated then validated) run
+concurrently with a coroutine waking up every millisecond, whose delay is the
+lag experienced by every other coroutine. States are either signed and verified
+on the event loop with `generate_state()` / `validate_state()`, or offloaded to
+a thread or process pool with `agenerate_state()` / `avalidate_state()`.
+
+Usage: python -m benchmarks.event_loop [-n NUMBER] [-c CONCURRENCY] [-w WORKERS]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from benchmarks.keys import keys
+from eternaltwin.clients.asyncio.clients import Eternaltwin
+from eternaltwin.keys import CompactKey, KeyABC
+
+
+async def measure(client: Eternaltwin, offload: bool, number: int, concurrency: int) -> tuple[float, list[float]]:
+    """Run `number` authorizations, return their throughput and the lags of the ticker (seconds)."""
+    lags = []
+    done = asyncio.Event()
+
+    async def ticker() -> None:
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append(time.perf_counter() - start - 0.001)
+
+    async def authorize(count: int) -> None:
+        for _ in range(count):
+            if offload:
+                await client.avalidate_state(await client.agenerate_state())
+            else:
+                client.validate_state(client.generate_state())
+                await asyncio.sleep(0)  # Yield to the other coroutines between authorizations
+
+    task = asyncio.create_task(ticker())
+    start = time.perf_counter()
+    await asyncio.gather(*(authorize(number // concurrency) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await task
+    await client.aclose()
+    return number / elapsed, lags
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--number", type=int, default=400, help="Number of authorizations per case.")
+    parser.add_argument("-c", "--concurrency", type=int, default=16, help="Number of concurrent authorizations.")
+    parser.add_argument("-w", "--workers", type=int, default=4, help="Number of workers of the pools.")
+    args = parser.parse_args()
+
+    state_keys: list[KeyABC] = [key for key, _, _ in keys()] + [CompactKey("a" * 64)]
+    executors: list[tuple[str, Executor | None]] = [
+        ("loop", None),
+        ("threads", ThreadPoolExecutor(args.workers)),
+        ("processes", ProcessPoolExecutor(args.workers)),
+    ]
+    print(
+        f"{'Algorithm':<14} {'Mode':<10} {'auth/s':>8} {'lag p50 (ms)':>13} {'lag p99 (ms)':>13} {'lag max (ms)':>13}"
+    )
+    for key in state_keys:
+        for mode, executor in executors:
+            client = Eternaltwin(
+                "client",
+                "secret",
+                "https://example.com/callback",
+                key,
+                url="https://eternaltwin.org/",
+                state_executor=executor,
+            )
+            if executor is not None:  # Start the workers, and load the key in each process, beforehand
+                asyncio.run(measure(client, True, args.workers * 2, args.workers))
+            throughput, lags = asyncio.run(measure(client, executor is not None, args.number, args.concurrency))
+            p50, p99 = (statistics.quantiles(lags, n=100, method="inclusive")[i] * 1000 for i in (49, 98))
+            print(
+                f"{key.algorithm:<14} {mode:<10} {throughput:>8.0f} {p50:>13.2f} {p99:>13.2f} {max(lags) * 1000:>13.2f}"
+            )
+    for _, executor in executors:
+        if executor is not None:
+            executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
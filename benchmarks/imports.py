@@ -0,0 +1,51 @@
+"""Measure the time taken to import the modules of the package, with `python -X importtime`.
+
+Each module is imported in a new interpreter, and the time spent importing the
+modules that an empty interpreter does not load is summed. The HTTP libraries
+and PyJWT should only be loaded by the modules that need them.
+
+Usage: python -m benchmarks.imports [-r REPEAT]
+"""
+
+import argparse
+import subprocess
+import sys
+
+MODULES = [
+    "eternaltwin.users",
+    "eternaltwin.connections",
+    "eternaltwin.keys",
+    "eternaltwin.clients.sync.clients",
+    "eternaltwin.clients.asyncio.clients",
+]
+HEAVY = ["requests", "aiohttp", "jwt", "cryptography"]
+
+
+def importtime(statement: str) -> dict[str, int]:
+    """Return the time spent importing each module, in microseconds, while running `statement`."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement], capture_output=True, text=True, check=True
+    ).stderr
+    times = {}
+    for line in stderr.splitlines()[1:]:
+        self_time, _, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = int(self_time)
+    return times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="Number of imports per module, the best is kept.")
+    args = parser.parse_args()
+
+    baseline = set(importtime("pass"))
+    print(f"{'Module':<36} {'time (ms)':>10}  Loaded")
+    for module in MODULES:
+        runs = [importtime(f"import {module}") for _ in range(args.repeat)]
+        best = min(sum(t for name, t in run.items() if name not in baseline) for run in runs)
+        loaded = [name for name in HEAVY if name in runs[0]]
+        print(f"{module:<36} {best / 1000:>10.1f}  {', '.join(loaded) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Measure the state signing (`encode`) and verification (`decode`) throughput of every key.
+
+For each algorithm, the current keys, whose material is loaded once, are
+compared to passing the raw PEM / secret strings to PyJWT on every call as
+the previous implementation did.
+
+Usage: python -m benchmarks.keys [-n NUMBER]
+"""
+
+import argparse
+import time
+import timeit
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+from eternaltwin.keys import EdDSAKey, ES256Key, HS256Key, KeyABC, PS256Key, RS256Key
+from eternaltwin.states import _generate_nonce
+
+
+def pem_pair(private_key) -> tuple[str, str]:
+    """Return the PEM encoded public and private keys of `private_key`."""
+    private = private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    public = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    return public.decode(), private.decode()
+
+
+def keys() -> list[tuple[KeyABC, str, str]]:
+    """Return every key, along with the raw material used to sign and verify."""
+    rsa_public, rsa_private = pem_pair(rsa.generate_private_key(public_exponent=65537, key_size=2048))
+    ec_public, ec_private = pem_pair(ec.generate_private_key(ec.SECP256R1()))
+    ed_public, ed_private = pem_pair(ed25519.Ed25519PrivateKey.generate())
+    secret = "a" * 64
+    return [
+        (HS256Key(secret), secret, secret),
+        (RS256Key(rsa_public, rsa_private), rsa_private, rsa_public),
+        (PS256Key(rsa_public, rsa_private), rsa_private, rsa_public),
+        (ES256Key(ec_public, ec_private), ec_private, ec_public),
+        (EdDSAKey(ed_public, ed_private), ed_private, ed_public),
+    ]
+
+
+def ops(fn, number: int) -> float:
+    """Return the number of calls of `fn` per second."""
+    return number / timeit.timeit(fn, number=number)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--number", type=int, default=500, help="Number of calls per case.")
+    args = parser.parse_args()
+
+    now = int(time.time())
+    payload = {"a": "authorize", "as": "https://eternaltwin.org/", "iat": now, "rfp": now, "exp": now + 600}
+    payload["nonce"] = _generate_nonce()
+
+    print(f"{'Algorithm':<10} {'encode/s (raw)':>15} {'encode/s':>10} {'decode/s (raw)':>15} {'decode/s':>10}")
+    for key, signing, verifying in keys():
+        token = key.encode(payload)
+        options = {"verify_exp": False}
+        algorithm = key.algorithm
+        raw_encode = ops(lambda: jwt.encode(payload, signing, algorithm=algorithm), args.number)
+        raw_decode = ops(lambda: jwt.decode(token, verifying, algorithms=[algorithm], options=options), args.number)
+        encode = ops(lambda: key.encode(payload), args.number)
+        decode = ops(lambda: key.decode(token), args.number)
+        print(f"{algorithm:<10} {raw_encode:>15.0f} {encode:>10.0f} {raw_decode:>15.0f} {decode:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Compare the JSON decoding paths of `Response.json()` on a 100 users `/api/v1/users` payload.
+
+* `str + json.loads`: previous implementation, decoding to `str` then parsing on every call.
+* `json.loads(bytes)`: stdlib parser fed with bytes directly.
+* `orjson.loads(bytes)`: faster parser, if installed.
+* `Response.json()`: current implementation, parsing once with the default decoder.
+
+Usage: python -m benchmarks.responses [-n NUMBER] [-c CALLS]
+"""
+
+import argparse
+import json
+import timeit
+
+from benchmarks.users import user_payload
+from eternaltwin.responses import Response, get_json_decoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--number", type=int, default=2_000, help="Number of responses decoded per case.")
+    parser.add_argument("-c", "--calls", type=int, default=3, help="Number of `.json()` calls per response.")
+    args = parser.parse_args()
+
+    content = json.dumps({"count": 100_000, "items": [user_payload(i) for i in range(100)]}).encode()
+    calls = range(args.calls)
+    cases = {
+        "str + json.loads": lambda: [json.loads(content.decode()) for _ in calls],
+        "json.loads(bytes)": lambda: [json.loads(content) for _ in calls],
+    }
+    if orjson is not None:
+        cases["orjson.loads(bytes)"] = lambda: [orjson.loads(content) for _ in calls]
+
+    def response_json() -> None:
+        response = Response("", 200, content, {})
+        for _ in calls:
+            response.json()
+
+    cases["Response.json()"] = response_json
+
+    decoder = get_json_decoder()
+    print(f"Payload: {len(content)} bytes, {args.calls} call(s) per response, decoder: {decoder.__module__}")
+    print(f"{'Case':<22} {'µs/response':>12} {'responses/s':>12}")
+    for name, case in cases.items():
+        duration = timeit.timeit(case, number=args.number) / args.number
+        print(f"{name:<22} {duration * 1e6:>12.1f} {1 / duration:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Compare the generation and validation of states encoded as JWTs and with `CompactKey`.
+
+For each key, states are generated with `generate_state()` and validated with
+`validate_state()` on a client, as done during an authorization, along with the
+length of the resulting state.
+
+Usage: python -m benchmarks.states [-n NUMBER]
+"""
+
+import argparse
+import timeit
+
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from benchmarks.keys import pem_pair
+from eternaltwin.clients.sync.clients import Eternaltwin
+from eternaltwin.keys import CompactKey, HS256Key, KeyABC, RS256Key
+
+
+def keys() -> list[KeyABC]:
+    """Return the JWT keys to compare `CompactKey` with, and a `CompactKey`."""
+    rsa_public, rsa_private = pem_pair(rsa.generate_private_key(public_exponent=65537, key_size=2048))
+    secret = "a" * 64
+    return [HS256Key(secret), RS256Key(rsa_public, rsa_private), CompactKey(secret)]
+
+
+def ops(fn, number: int) -> float:
+    """Return the number of calls of `fn` per second."""
+    return number / timeit.timeit(fn, number=number)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--number", type=int, default=2000, help="Number of calls per case.")
+    args = parser.parse_args()
+
+    print(f"{'Algorithm':<14} {'generate/s':>11} {'validate/s':>11} {'length':>7}")
+    for key in keys():
+        client = Eternaltwin("client", "secret", "https://example.com/callback", key, url="https://eternaltwin.org/")
+        state = client.generate_state()
+        generate = ops(client.generate_state, args.number)
+        validate = ops(lambda: client.validate_state(state, state), args.number)
+        print(f"{key.algorithm:<14} {generate:>11.0f} {validate:>11.0f} {len(state):>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Compare the memory footprint and construction time of `User` and `Token`.
+
+The current slot-based classes, parsing timestamps lazily, are compared to
+dict-based replicas of the previous implementation parsing them eagerly.
+
+Usage: python -m benchmarks.users [-n COUNT]
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable
+
+from eternaltwin.tokens import Token
+from eternaltwin.users import User
+
+
+class DictUser:
+    """Replica of the dict-based `User` parsing timestamps eagerly."""
+
+    def __init__(self, identifier, username, is_administrator, created_at, deleted_at, token=None):
+        self.identifier = identifier
+        self.username = username
+        self.is_administrator = is_administrator
+        self.created_at = created_at
+        self.deleted_at = deleted_at
+        self.token = token
+
+    @classmethod
+    def _from_response(cls, using, data):
+        return cls(
+            identifier=data["id"],
+            username=data["display_name"]["current"]["value"],
+            is_administrator=data.get("is_administrator", None),
+            created_at=data.get("created_at") and datetime.fromisoformat(data["created_at"]),
+            deleted_at=data.get("deleted_at") and datetime.fromisoformat(data["deleted_at"]),
+        )
+
+
+class DictToken:
+    """Replica of the dict-based `Token`."""
+
+    def __init__(self, *, access_token, expires_in, token_type, refresh_token=None):
+        self.access_token = access_token
+        self.refresh_token = refresh_token
+        self.expiration = int(time.time()) + expires_in - 60
+        self.token_type = token_type
+
+
+def user_payload(i: int) -> dict[str, Any]:
+    """Return a user as returned by `/api/v1/users`."""
+    return {
+        "type": "User",
+        "id": f"{i:08x}-1f2e-4c3d-9b8a-7f6e5d4c3b2a",
+        "display_name": {"current": {"value": f"user{i}"}},
+        "is_administrator": False,
+        "created_at": "2024-03-15T12:34:56.789Z",
+        "deleted_at": None,
+    }
+
+
+def token_payload(i: int) -> dict[str, Any]:
+    """Return a token as returned by `/oauth/token`."""
+    return {"access_token": f"{i:032x}", "refresh_token": f"{i:032x}", "expires_in": 3600, "token_type": "Bearer"}
+
+
+def measure(build: Callable[[int], Any], count: int) -> tuple[float, float]:
+    """Return the memory per object (bytes) and construction time per object (µs)."""
+    gc.collect()
+    tracemalloc.start()
+    objects = [build(i) for i in range(count)]
+    memory = tracemalloc.get_traced_memory()[0] / count
+    tracemalloc.stop()
+    del objects
+
+    gc.collect()
+    start = time.perf_counter()
+    objects = [build(i) for i in range(count)]
+    duration = (time.perf_counter() - start) / count * 1e6
+    del objects
+    return memory, duration
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--count", type=int, default=100_000, help="Number of objects to build.")
+    args = parser.parse_args()
+
+    users = [user_payload(i) for i in range(args.count)]
+    tokens = [token_payload(i) for i in range(args.count)]
+    cases = {
+        "User (before)": lambda i: DictUser._from_response(None, users[i]),
+        "User (after)": lambda i: User._from_response(None, users[i]),
+        "Token (before)": lambda i: DictToken(**tokens[i]),
+        "Token (after)": lambda i: Token(**tokens[i]),
+    }
+
+    print(f"{'Case':<16} {'bytes/object':>14} {'µs/object':>11}")
+    for name, build in cases.items():
+        memory, duration = measure(build, args.count)
+        print(f"{name:<16} {memory:>14.1f} {duration:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
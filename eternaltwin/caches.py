@@ -0,0 +1,117 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+__all__ = ["Cache"]
+
+
+class Cache:
+    """Thread-safe in-memory cache with per-entry TTL and LRU eviction.
+
+    Entries expire `ttl` seconds after being set. When the cache holds more
+    than `max_entries` entries, or more than `max_bytes` bytes, the least
+    recently used entries are evicted.
+
+    A cache can be shared by several aliases, as well as by the synchronous and
+    asynchronous clients of an alias: as a `user_cache`, entries are keyed by
+    the URL of the client and the user ID.
+
+    Parameters
+    ----------
+    ttl: float, optional
+        Default time to live of the entries in seconds. Default is 60 seconds.
+    max_entries: int, optional
+        Maximum number of entries. Default is 1024.
+    max_bytes: int, optional
+        Maximum total size of the entries in bytes, as given to `set()`.
+        Default is `None` (no limit).
+
+    Attributes
+    ----------
+    hits: int
+        Number of lookups that found a live entry.
+    misses: int
+        Number of lookups that found no entry, or an expired one.
+    evictions: int
+        Number of entries evicted to respect `max_entries` or `max_bytes`.
+    """
+
+    def __init__(self, ttl: float = 60, max_entries: int = 1024, max_bytes: int = None) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[Hashable, tuple[Any, float, int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        """Total size of the entries in bytes."""
+        return self._bytes
+
+    def _remove(self, key: Hashable) -> None:
+        """Remove an entry, the lock must be held."""
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the value of `key` if it is cached and has not expired, `default` otherwise."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any, ttl: float = None, size: int = 0) -> None:
+        """Cache `value` under `key`.
+
+        Parameters
+        ----------
+        key: Hashable
+            The key of the entry.
+        value: Any
+            The value to cache.
+        ttl: float, optional
+            Time to live of this entry in seconds, default to the cache's `ttl`.
+        size: int, optional
+            Size of the value in bytes, used to respect `max_bytes`. Values
+            bigger than `max_bytes` are not cached.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if ttl <= 0 or (self.max_bytes is not None and size > self.max_bytes):
+                return
+            self._entries[key] = (value, time.monotonic() + ttl, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """Remove the entry of `key`, if any."""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self) -> None:
+        """Remove every entry, counters are left untouched."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
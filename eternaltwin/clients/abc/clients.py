@@ -1,12 +1,18 @@
 import abc
 import base64
-from typing import Any, Awaitable, Generic, TypeVar
+from concurrent.futures import Executor
+from typing import Any, Awaitable, Generic, Hashable, TypeVar
 from urllib.parse import urlencode, urljoin
 
+from eternaltwin.caches import Cache
 from eternaltwin.clients import endpoints
-from eternaltwin.exceptions import InvalidStateError
+from eternaltwin.clients.abc.transports import Method, Request, TransportABC
+from eternaltwin.exceptions import InvalidStateError, RequestError
 from eternaltwin.keys import KeyABC
-from eternaltwin.states import State
+from eternaltwin.nonces import NonceTrackerABC
+from eternaltwin.responses import Response
+from eternaltwin.states import State, StatePool
+from eternaltwin.stores import TokenStoreABC
 from eternaltwin.tokens import Token
 
 C = TypeVar("C", bound="ClientABC")
@@ -22,6 +28,8 @@ class NamespacedClientABC(abc.ABC, Generic[C]):
 class ClientABC(abc.ABC):
     """Base class for client handling communication with EternalTwin.
 
+    Requests are built by the client, then sent through its `transport`.
+
     Parameters
     ----------
     client_id: str
@@ -52,6 +60,39 @@ class ClientABC(abc.ABC):
         Whether to verify SSL certificates for API requests. Default is True.
     allow_redirects: bool, optional
         Whether to allow redirects for API requests. Default is False.
+    coalesce: bool, optional
+        Whether identical GET requests sent concurrently should share a single
+        request to EternalTwin. Default is False.
+    user_cache: Cache, optional
+        A cache for the anonymous responses of `users.get()`, keyed by URL and
+        user ID, so that it can be shared by several connections. Default is
+        `None` (no caching).
+    auth_cache: Cache, optional
+        A cache for the authenticated responses of `users.me()`, keyed by a
+        hash of the access token. Entries never outlive their token. Default is
+        `None` (no caching).
+    refresh_leeway: float, optional
+        Time in seconds before their expiration at which tokens are refreshed
+        by `tokens.ensure_fresh()`. Default is 0.
+    refresh_jitter: float, optional
+        Maximum random time in seconds added to `refresh_leeway`, drawn once per
+        token, so that workers holding tokens expiring at the same time do not
+        refresh them all at once. Default is 60 seconds.
+    token_store: TokenStoreABC, optional
+        A store sharing tokens between requests and workers, keyed by session
+        ID, used by `User.from_session()`. Default is `None`.
+    state_pool: StatePool, optional
+        A pool of states signed in advance by a background thread, used by
+        `generate_state()`. Default is `None` (states are signed on demand).
+    nonce_tracker: NonceTrackerABC, optional
+        A tracker of the states consumed by `validate_state()`, rejecting the
+        states received more than once. Default is `None` (states can be
+        replayed until they expire).
+    state_executor: Executor, optional
+        The executor in which the asynchronous client signs and verifies
+        states in `agenerate_state()` and `avalidate_state()`, a thread or a
+        process pool. Default is `None` (the default executor of the event
+        loop).
     """
 
     def __init__(
@@ -69,6 +110,15 @@ class ClientABC(abc.ABC):
         timeout: int = 5,
         verify_ssl: bool = True,
         allow_redirects: bool = False,
+        coalesce: bool = False,
+        user_cache: Cache = None,
+        auth_cache: Cache = None,
+        refresh_leeway: float = 0,
+        refresh_jitter: float = 60,
+        token_store: TokenStoreABC = None,
+        state_pool: StatePool = None,
+        nonce_tracker: NonceTrackerABC = None,
+        state_executor: Executor = None,
     ) -> None:
 
         match (url, scheme, host, port, prefix):
@@ -88,6 +138,19 @@ class ClientABC(abc.ABC):
         self.timeout = timeout
         self.verify_ssl = verify_ssl
         self.allow_redirects = allow_redirects
+        self.coalesce = coalesce
+        self.user_cache = user_cache
+        self.auth_cache = auth_cache
+        self.refresh_leeway = refresh_leeway
+        self.refresh_jitter = refresh_jitter
+        self.token_store = token_store
+        self.state_pool = state_pool
+        self.nonce_tracker = nonce_tracker
+        self.state_executor = state_executor
+        if state_pool is not None:
+            state_pool.bind(url, state_key)
+
+    transport: TransportABC
 
     def __hash__(self) -> int:
         return hash(
@@ -109,6 +172,39 @@ class ClientABC(abc.ABC):
         """Return the basic auth token for the client encoded as base64."""
         return base64.b64encode(f"{self.client_id}:{self.client_secret}".encode()).decode()
 
+    def _build_request(self, method: Method, endpoint: str, token: Token = None, **kwargs: Any) -> Request:
+        """Build the request to `endpoint`, authenticated with `token` if provided.
+
+        Keyword arguments other than `params`, `headers`, `json` and `data`
+        are kept in `Request.extra`, to be given as is to the HTTP library.
+        """
+        headers = kwargs.pop("headers", None) or {}
+        if token is not None and "Authorization" not in headers:
+            headers = headers | {"Authorization": f"Bearer {token.access_token}"}
+        fields = {name: kwargs.pop(name) for name in ("params", "json", "data") if name in kwargs}
+        return Request(method, urljoin(self.url, endpoint), headers=headers, **fields, extra=kwargs)
+
+    @staticmethod
+    def _coalescing_key(request: Request) -> Hashable | None:
+        """Return a key identifying identical requests, `None` if `request` must not be coalesced.
+
+        Only GET requests are idempotent enough to be shared. Headers are part
+        of the key so that requests authenticated as different users are never
+        coalesced together. Requests with `extra` arguments are never shared.
+        """
+        if request.method != "get" or request.json is not None or request.data is not None or request.extra:
+            return None
+        params = tuple(sorted((k, str(v)) for k, v in (request.params or {}).items()))
+        headers = tuple(sorted(request.headers.items()))
+        return request.url, params, headers
+
+    @staticmethod
+    def _check_response(response: Response, raise_on_error: bool = True) -> Response:
+        """Return the response, raising `RequestError` on error status codes if `raise_on_error`."""
+        if response.status_code >= 300 and raise_on_error:
+            raise RequestError(response)
+        return response
+
     def authorization_url(self, state: str) -> str:
         """Create an OAuth authorization request URL.
 
@@ -131,6 +227,22 @@ class ClientABC(abc.ABC):
         """Retrieve a token using the provided authorization code."""
         pass
 
+    @abc.abstractmethod
+    def warmup(self, count: int = 1) -> float | Awaitable[float]:
+        """Open `count` keep-alive connections to EternalTwin ahead of time.
+
+        Concurrent requests are sent to a cheap endpoint so that DNS
+        resolution, TCP connections and TLS handshakes are done before the
+        first real request. The number of connections kept open is still
+        bounded by the pool size of the transport.
+
+        Return
+        ------
+        float
+            The time the warmup took, in seconds.
+        """
+        pass
+
     def generate_state(self, expiration: int = 600, nonce: str = None) -> str:
         """Generate a new state using the client's URL and key.
 
@@ -142,13 +254,26 @@ class ClientABC(abc.ABC):
             An optional nonce value used to guarantee the state to be unique. If
             not provided, a random one will be generated.
 
+        If the client has a `state_pool` and neither a `nonce` nor another
+        `expiration` than the pool's is requested, a state signed in advance is
+        used when available.
+
         Return
         -----
         str
             The generated state encoded as a JWT.
         """
+        if (state := self._pooled_state(expiration, nonce)) is not None:
+            return state.jwt
         return State.new(self.url, self.state_key, expiration, nonce).jwt
 
+    def _pooled_state(self, expiration: int, nonce: str | None) -> State | None:
+        """Return a state from the `state_pool` if it can be used, `None` otherwise."""
+        pool = self.state_pool
+        if pool is not None and nonce is None and expiration == pool.expiration:
+            return pool.pop()
+        return None
+
     def validate_state(self, state: str, expected: str = None) -> None:
         """Validate the state received from the authorization server.
 
@@ -159,9 +284,15 @@ class ClientABC(abc.ABC):
         ------
         InvalidStateError
             If action or authorization server does not match, the JWT is
-            expired, or the received state does not match the expected one (if
-            provided).
+            expired, the received state does not match the expected one (if
+            provided), or it has already been validated (if the client has a
+            `nonce_tracker`).
         """
-        validated = State.from_jwt(state, self.url, self.state_key)
+        self._check_state(State.from_jwt(state, self.url, self.state_key), state, expected)
+
+    def _check_state(self, validated: State, state: str, expected: str | None) -> None:
+        """Check `state` against `expected`, and consume it if the client has a `nonce_tracker`."""
         if expected is not None and state != expected:
             raise InvalidStateError(f"Received state does not match, expected: '{expected}', got '{state}'", validated)
+        if self.nonce_tracker is not None and not self.nonce_tracker.consume(validated.nonce, validated.exp):
+            raise InvalidStateError("State has already been used", validated)
@@ -0,0 +1,88 @@
+import abc
+from typing import TYPE_CHECKING, Any, Awaitable, Generic, TypeVar
+
+from eternaltwin.caches import Cache
+from eternaltwin.clients.abc.clients import NamespacedClientABC
+from eternaltwin.responses import Response
+from eternaltwin.tokens import Token
+
+if TYPE_CHECKING:
+    from eternaltwin.clients.abc.clients import ClientABC  # noqa: F401
+
+C = TypeVar("C", bound="ClientABC")
+
+
+class TokenClientABC(NamespacedClientABC[C], Generic[C]):
+    """Base class for sub-client handling the lifecycle of tokens.
+
+    Concurrent refreshes of the same token (identified by its refresh token)
+    share a single request to EternalTwin. The refreshed token is kept for a
+    minute, so that the other copies of the token (e.g., retrieved from a
+    token store) adopt it instead of sending their refresh token again.
+    """
+
+    def __init__(self, client: C) -> None:
+        super().__init__(client)
+        self._refreshed_tokens = Cache(ttl=60)
+
+    def _adopt_refresh(self, token: Token) -> None:
+        """Update `token` in place with the token its refresh token was exchanged for, if any."""
+        while (fresh := self._refreshed_tokens.get(token.refresh_token)) is not None and (
+            fresh.expiration > token.expiration
+        ):
+            token.update(fresh)
+
+    def _apply_refresh(self, token: Token, fresh: Token) -> None:
+        """Update `token` in place with `fresh`, obtained with its refresh token."""
+        self._refreshed_tokens.set(token.refresh_token, fresh)
+        token.update(fresh)
+
+    def _needs_refresh(self, token: Token) -> bool:
+        """Return whether `token` can and should be refreshed with the client's settings."""
+        return token.refresh_token is not None and token.needs_refresh(
+            self.client.refresh_leeway, self.client.refresh_jitter
+        )
+
+    def _refresh_kwargs(self, token: Token) -> dict[str, Any]:
+        """Return the arguments of the `refresh_token` grant request."""
+        return {
+            "headers": {"Authorization": f"Basic {self.client._basic_auth_token()}"},
+            "json": {"grant_type": "refresh_token", "refresh_token": token.refresh_token},
+        }
+
+    @staticmethod
+    def _refreshed(token: Token, response: Response) -> Token:
+        """Build the refreshed token, keeping the refresh token of `token` if none was issued."""
+        data = response.json()
+        return Token(
+            access_token=data["access_token"],
+            expires_in=data["expires_in"],
+            token_type=data["token_type"],
+            refresh_token=data.get("refresh_token") or token.refresh_token,
+        )
+
+    @abc.abstractmethod
+    def refresh(self, token: Token) -> Token | Awaitable[Token]:
+        """Exchange the refresh token of `token` for a new token.
+
+        `token` is left untouched.
+
+        Raises
+        ------
+        RequestError
+            If EternalTwin refused to refresh the token.
+        """
+
+    @abc.abstractmethod
+    def ensure_fresh(self, token: Token) -> Token | Awaitable[Token]:
+        """Refresh `token` in place if it is about to expire, and return it.
+
+        The token is refreshed `refresh_leeway` seconds (plus up to
+        `refresh_jitter` seconds) before its expiration. Tokens without a
+        refresh token are returned as is.
+
+        Raises
+        ------
+        RequestError
+            If EternalTwin refused to refresh the token.
+        """
@@ -0,0 +1,97 @@
+import abc
+from typing import Any, AsyncContextManager, AsyncIterator, Awaitable, Literal, Mapping
+
+from eternaltwin.responses import Response
+
+Method = Literal["get", "post", "delete", "put", "patch", "options"]
+
+
+class Request:
+    """Describe a request to be sent by a transport.
+
+    Parameters
+    ----------
+    method: str
+        The HTTP method of the request (e.g., "get" or "post").
+    url: str
+        The absolute URL of the request.
+    params: Mapping[str, Any], optional
+        The query parameters of the request.
+    headers: Mapping[str, str], optional
+        The headers of the request.
+    json: Any, optional
+        A JSON serializable object to send as the body of the request.
+    data: Any, optional
+        A form or raw body to send as the body of the request.
+    extra: Mapping[str, Any], optional
+        Other keyword arguments given as is to the HTTP library by the default
+        transports (e.g., `cookies` or `files`), other transports may ignore
+        them.
+    """
+
+    def __init__(
+        self,
+        method: Method,
+        url: str,
+        *,
+        params: Mapping[str, Any] = None,
+        headers: Mapping[str, str] = None,
+        json: Any = None,
+        data: Any = None,
+        extra: Mapping[str, Any] = None,
+    ) -> None:
+        self.method = method
+        self.url = url
+        self.params = params
+        self.headers = headers or {}
+        self.json = json
+        self.data = data
+        self.extra = extra or {}
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} [{self.method.upper()} {self.url}]>"
+
+    __str__ = __repr__
+
+
+class TransportABC(abc.ABC):
+    """Base class for transports used by the clients to send their requests.
+
+    A transport receives a fully built `Request` and returns the corresponding
+    `Response`, whatever the status code. Headers, authentication and error
+    handling are done by the clients, so that transports only have to deal with
+    the HTTP library they are wrapping.
+    """
+
+    @abc.abstractmethod
+    def send(self, request: Request) -> Response | Awaitable[Response]:
+        """Send the request and return the response."""
+        pass
+
+    @abc.abstractmethod
+    def close(self) -> None | Awaitable[None]:
+        """Release the resources (connections, sessions, ...) held by the transport."""
+        pass
+
+
+class StreamingTransportABC(TransportABC):
+    """Base class for asynchronous transports able to stream response contents.
+
+    Instead of buffering the whole content, `stream()` gives access to it chunk
+    by chunk as it is received, so that large responses can be processed with
+    a bounded amount of memory.
+    """
+
+    @abc.abstractmethod
+    def stream(
+        self, request: Request, chunk_size: int = 65536
+    ) -> AsyncContextManager[tuple[Response, AsyncIterator[bytes]]]:
+        """Send the request, and give access to the response and its content.
+
+        The returned asynchronous context manager yields the response, with an
+        empty `content` if it is successful (status code below 300), and an
+        iterator over the chunks of the content. Unsuccessful responses are
+        read entirely so that they can be reported, their chunk iterator is
+        empty. The connection is released when the context manager exits.
+        """
+        pass
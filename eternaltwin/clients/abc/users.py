@@ -1,4 +1,6 @@
 import abc
+import hashlib
+import time
 from typing import TYPE_CHECKING, Awaitable, Generic, TypeVar
 
 from eternaltwin.clients.abc.clients import NamespacedClientABC
@@ -14,13 +16,46 @@ C = TypeVar("C", bound="ClientABC")
 class UserClientABC(NamespacedClientABC[C], Generic[C]):
     """Base class for sub-client handling interaction with users."""
 
+    def _auth_cache_key(self, token: Token | None, use_cache: bool) -> str | None:
+        """Return the key of `token` in the `auth_cache`, `None` if the cache must not be used."""
+        if not use_cache or token is None or self.client.auth_cache is None:
+            return None
+        return hashlib.sha256(token.access_token.encode()).hexdigest()
+
+    def _cache_me(self, key: str, token: Token, response: Response) -> None:
+        """Cache the response of `me()` for `token`, without outliving it."""
+        cache = self.client.auth_cache
+        cache.set(key, response, ttl=min(cache.ttl, token.expiration - time.time()), size=len(response.content))
+
+    def _user_cache_key(self, user_id: str) -> tuple[str, str]:
+        """Return the key of `user_id` in the `user_cache`, scoped by the URL of the client."""
+        return self.client.url, user_id
+
+    def invalidate(self, user_id: str) -> None:
+        """Remove the cached response of `get()` for `user_id` from the `user_cache`, if any."""
+        if self.client.user_cache is not None:
+            self.client.user_cache.invalidate(self._user_cache_key(user_id))
+
+    def forget(self, token: Token) -> None:
+        """Remove the cached response of `me()` for `token` from the `auth_cache`, if any."""
+        if (key := self._auth_cache_key(token, True)) is not None:
+            self.client.auth_cache.invalidate(key)
+
     @abc.abstractmethod
-    def me(self, token: Token = None) -> Response | Awaitable[Response]:
-        """Retrieve currently authenticated user's profile."""
+    def me(self, token: Token = None, use_cache: bool = True) -> Response | Awaitable[Response]:
+        """Retrieve currently authenticated user's profile.
+
+        If the client has an `auth_cache`, authenticated lookups are served
+        from it when possible, unless `use_cache` is False.
+        """
 
     @abc.abstractmethod
-    def get(self, user_id: str, token: Token = None) -> Response | Awaitable[Response]:
-        """Retrieve a user using their ID."""
+    def get(self, user_id: str, token: Token = None, use_cache: bool = True) -> Response | Awaitable[Response]:
+        """Retrieve a user using their ID.
+
+        If the client has a `user_cache`, anonymous lookups are served from it
+        when possible, unless `use_cache` is False.
+        """
 
     @abc.abstractmethod
     def search(
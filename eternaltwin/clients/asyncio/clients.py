@@ -1,19 +1,64 @@
-from typing import Any, Literal
-from urllib.parse import urljoin
-
-import aiohttp
+import asyncio
+import contextlib
+import time
+from concurrent.futures import Executor
+from types import TracebackType
+from typing import Any, AsyncIterator, Self
 
+from eternaltwin.caches import Cache
 from eternaltwin.clients import endpoints
 from eternaltwin.clients.abc.clients import ClientABC
+from eternaltwin.clients.abc.transports import Method, StreamingTransportABC, TransportABC
+from eternaltwin.clients.asyncio.singleflight import SingleFlight
+from eternaltwin.clients.asyncio.tokens import TokenClient
+from eternaltwin.clients.asyncio.transports import AiohttpTransport
 from eternaltwin.clients.asyncio.users import UserClient
-from eternaltwin.exceptions import RequestError
 from eternaltwin.keys import KeyABC
+from eternaltwin.nonces import NonceTrackerABC
 from eternaltwin.responses import Response
+from eternaltwin.states import State, StatePool
+from eternaltwin.stores import TokenStoreABC
 from eternaltwin.tokens import Token
 
 
+async def _single_chunk(content: bytes) -> AsyncIterator[bytes]:
+    yield content
+
+
 class Eternaltwin(ClientABC):
-    """Asynchronous implementation of `ClientABC` using `aiohttp`."""
+    """Asynchronous implementation of `ClientABC`, using `aiohttp` by default.
+
+    Requests are sent through an `AiohttpTransport` keeping a shared
+    `aiohttp.ClientSession` alive between requests, unless another asynchronous
+    `transport` is provided. Connections can be released with `aclose()`, or by
+    using the client as an asynchronous context manager.
+
+    Parameters
+    ----------
+    pool_limit: int, optional
+        Maximum number of simultaneous connections. Default is 100.
+    pool_maxsize: int, optional
+        Maximum number of connections kept open per host, further requests to
+        the host wait for a free connection. Default is 10.
+    dns_cache_ttl: int, optional
+        Time in seconds resolved host addresses are cached for, `None` caches
+        them forever. Default is 10 seconds.
+    keepalive_timeout: float, optional
+        Time in seconds idle connections are kept open. Default is 15 seconds.
+    keep_alive: bool, optional
+        Whether to keep connections open between requests. Default is True.
+    pool_connections, pool_block: optional
+        Options of the synchronous client, accepted and ignored so that the
+        same configuration can be given to both clients (see `configure()`).
+    transport: TransportABC, optional
+        The transport used to send requests. If provided, `timeout`,
+        `verify_ssl`, `allow_redirects` and the pooling parameters above are
+        ignored in favor of the transport's own configuration.
+
+    See `ClientABC` for the other parameters.
+    """
+
+    transport: TransportABC
 
     def __init__(
         self,
@@ -30,6 +75,23 @@ class Eternaltwin(ClientABC):
         timeout: int = 5,
         verify_ssl: bool = True,
         allow_redirects: bool = False,
+        pool_limit: int = 100,
+        pool_maxsize: int = 10,
+        dns_cache_ttl: int | None = 10,
+        keepalive_timeout: float = 15.0,
+        keep_alive: bool = True,
+        pool_connections: int = 10,
+        pool_block: bool = False,
+        coalesce: bool = False,
+        user_cache: Cache = None,
+        auth_cache: Cache = None,
+        refresh_leeway: float = 0,
+        refresh_jitter: float = 60,
+        token_store: TokenStoreABC = None,
+        state_pool: StatePool = None,
+        nonce_tracker: NonceTrackerABC = None,
+        state_executor: Executor = None,
+        transport: TransportABC = None,
     ) -> None:
         super().__init__(
             client_id,
@@ -44,30 +106,62 @@ class Eternaltwin(ClientABC):
             timeout=timeout,
             verify_ssl=verify_ssl,
             allow_redirects=allow_redirects,
+            coalesce=coalesce,
+            user_cache=user_cache,
+            auth_cache=auth_cache,
+            refresh_leeway=refresh_leeway,
+            refresh_jitter=refresh_jitter,
+            token_store=token_store,
+            state_pool=state_pool,
+            nonce_tracker=nonce_tracker,
+            state_executor=state_executor,
+        )
+        self.transport = transport or AiohttpTransport(
+            timeout=timeout,
+            verify_ssl=verify_ssl,
+            allow_redirects=allow_redirects,
+            pool_limit=pool_limit,
+            pool_maxsize=pool_maxsize,
+            dns_cache_ttl=dns_cache_ttl,
+            keepalive_timeout=keepalive_timeout,
+            keep_alive=keep_alive,
         )
-        self.timeout: aiohttp.ClientTimeout = aiohttp.ClientTimeout(timeout)
         self.users: UserClient = UserClient(self)
+        self.tokens: TokenClient = TokenClient(self)
+        self._inflight = SingleFlight()
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(
+        self, exc_type: type[BaseException] | None, exc_val: BaseException | None, exc_tb: TracebackType | None
+    ) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the transport and release its connections.
+
+        The client can still be used afterward, new connections will be opened
+        on the next request.
+        """
+        await self.transport.close()
 
     async def _request(
         self,
-        method: Literal["get", "post", "delete", "put", "patch", "options"],
+        method: Method,
         endpoint: str,
         raise_on_error: bool = True,
         token: Token = None,
         **kwargs: Any,
     ) -> Response:
         """Helper to make a request to EternalTwin."""
-        if token is not None and "Authorization" not in kwargs.get("headers", {}):
-            kwargs["headers"] = kwargs.get("headers", {}) | {"Authorization": f"Bearer {token.access_token}"}
-        url = urljoin(self.url, endpoint)
-        async with aiohttp.ClientSession() as session:
-            async with session.request(
-                method, url, **kwargs, timeout=self.timeout, ssl=self.verify_ssl, allow_redirects=self.allow_redirects
-            ) as response:
-                wrapped = await Response.from_aiohttp(response)
-        if wrapped.status_code >= 300 and raise_on_error:
-            raise RequestError(wrapped)
-        return wrapped
+        request = self._build_request(method, endpoint, token, **kwargs)
+        key = self._coalescing_key(request) if self.coalesce else None
+        if key is None:
+            response = await self.transport.send(request)
+        else:
+            response = await self._inflight.do(key, lambda: self.transport.send(request))
+        return self._check_response(response, raise_on_error)
 
     async def get(self, endpoint: str, raise_on_error: bool = True, token: Token = None, **kwargs: Any) -> Response:
         """Helper to make a GET request to EternalTwin."""
@@ -77,9 +171,83 @@ class Eternaltwin(ClientABC):
         """Helper to make a POST request to EternalTwin."""
         return await self._request("post", endpoint, raise_on_error=raise_on_error, token=token, **kwargs)
 
+    @contextlib.asynccontextmanager
+    async def stream(
+        self, endpoint: str, token: Token = None, chunk_size: int = 65536, **kwargs: Any
+    ) -> AsyncIterator[AsyncIterator[bytes]]:
+        """Helper to make a GET request to EternalTwin, streaming the content of the response.
+
+        The returned asynchronous context manager yields an iterator over the
+        chunks of the content. If the transport is not a
+        `StreamingTransportABC`, the content is buffered and yielded as a
+        single chunk.
+
+        Raises
+        ------
+        RequestError
+            If the response's status code is not 2XX.
+        """
+        request = self._build_request("get", endpoint, token, **kwargs)
+        if not isinstance(self.transport, StreamingTransportABC):
+            response = self._check_response(await self.transport.send(request))
+            yield _single_chunk(response.content)
+            return
+        async with self.transport.stream(request, chunk_size) as (response, chunks):
+            self._check_response(response)
+            yield chunks
+
     async def token(self, authorization_code: str) -> Token:
         """Retrieve a token using the provided authorization code."""
         headers = {"Authorization": f"Basic {self._basic_auth_token()}"}
         data = {"grant_type": "authorization_code", "code": authorization_code}
         response = await self.post(endpoints.TOKEN, headers=headers, json=data)
         return Token(**response.json())
+
+    async def warmup(self, count: int = 1) -> float:
+        """Open `count` keep-alive connections to EternalTwin ahead of time.
+
+        Concurrent requests are sent to a cheap endpoint so that DNS
+        resolution, TCP connections and TLS handshakes are done before the
+        first real request. The number of connections kept open is still
+        bounded by the pool size of the transport. The requests are never
+        coalesced, even if `coalesce` is enabled.
+
+        Return
+        ------
+        float
+            The time the warmup took, in seconds.
+        """
+        start = time.perf_counter()
+        request = self._build_request("get", endpoints.SELF)
+        await asyncio.gather(*(self.transport.send(request) for _ in range(count)))
+        return time.perf_counter() - start
+
+    async def agenerate_state(self, expiration: int = 600, nonce: str = None) -> str:
+        """Generate a new state as `generate_state()` does, signing it in the `state_executor`.
+
+        Signing with asymmetric keys takes milliseconds of CPU, which would
+        stall every other coroutine if done on the event loop. States taken
+        from the `state_pool` are returned without going through the executor.
+        """
+        if (state := self._pooled_state(expiration, nonce)) is not None:
+            return state.jwt
+        payload = State.new(self.url, self.state_key, expiration, nonce).payload()
+        return await asyncio.get_running_loop().run_in_executor(self.state_executor, self.state_key.encode, payload)
+
+    async def avalidate_state(self, state: str, expected: str = None) -> None:
+        """Validate the received state as `validate_state()` does, in the `state_executor`.
+
+        Only the verification of the signature runs in the executor, the state
+        is checked, and consumed by the `nonce_tracker`, in the current process.
+
+        Raises
+        ------
+        InvalidStateError
+            If action or authorization server does not match, the JWT is
+            expired, the received state does not match the expected one (if
+            provided), or it has already been validated (if the client has a
+            `nonce_tracker`).
+        """
+        loop = asyncio.get_running_loop()
+        payload = await loop.run_in_executor(self.state_executor, self.state_key.decode, state)
+        self._check_state(State.from_payload(payload, self.url, self.state_key, state), state, expected)
@@ -0,0 +1,52 @@
+import asyncio
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+from eternaltwin.forks import register_after_fork
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Share the result of a call between all the coroutines making it concurrently.
+
+    While a call identified by a key is in flight, other coroutines calling
+    `do()` with the same key await it and receive its result (or exception)
+    instead of making the call themselves.
+
+    The call runs in its own task: cancelling one of the waiting coroutines
+    does not cancel it for the others, while cancelling the task itself
+    (e.g., when the event loop shuts down) cancels every waiter.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[tuple[asyncio.AbstractEventLoop, Hashable], asyncio.Task] = {}
+        register_after_fork(self)
+
+    def _after_fork(self) -> None:
+        """Forget the calls in flight in the parent process, its event loops do not run here."""
+        self._calls = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def _forget(self, key: tuple[asyncio.AbstractEventLoop, Hashable], task: asyncio.Task) -> None:
+        """Stop sharing `task` with newcomers once it is done."""
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # Mark the exception as retrieved even if every waiter has been cancelled
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Await `fn()`, unless a call identified by `key` is already in flight.
+
+        Raises
+        ------
+        BaseException
+            Any exception raised by `fn()`, in every coroutine waiting for it.
+        """
+        key = (asyncio.get_running_loop(), key)
+        task = self._calls.get(key)
+        if task is None:
+            task = self._calls[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task)
@@ -0,0 +1,56 @@
+from typing import TYPE_CHECKING
+
+from eternaltwin.clients import endpoints
+from eternaltwin.clients.abc.tokens import TokenClientABC
+from eternaltwin.clients.asyncio.singleflight import SingleFlight
+from eternaltwin.tokens import Token
+
+if TYPE_CHECKING:
+    from eternaltwin.clients.asyncio.clients import Eternaltwin
+
+
+class TokenClient(TokenClientABC):
+    """Asynchronous implementation of `TokenClientABC`."""
+
+    client: "Eternaltwin"
+
+    def __init__(self, client: "Eternaltwin") -> None:
+        super().__init__(client)
+        self._refreshes = SingleFlight()
+
+    async def refresh(self, token: Token) -> Token:
+        """Exchange the refresh token of `token` for a new token.
+
+        `token` is left untouched.
+
+        Raises
+        ------
+        RequestError
+            If EternalTwin refused to refresh the token.
+        """
+        response = await self.client.post(endpoints.TOKEN, **self._refresh_kwargs(token))
+        return self._refreshed(token, response)
+
+    async def _refresh_if_needed(self, token: Token) -> Token:
+        # Check again once in flight, another task may have refreshed this token or a copy of it
+        self._adopt_refresh(token)
+        if self._needs_refresh(token):
+            self._apply_refresh(token, await self.refresh(token))
+        return token
+
+    async def ensure_fresh(self, token: Token) -> Token:
+        """Refresh `token` in place if it is about to expire, and return it.
+
+        The token is refreshed `refresh_leeway` seconds (plus up to
+        `refresh_jitter` seconds) before its expiration. Tokens without a
+        refresh token are returned as is.
+
+        Raises
+        ------
+        RequestError
+            If EternalTwin refused to refresh the token.
+        """
+        if self._needs_refresh(token):
+            fresh = await self._refreshes.do(token.refresh_token, lambda: self._refresh_if_needed(token))
+            token.update(fresh)  # The other callers may hold another copy of the token
+        return token
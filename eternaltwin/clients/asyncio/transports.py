@@ -0,0 +1,184 @@
+import asyncio
+import contextlib
+import threading
+from typing import AsyncContextManager, AsyncGenerator, AsyncIterator
+
+import aiohttp
+
+from eternaltwin.clients.abc.transports import Request, StreamingTransportABC
+from eternaltwin.forks import register_after_fork
+from eternaltwin.responses import Response
+
+_Session = tuple[aiohttp.ClientSession, AsyncGenerator[None, None]]
+
+
+class AiohttpTransport(StreamingTransportABC):
+    """Asynchronous implementation of `StreamingTransportABC` using `aiohttp`.
+
+    The transport owns an `aiohttp.ClientSession` created on first use, so that
+    the connection pool, the DNS cache and keep-alive connections are reused
+    across requests. The session never stores cookies, so that no state leaks
+    between users.
+
+    A session is bound to the event loop it has been created in, so the
+    transport keeps one session per event loop: applications running several
+    loops (e.g., one per thread) can share the transport, each loop using its
+    own connections. Sessions still open when their event loop shuts down are
+    closed automatically. A process forked after a session has been created
+    does not reuse the connections of its parent.
+
+    Parameters
+    ----------
+    timeout: int, optional
+        The timeout for requests in seconds. Default is 5 seconds.
+    verify_ssl: bool, optional
+        Whether to verify SSL certificates. Default is True.
+    allow_redirects: bool, optional
+        Whether to allow redirects. Default is False.
+    pool_limit: int, optional
+        Maximum number of simultaneous connections. Default is 100.
+    pool_maxsize: int, optional
+        Maximum number of connections kept open per host, further requests to
+        the host wait for a free connection. Default is 10.
+    dns_cache_ttl: int, optional
+        Time in seconds resolved host addresses are cached for, `None` caches
+        them forever. Default is 10 seconds.
+    keepalive_timeout: float, optional
+        Time in seconds idle connections are kept open. Default is 15 seconds.
+    keep_alive: bool, optional
+        Whether to keep connections open between requests. Default is True.
+    """
+
+    def __init__(
+        self,
+        *,
+        timeout: int = 5,
+        verify_ssl: bool = True,
+        allow_redirects: bool = False,
+        pool_limit: int = 100,
+        pool_maxsize: int = 10,
+        dns_cache_ttl: int | None = 10,
+        keepalive_timeout: float = 15.0,
+        keep_alive: bool = True,
+    ) -> None:
+        self.timeout = aiohttp.ClientTimeout(timeout)
+        self.verify_ssl = verify_ssl
+        self.allow_redirects = allow_redirects
+        self.pool_limit = pool_limit
+        self.pool_maxsize = pool_maxsize
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.keep_alive = keep_alive
+        self._sessions: dict[asyncio.AbstractEventLoop, _Session] = {}
+        # The loops may run in different threads, the lock is never held across an `await`
+        self._sessions_lock = threading.Lock()
+        register_after_fork(self)
+
+    def _after_fork(self) -> None:
+        """Drop the sessions inherited from the parent process, its event loops do not run here."""
+        self._sessions = {}
+        self._sessions_lock = threading.Lock()
+
+    async def _close_on_shutdown(
+        self, loop: asyncio.AbstractEventLoop, session: aiohttp.ClientSession
+    ) -> AsyncGenerator[None, None]:
+        """Keep `session` open until closed, or until its event loop shuts down.
+
+        Event loops close the asynchronous generators they are running before
+        shutting down (see `loop.shutdown_asyncgens()`), which gives the
+        session a chance to close its connections while its loop is still
+        alive, and forgets the session of a loop that will not run again.
+        """
+        try:
+            yield
+        finally:
+            with self._sessions_lock:
+                if self._sessions.get(loop, (None,))[0] is session:
+                    self._sessions.pop(loop, None)
+            await session.close()
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Return the session of the running event loop, creating it if needed."""
+        loop = asyncio.get_running_loop()
+        with self._sessions_lock:
+            if (entry := self._sessions.get(loop)) is None:
+                for closed in [other for other in self._sessions if other.is_closed()]:
+                    # Closed without `shutdown_asyncgens()`, its session cannot be closed
+                    self._sessions.pop(closed, None)
+        if entry is None:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_limit,
+                limit_per_host=self.pool_maxsize,
+                ttl_dns_cache=self.dns_cache_ttl,
+                use_dns_cache=self.dns_cache_ttl != 0,
+                keepalive_timeout=self.keepalive_timeout if self.keep_alive else None,
+                force_close=not self.keep_alive,
+            )
+            # The session is shared by every user of the client, cookies set by a
+            # response must not be sent along with the requests of another user
+            session = aiohttp.ClientSession(connector=connector, cookie_jar=aiohttp.DummyCookieJar())
+            guard = self._close_on_shutdown(loop, session)
+            await anext(guard)
+            with self._sessions_lock:
+                entry = self._sessions[loop] = session, guard
+        return entry[0]
+
+    def _request(self, session: aiohttp.ClientSession, request: Request) -> AsyncContextManager[aiohttp.ClientResponse]:
+        """Return the context manager sending `request` with `session`."""
+        return session.request(
+            request.method,
+            request.url,
+            params=request.params,
+            headers=request.headers,
+            json=request.json,
+            data=request.data,
+            timeout=self.timeout,
+            ssl=self.verify_ssl,
+            allow_redirects=self.allow_redirects,
+            **request.extra,
+        )
+
+    async def send(self, request: Request) -> Response:
+        """Send the request and return the response."""
+        session = await self.get_session()
+        async with self._request(session, request) as response:
+            return await Response.from_aiohttp(response)
+
+    @contextlib.asynccontextmanager
+    async def stream(
+        self, request: Request, chunk_size: int = 65536
+    ) -> AsyncIterator[tuple[Response, AsyncIterator[bytes]]]:
+        """Send the request, and give access to the response and its content.
+
+        The response has an empty `content` if it is successful (status code
+        below 300), which can be read chunk by chunk from the iterator.
+        Unsuccessful responses are read entirely, their chunk iterator is
+        empty. The connection is released when the context manager exits.
+        """
+        session = await self.get_session()
+        async with self._request(session, request) as response:
+            content = await response.read() if response.status >= 300 else b""
+            chunks = response.content.iter_chunked(chunk_size)
+            yield Response(str(response.url), response.status, content, response.headers), chunks
+
+    async def close(self) -> None:
+        """Close the underlying sessions and all their pooled connections.
+
+        The session of the running event loop is closed before returning, the
+        sessions of other event loops are closed in their own loop. The
+        transport can still be used afterward, a new session will be created
+        on the next request.
+        """
+        running = asyncio.get_running_loop()
+        with self._sessions_lock:
+            sessions, self._sessions = self._sessions, {}
+        for loop, (_, guard) in sessions.items():
+            if loop is running:
+                await guard.aclose()
+            elif not loop.is_closed():
+                asyncio.run_coroutine_threadsafe(_aclose(guard), loop)
+
+
+async def _aclose(guard: AsyncGenerator[None, None]) -> None:
+    """Close `guard`, as a coroutine that can be scheduled in its event loop."""
+    await guard.aclose()
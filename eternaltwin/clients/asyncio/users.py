@@ -1,8 +1,9 @@
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, AsyncIterator
 
 from eternaltwin.clients import endpoints
 from eternaltwin.clients.abc.users import UserClientABC
 from eternaltwin.responses import Response
+from eternaltwin.streaming import JSONStreamParser
 from eternaltwin.tokens import Token
 
 if TYPE_CHECKING:
@@ -14,13 +15,34 @@ class UserClient(UserClientABC):
 
     client: "Eternaltwin"
 
-    async def me(self, token: Token = None) -> Response:
-        """Retrieve currently authenticated user's profile."""
-        return await self.client.get(endpoints.SELF, token=token)
+    async def me(self, token: Token = None, use_cache: bool = True) -> Response:
+        """Retrieve currently authenticated user's profile.
 
-    async def get(self, user_id: str, token: Token = None) -> Response:
-        """Retrieve a user using their ID."""
-        return await self.client.get(endpoints.USER.format(user_id=user_id), token=token)
+        If the client has an `auth_cache`, authenticated lookups are served
+        from it when possible, unless `use_cache` is False.
+        """
+        key = self._auth_cache_key(token, use_cache)
+        if key is not None and (response := self.client.auth_cache.get(key)) is not None:
+            return response
+        response = await self.client.get(endpoints.SELF, token=token)
+        if key is not None:
+            self._cache_me(key, token, response)
+        return response
+
+    async def get(self, user_id: str, token: Token = None, use_cache: bool = True) -> Response:
+        """Retrieve a user using their ID.
+
+        If the client has a `user_cache`, anonymous lookups are served from it
+        when possible, unless `use_cache` is False.
+        """
+        cache = self.client.user_cache if use_cache and token is None else None
+        key = self._user_cache_key(user_id)
+        if cache is not None and (response := cache.get(key)) is not None:
+            return response
+        response = await self.client.get(endpoints.USER.format(user_id=user_id), token=token)
+        if cache is not None:
+            cache.set(key, response, size=len(response.content))
+        return response
 
     async def search(self, query: str = None, limit: int = 20, offset: int = 0, token: Token = None) -> Response:
         """Search for users matching the query.
@@ -36,3 +58,34 @@ class UserClient(UserClientABC):
         """
         params = {"q": query or "", "limit": limit, "offset": offset}
         return await self.client.get(endpoints.USERS, params=params, token=token)
+
+    async def search_stream(
+        self, query: str = None, limit: int = 20, offset: int = 0, token: Token = None, fields: dict[str, Any] = None
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Search for users matching the query, yielding them as they are received.
+
+        The `items` of the response are parsed incrementally from the
+        connection, so that only one user is held in memory at a time instead of
+        the whole page.
+
+        Parameters
+        ----------
+        query: str, optional
+            An optional query to use against the user's username, default to `None`.
+        limit: int, optional
+            The maximum number of users to return, default to `20`.
+        offset: int, optional
+            The offset to start returning users from, default to `0`.
+        fields: dict[str, Any], optional
+            If provided, filled with the other members of the response (e.g.,
+            `count`) once they have been received.
+        """
+        params = {"q": query or "", "limit": limit, "offset": offset}
+        parser = JSONStreamParser("items")
+        async with self.client.stream(endpoints.USERS, params=params, token=token) as chunks:
+            async for chunk in chunks:
+                for item in parser.feed(chunk):
+                    yield item
+        parser.close()
+        if fields is not None:
+            fields.update(parser.fields)
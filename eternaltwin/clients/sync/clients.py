@@ -1,19 +1,55 @@
-from typing import Any, Literal
-from urllib.parse import urljoin
-
-import requests
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from types import TracebackType
+from typing import Any, Self
 
+from eternaltwin.caches import Cache
 from eternaltwin.clients import endpoints
 from eternaltwin.clients.abc.clients import ClientABC
+from eternaltwin.clients.abc.transports import Method, TransportABC
+from eternaltwin.clients.sync.singleflight import SingleFlight
+from eternaltwin.clients.sync.tokens import TokenClient
+from eternaltwin.clients.sync.transports import RequestsTransport
 from eternaltwin.clients.sync.users import UserClient
-from eternaltwin.exceptions import RequestError
 from eternaltwin.keys import KeyABC
+from eternaltwin.nonces import NonceTrackerABC
 from eternaltwin.responses import Response
+from eternaltwin.states import StatePool
+from eternaltwin.stores import TokenStoreABC
 from eternaltwin.tokens import Token
 
 
 class Eternaltwin(ClientABC):
-    """Synchronous implementation of `ClientABC` using `requests`."""
+    """Synchronous implementation of `ClientABC`, using `requests` by default.
+
+    Requests are sent through a `RequestsTransport` keeping a pooled
+    `requests.Session` alive between requests, unless another synchronous
+    `transport` is provided. Connections can be released with `close()`, or by
+    using the client as a context manager.
+
+    Parameters
+    ----------
+    pool_connections: int, optional
+        Number of connection pools (one per host) to cache. Default is 10.
+    pool_maxsize: int, optional
+        Maximum number of connections kept open per host. Default is 10.
+    pool_block: bool, optional
+        Whether to wait for a free connection when `pool_maxsize` is reached
+        instead of opening a new, non-reusable one. Default is False.
+    keep_alive: bool, optional
+        Whether to keep connections open between requests. Default is True.
+    pool_limit, dns_cache_ttl, keepalive_timeout: optional
+        Options of the asynchronous client, accepted and ignored so that the
+        same configuration can be given to both clients (see `configure()`).
+    transport: TransportABC, optional
+        The transport used to send requests. If provided, `timeout`,
+        `verify_ssl`, `allow_redirects` and the pooling parameters above are
+        ignored in favor of the transport's own configuration.
+
+    See `ClientABC` for the other parameters.
+    """
+
+    transport: TransportABC
 
     def __init__(
         self,
@@ -30,6 +66,23 @@ class Eternaltwin(ClientABC):
         timeout: int = 5,
         verify_ssl: bool = True,
         allow_redirects: bool = False,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        keep_alive: bool = True,
+        pool_limit: int = 100,
+        dns_cache_ttl: int | None = 10,
+        keepalive_timeout: float = 15.0,
+        coalesce: bool = False,
+        user_cache: Cache = None,
+        auth_cache: Cache = None,
+        refresh_leeway: float = 0,
+        refresh_jitter: float = 60,
+        token_store: TokenStoreABC = None,
+        state_pool: StatePool = None,
+        nonce_tracker: NonceTrackerABC = None,
+        state_executor: Executor = None,
+        transport: TransportABC = None,
     ) -> None:
         super().__init__(
             client_id,
@@ -44,33 +97,61 @@ class Eternaltwin(ClientABC):
             timeout=timeout,
             verify_ssl=verify_ssl,
             allow_redirects=allow_redirects,
+            coalesce=coalesce,
+            user_cache=user_cache,
+            auth_cache=auth_cache,
+            refresh_leeway=refresh_leeway,
+            refresh_jitter=refresh_jitter,
+            token_store=token_store,
+            state_pool=state_pool,
+            nonce_tracker=nonce_tracker,
+            state_executor=state_executor,
+        )
+        self.transport = transport or RequestsTransport(
+            timeout=timeout,
+            verify_ssl=verify_ssl,
+            allow_redirects=allow_redirects,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            keep_alive=keep_alive,
         )
         self.users: UserClient = UserClient(self)
+        self.tokens: TokenClient = TokenClient(self)
+        self._inflight = SingleFlight()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self, exc_type: type[BaseException] | None, exc_val: BaseException | None, exc_tb: TracebackType | None
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the transport and release its connections.
+
+        The client can still be used afterward, new connections will be opened
+        on the next request.
+        """
+        self.transport.close()
 
     def _request(
         self,
-        method: Literal["get", "post", "delete", "put", "patch", "options"],
+        method: Method,
         endpoint: str,
         raise_on_error: bool = True,
         token: Token = None,
         **kwargs: Any,
     ) -> Response:
         """Helper to make a request to EternalTwin."""
-        if token is not None and "Authorization" not in kwargs.get("headers", {}):
-            kwargs["headers"] = kwargs.get("headers", {}) | {"Authorization": f"Bearer {token.access_token}"}
-        response = Response.from_requests(
-            requests.request(
-                method,
-                urljoin(self.url, endpoint),
-                **kwargs,
-                timeout=self.timeout,
-                verify=self.verify_ssl,
-                allow_redirects=self.allow_redirects,
-            )
-        )
-        if response.status_code >= 300 and raise_on_error:
-            raise RequestError(response)
-        return response
+        request = self._build_request(method, endpoint, token, **kwargs)
+        key = self._coalescing_key(request) if self.coalesce else None
+        if key is None:
+            response = self.transport.send(request)
+        else:
+            response = self._inflight.do(key, lambda: self.transport.send(request))
+        return self._check_response(response, raise_on_error)
 
     def get(self, endpoint: str, raise_on_error: bool = True, token: Token = None, **kwargs: Any) -> Response:
         """Helper to make a GET request to EternalTwin."""
@@ -86,3 +167,24 @@ class Eternaltwin(ClientABC):
         data = {"grant_type": "authorization_code", "code": authorization_code}
         response = self.post(endpoints.TOKEN, headers=headers, json=data)
         return Token(**response.json())
+
+    def warmup(self, count: int = 1) -> float:
+        """Open `count` keep-alive connections to EternalTwin ahead of time.
+
+        Concurrent requests are sent to a cheap endpoint so that DNS
+        resolution, TCP connections and TLS handshakes are done before the
+        first real request. The number of connections kept open is still
+        bounded by the pool size of the transport. The requests are never
+        coalesced, even if `coalesce` is enabled.
+
+        Return
+        ------
+        float
+            The time the warmup took, in seconds.
+        """
+        start = time.perf_counter()
+        request = self._build_request("get", endpoints.SELF)
+        with ThreadPoolExecutor(max_workers=max(1, count)) as executor:
+            for _ in executor.map(lambda _: self.transport.send(request), range(count)):
+                pass
+        return time.perf_counter() - start
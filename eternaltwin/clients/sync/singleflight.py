@@ -0,0 +1,61 @@
+import threading
+from concurrent.futures import Future
+from typing import Callable, Hashable, TypeVar
+
+from eternaltwin.forks import register_after_fork
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Share the result of a call between all the threads making it concurrently.
+
+    While a call identified by a key is in flight, other threads calling `do()`
+    with the same key wait for it and receive its result (or exception) instead
+    of making the call themselves.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, Future] = {}
+        register_after_fork(self)
+
+    def _after_fork(self) -> None:
+        """Forget the calls in flight in the parent process, its threads do not exist here."""
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def _forget(self, key: Hashable) -> None:
+        """Stop sharing the call identified by `key` with newcomers."""
+        with self._lock:
+            del self._calls[key]
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """Call `fn`, unless a call identified by `key` is already in flight.
+
+        Raises
+        ------
+        BaseException
+            Any exception raised by `fn`, in every thread waiting for it.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as error:
+            self._forget(key)
+            future.set_exception(error)
+            raise
+        self._forget(key)
+        future.set_result(result)
+        return result
@@ -0,0 +1,119 @@
+import threading
+from http.cookiejar import DefaultCookiePolicy
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from eternaltwin.clients.abc.transports import Request, TransportABC
+from eternaltwin.forks import register_after_fork
+from eternaltwin.responses import Response
+
+
+class RequestsTransport(TransportABC):
+    """Synchronous implementation of `TransportABC` using `requests`.
+
+    The transport owns a `requests.Session` created on first use, so that TCP
+    connections (and TLS sessions) are kept alive and reused across requests.
+    The session is thread-safe and can be shared between threads, and never
+    stores cookies, so that no state leaks between users. A process forked
+    after the session has been created (e.g., the workers of a prefork server)
+    does not reuse the connections of its parent, it creates its own session
+    on its first request.
+
+    Parameters
+    ----------
+    timeout: int, optional
+        The timeout for requests in seconds. Default is 5 seconds.
+    verify_ssl: bool, optional
+        Whether to verify SSL certificates. Default is True.
+    allow_redirects: bool, optional
+        Whether to allow redirects. Default is False.
+    pool_connections: int, optional
+        Number of connection pools (one per host) to cache. Default is 10.
+    pool_maxsize: int, optional
+        Maximum number of connections kept open per host. Default is 10.
+    pool_block: bool, optional
+        Whether to wait for a free connection when `pool_maxsize` is reached
+        instead of opening a new, non-reusable one. Default is False.
+    keep_alive: bool, optional
+        Whether to keep connections open between requests. Default is True.
+    """
+
+    def __init__(
+        self,
+        *,
+        timeout: int = 5,
+        verify_ssl: bool = True,
+        allow_redirects: bool = False,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        keep_alive: bool = True,
+    ) -> None:
+        self.timeout = timeout
+        self.verify_ssl = verify_ssl
+        self.allow_redirects = allow_redirects
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.keep_alive = keep_alive
+        self._session: requests.Session | None = None
+        self._session_lock = threading.Lock()
+        register_after_fork(self)
+
+    def _after_fork(self) -> None:
+        """Drop the session inherited from the parent process, and the lock its threads may hold."""
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        """The pooled session used to send requests, created on first access."""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = self._create_session()
+        return self._session
+
+    def _create_session(self) -> requests.Session:
+        """Create a session whose connection pools follow the transport's configuration."""
+        session = requests.Session()
+        # The session is shared by every user of the client, cookies set by a
+        # response must not be sent along with the requests of another user
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize, pool_block=self.pool_block
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        if not self.keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
+    def send(self, request: Request) -> Response:
+        """Send the request and return the response."""
+        return Response.from_requests(
+            self.session.request(
+                request.method,
+                request.url,
+                params=request.params,
+                headers=request.headers,
+                json=request.json,
+                data=request.data,
+                timeout=self.timeout,
+                verify=self.verify_ssl,
+                allow_redirects=self.allow_redirects,
+                **request.extra,
+            )
+        )
+
+    def close(self) -> None:
+        """Close the underlying session and all its pooled connections.
+
+        The transport can still be used afterward, a new session will be
+        created on the next request.
+        """
+        with self._session_lock:
+            session, self._session = self._session, None
+        if session is not None:
+            session.close()
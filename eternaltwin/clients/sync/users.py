@@ -14,13 +14,34 @@ class UserClient(UserClientABC):
 
     client: "Eternaltwin"
 
-    def me(self, token: Token = None) -> Response:
-        """Retrieve currently authenticated user's profile."""
-        return self.client.get(endpoints.SELF, token=token)
+    def me(self, token: Token = None, use_cache: bool = True) -> Response:
+        """Retrieve currently authenticated user's profile.
 
-    def get(self, user_id: str, token: Token = None) -> Response:
-        """Retrieve a user using their ID."""
-        return self.client.get(endpoints.USER.format(user_id=user_id), token=token)
+        If the client has an `auth_cache`, authenticated lookups are served
+        from it when possible, unless `use_cache` is False.
+        """
+        key = self._auth_cache_key(token, use_cache)
+        if key is not None and (response := self.client.auth_cache.get(key)) is not None:
+            return response
+        response = self.client.get(endpoints.SELF, token=token)
+        if key is not None:
+            self._cache_me(key, token, response)
+        return response
+
+    def get(self, user_id: str, token: Token = None, use_cache: bool = True) -> Response:
+        """Retrieve a user using their ID.
+
+        If the client has a `user_cache`, anonymous lookups are served from it
+        when possible, unless `use_cache` is False.
+        """
+        cache = self.client.user_cache if use_cache and token is None else None
+        key = self._user_cache_key(user_id)
+        if cache is not None and (response := cache.get(key)) is not None:
+            return response
+        response = self.client.get(endpoints.USER.format(user_id=user_id), token=token)
+        if cache is not None:
+            cache.set(key, response, size=len(response.content))
+        return response
 
     def search(self, query: str = None, limit: int = 20, offset: int = 0, token: Token = None) -> Response:
         """Search for users matching the query.
@@ -1,31 +1,97 @@
-import copy
-from typing import Any, Generic, Type, TypeVar
+import asyncio
+import importlib
+import threading
+from typing import TYPE_CHECKING, Any, Generic, Iterator, Type, TypeVar
 
 from eternaltwin.clients.abc.clients import ClientABC
-from eternaltwin.clients.asyncio.clients import Eternaltwin as AsyncEternaltwin
-from eternaltwin.clients.sync.clients import Eternaltwin
+from eternaltwin.forks import register_after_fork
+
+if TYPE_CHECKING:
+    from eternaltwin.clients.asyncio.clients import Eternaltwin as AsyncEternaltwin
+    from eternaltwin.clients.sync.clients import Eternaltwin
 
 Client = TypeVar("Client", bound=ClientABC)
 
 
-__all__ = ["connections", "async_connections", "configure", "Connections"]
+__all__ = ["connections", "async_connections", "configure", "warmup", "awarmup", "Connections"]
 
 
 class Connections(Generic[Client]):
-    """Holds connections to different EternalTwin API."""
-
-    def __init__(self, client_class: Type[Client]) -> None:
+    """Holds connections to different EternalTwin API.
+
+    Clients of aliases configured with `configure()` are only created the
+    first time they are retrieved, so that startup time and memory depend on
+    the aliases actually used, not on the number of configured ones. Creation
+    is thread-safe: threads retrieving an alias at the same time all get the
+    same client.
+
+    Connections can be configured before forking (e.g., by a prefork server
+    with `--preload`): each forked process opens its own HTTP connections, and
+    starts its own background threads, instead of sharing its parent's.
+
+    Parameters
+    ----------
+    client_class: type or str
+        The class of the clients, or its dotted path, in which case it is only
+        imported when the first client is created. The global registries use
+        dotted paths, so that `requests` and `aiohttp` are only imported when
+        the corresponding client is first used.
+    """
+
+    def __init__(self, client_class: Type[Client] | str) -> None:
         self._client_class = client_class
+        self._configs: dict[str, dict[str, Any]] = {}
         self._client: dict[str, Client] = {}
+        self._lock = threading.Lock()
+        register_after_fork(self)
+
+    def _after_fork(self) -> None:
+        """Replace the lock, which one of the threads of the parent process may hold."""
+        self._lock = threading.Lock()
 
     def __getitem__(self, alias: str) -> Client:
-        return self._client[alias]
+        try:
+            return self._client[alias]
+        except KeyError:
+            pass
+        with self._lock:
+            if alias not in self._client:  # Another thread may have created it while we were waiting
+                self._client[alias] = self.client_class(**self._configs[alias])
+                del self._configs[alias]
+            return self._client[alias]
 
     def __setitem__(self, alias: str, client: Client) -> None:
-        self._client[alias] = client
+        with self._lock:
+            self._configs.pop(alias, None)
+            self._client[alias] = client
 
     def __delitem__(self, alias: str) -> None:
-        del self._client[alias]
+        with self._lock:
+            if self._configs.pop(alias, None) is None:
+                del self._client[alias]
+            else:
+                self._client.pop(alias, None)
+
+    def __contains__(self, alias: str) -> bool:
+        # Clients are added before their configuration is removed, an alias being created is found
+        return alias in self._configs or alias in self._client
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the configured aliases, whether their client has been created or not."""
+        with self._lock:
+            return iter([*self._client, *self._configs])
+
+    @property
+    def client_class(self) -> Type[Client]:
+        """The class of the clients, imported on first access if given as a dotted path."""
+        if isinstance(self._client_class, str):
+            module, _, name = self._client_class.rpartition(".")
+            self._client_class = getattr(importlib.import_module(module), name)
+        return self._client_class
+
+    def is_created(self, alias: str = None) -> bool:
+        """Return whether the client of `alias` has already been created."""
+        return (alias or "default") in self._client
 
     def configure(self, **kwargs: Any) -> None:
         """Configure multiple clients at once.
@@ -58,36 +124,94 @@ class Connections(Generic[Client]):
         }
         connections.configure(**ETERNALTWIN_CONFIG)
         ```
+
+        Clients are created the first time they are retrieved. The values of
+        the configuration are given as is to the clients, they are not copied.
         """
-        self._client.clear()
-        for k, v in kwargs.items():
-            self.create_connection(k, **v)
+        configs = {alias: dict(config) for alias, config in kwargs.items()}
+        with self._lock:
+            self._client.clear()
+            self._configs = configs
 
     def create_connection(self, alias: str, **kwargs: Any) -> Any:
         """Create a client and register it under given alias."""
-        client = self._client[alias] = self._client_class(**kwargs)
+        client = self.client_class(**kwargs)
+        self[alias] = client
         return client
 
     def get_connection(self, alias: str = None) -> Client:
-        """Return the client corresponding to alias."""
-        try:
-            return self._client[alias or "default"]
-        except KeyError:
-            raise KeyError(f"No connection found for alias '{alias or 'default'}'.")
+        """Return the client corresponding to alias, creating it if needed."""
+        alias = alias or "default"
+        if alias not in self:
+            raise KeyError(f"No connection found for alias '{alias}'.")
+        return self[alias]
+
+    def warmup(self, count: int = 1) -> dict[str, float]:
+        """Open `count` keep-alive connections for every synchronous client.
+
+        Return
+        ------
+        dict[str, float]
+            The time the warmup took for each alias, in seconds.
+        """
+        return {alias: self[alias].warmup(count) for alias in self}
+
+    async def awarmup(self, count: int = 1) -> dict[str, float]:
+        """Open `count` keep-alive connections for every asynchronous client.
+
+        Clients are warmed up concurrently.
+
+        Return
+        ------
+        dict[str, float]
+            The time the warmup took for each alias, in seconds.
+        """
+        aliases = list(self)
+        durations = await asyncio.gather(*(self[alias].warmup(count) for alias in aliases))
+        return dict(zip(aliases, durations))
 
     add_connection = __setitem__
 
     remove_connection = __delitem__
 
 
-connections: Connections[Eternaltwin] = Connections(Eternaltwin)
+connections: "Connections[Eternaltwin]" = Connections("eternaltwin.clients.sync.clients.Eternaltwin")
 """Global instance holding all the synchronous connections configured with `configure()`."""
 
-async_connections: Connections[AsyncEternaltwin] = Connections(AsyncEternaltwin)
+async_connections: "Connections[AsyncEternaltwin]" = Connections("eternaltwin.clients.asyncio.clients.Eternaltwin")
 """Global instance holding all the asynchronous connections configured with `configure()`."""
 
 
 def configure(**kwargs: Any) -> None:  # pragma: no cover
-    """Configure both the synchronous and asynchronous clients."""
-    connections.configure(**copy.deepcopy(kwargs))
+    """Configure both the synchronous and asynchronous clients.
+
+    Only the configuration is stored, each client is created the first time
+    it is retrieved. The values of the configuration (keys, caches, stores,
+    ...) are shared by the synchronous and asynchronous clients of an alias.
+    """
+    connections.configure(**kwargs)
     async_connections.configure(**kwargs)
+
+
+def warmup(count: int = 1) -> dict[str, float]:
+    """Open `count` keep-alive connections for every synchronous client.
+
+    See `awarmup()` for the asynchronous clients.
+
+    Examples
+    --------
+    ```python
+    configure(**ETERNALTWIN_CONFIG)
+    durations = warmup(count=4)
+    # {"default": 0.0812, "test": 0.0051}
+    ```
+    """
+    return connections.warmup(count)
+
+
+async def awarmup(count: int = 1) -> dict[str, float]:
+    """Open `count` keep-alive connections for every asynchronous client.
+
+    Must be called from the event loop the clients will be used in.
+    """
+    return await async_connections.awarmup(count)
@@ -0,0 +1,37 @@
+import os
+import weakref
+from typing import Protocol
+
+__all__ = ["ForkSafe", "register_after_fork"]
+
+
+class ForkSafe(Protocol):
+    """An object holding resources that must not be shared with a forked child process."""
+
+    def _after_fork(self) -> None:
+        """Drop what was inherited from the parent process (sessions, threads, locks, ...)."""
+
+
+_objects: "weakref.WeakSet[ForkSafe]" = weakref.WeakSet()
+
+
+def register_after_fork(obj: ForkSafe) -> None:
+    """Call `obj._after_fork()` in the child process every time the current process forks.
+
+    Prefork servers (e.g. `gunicorn --preload`) import and configure the
+    application once, then fork their workers. Sockets, background threads and
+    locks are inherited by every worker, but only the parent can use them:
+    registered objects recreate them in each worker instead. Objects are only
+    weakly referenced, registering them does not keep them alive.
+    """
+    _objects.add(obj)
+
+
+def _after_fork_in_child() -> None:
+    """Reinitialize every registered object, in the child process."""
+    for obj in list(_objects):
+        obj._after_fork()
+
+
+if hasattr(os, "register_at_fork"):  # pragma: no branch (not available on Windows, which cannot fork)
+    os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -1,8 +1,16 @@
 import abc
+import base64
+import functools
+import hmac
+import struct
+import threading
+import time
+from typing import Any, Self
 
-import jwt
+__all__ = ["HS256Key", "RS256Key", "ES256Key", "PS256Key", "EdDSAKey", "CompactKey", "KeyRing"]
 
-__all__ = ["HS256Key", "RS256Key", "ES256Key", "PS256Key", "EdDSAKey"]
+# PyJWT (and `cryptography`) are only imported once a key is created or used, so
+# that importing the package does not load them.
 
 
 class KeyABC(abc.ABC):
@@ -15,8 +23,8 @@ class KeyABC(abc.ABC):
         pass
 
     @abc.abstractmethod
-    def encode(self, payload: dict) -> str:
-        """Encode a payload into a JWT."""
+    def encode(self, payload: dict, headers: dict | None = None) -> str:
+        """Encode a payload into a JWT, with the additional `headers` if given."""
         pass
 
     @abc.abstractmethod
@@ -26,34 +34,74 @@ class KeyABC(abc.ABC):
 
 
 class SymmetricKey(KeyABC):
-    """Base class for symmetric keys used to sign tokens."""
+    """Base class for symmetric keys used to sign tokens.
+
+    The key is prepared for its algorithm once, when the instance is created.
+    """
 
     def __init__(self, key: str):
+        from jwt.algorithms import get_default_algorithms
+
         self.key = key
+        self._key = get_default_algorithms()[self.algorithm].prepare_key(key)
+
+    def encode(self, payload: dict, headers: dict | None = None) -> str:
+        """Encode a payload into a JWT, with the additional `headers` if given."""
+        import jwt
 
-    def encode(self, payload: dict) -> str:
-        """Encode a payload into a JWT."""
-        return jwt.encode(payload, self.key, algorithm=self.algorithm)
+        return jwt.encode(payload, self._key, algorithm=self.algorithm, headers=headers)
 
     def decode(self, token: str) -> dict:
         """Decode a JWT."""
-        return jwt.decode(token, self.key, algorithms=[self.algorithm], options={"verify_exp": False})
+        import jwt
+
+        return jwt.decode(token, self._key, algorithms=[self.algorithm], options={"verify_exp": False})
 
 
 class AsymmetricKey(KeyABC):
-    """Base class for asymmetric keys used to sign tokens."""
+    """Base class for asymmetric keys used to sign tokens.
+
+    The PEM encoded keys are loaded into `cryptography` key objects once, when
+    the instance is created, instead of on every `encode()` and `decode()`.
+
+    Key objects cannot be copied: copying an instance returns the same
+    instance, and pickling it only pickles the PEM encoded keys. They are
+    loaded again when unpickling, once per process, so that keys sent to a
+    process pool executor with every call are not loaded on every call.
+    """
 
     def __init__(self, public_key: str, private_key: str):
         self.public_key = public_key
         self.private_key = private_key
+        from jwt.algorithms import get_default_algorithms
+
+        algorithm = get_default_algorithms()[self.algorithm]
+        self._public_key = algorithm.prepare_key(public_key)
+        self._private_key = algorithm.prepare_key(private_key)
+
+    def __deepcopy__(self, memo: dict) -> Self:
+        return self
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return _load_asymmetric_key, (self.__class__, self.public_key, self.private_key)
 
-    def encode(self, payload: dict) -> str:
-        """Encode a payload into a JWT."""
-        return jwt.encode(payload, self.private_key, algorithm=self.algorithm)
+    def encode(self, payload: dict, headers: dict | None = None) -> str:
+        """Encode a payload into a JWT, with the additional `headers` if given."""
+        import jwt
+
+        return jwt.encode(payload, self._private_key, algorithm=self.algorithm, headers=headers)
 
     def decode(self, token: str) -> dict:
         """Decode a JWT."""
-        return jwt.decode(token, self.public_key, algorithms=[self.algorithm], options={"verify_exp": False})
+        import jwt
+
+        return jwt.decode(token, self._public_key, algorithms=[self.algorithm], options={"verify_exp": False})
+
+
+@functools.lru_cache(maxsize=16)
+def _load_asymmetric_key(cls: type[AsymmetricKey], public_key: str, private_key: str) -> AsymmetricKey:
+    """Return the key of `cls` for the given PEM encoded keys, loading them once per process."""
+    return cls(public_key, private_key)
 
 
 class HS256Key(SymmetricKey):
@@ -84,3 +132,207 @@ class EdDSAKey(AsymmetricKey):
     """Asymmetric key using EdDSA."""
 
     algorithm = "EdDSA"
+
+
+class CompactKey(KeyABC):
+    """Symmetric key encoding states in a compact binary layout instead of JWTs.
+
+    The payload is packed in a fixed layout, authenticated with a HMAC SHA-256
+    truncated to 128 bits, and base64url encoded without padding. States are
+    about half as long as with `HS256Key`, and much cheaper to generate and
+    validate, as there is no JSON to serialize nor parse.
+
+    Only state payloads can be encoded (`a`, `as`, `iat`, `rfp`, `exp` and
+    `nonce`), without headers, which also means that compact keys cannot be
+    used in a `KeyRing`. Malformed tokens raise `jwt.DecodeError`, and tokens whose MAC
+    does not match raise `jwt.InvalidSignatureError`, as JWT keys do.
+
+    Parameters
+    ----------
+    key: str
+        The secret used to authenticate the states.
+    """
+
+    algorithm = "compact-HS256"
+
+    VERSION = 1
+    _FIELDS = frozenset(("a", "as", "iat", "rfp", "exp", "nonce"))
+    # Version, iat, rfp, exp, then the lengths of the action and the authorization server
+    _HEADER = struct.Struct(">BqqqBH")
+    # Whether the nonce is stored as raw bytes (hexadecimal nonce) or UTF-8, then its length
+    _NONCE = struct.Struct(">?H")
+    _MAC_SIZE = 16
+
+    def __init__(self, key: str):
+        self.key = key
+        self._key = key.encode()
+
+    def _mac(self, data: bytes) -> bytes:
+        return hmac.digest(self._key, data, "sha256")[: self._MAC_SIZE]
+
+    def encode(self, payload: dict, headers: dict | None = None) -> str:
+        """Encode a state payload into a compact token."""
+        if headers:
+            raise ValueError("Compact tokens do not have headers")
+        if payload.keys() != self._FIELDS:
+            raise ValueError(f"Only state payloads can be encoded, got fields {sorted(payload)}")
+        a, as_ = payload["a"].encode(), payload["as"].encode()
+        try:
+            nonce = bytes.fromhex(payload["nonce"])
+        except ValueError:
+            nonce = None
+        # Upper case or spaced hexadecimal nonces would not round-trip as raw bytes
+        raw = nonce is not None and nonce.hex() == payload["nonce"]
+        if not raw:
+            nonce = payload["nonce"].encode()
+        data = b"".join(
+            (
+                self._HEADER.pack(self.VERSION, payload["iat"], payload["rfp"], payload["exp"], len(a), len(as_)),
+                a,
+                as_,
+                self._NONCE.pack(raw, len(nonce)),
+                nonce,
+            )
+        )
+        return base64.urlsafe_b64encode(data + self._mac(data)).rstrip(b"=").decode("ascii")
+
+    def decode(self, token: str) -> dict:
+        """Decode and authenticate a compact token."""
+        import jwt
+
+        try:
+            data = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        except ValueError as e:
+            raise jwt.DecodeError("Invalid token padding or characters") from e
+        if len(data) < self._HEADER.size + self._NONCE.size + self._MAC_SIZE:
+            raise jwt.DecodeError("Invalid token length")
+        data, mac = data[: -self._MAC_SIZE], data[-self._MAC_SIZE :]
+        if not hmac.compare_digest(mac, self._mac(data)):
+            raise jwt.InvalidSignatureError("Signature verification failed")
+
+        try:
+            version, iat, rfp, exp, a_size, as_size = self._HEADER.unpack_from(data)
+            if version != self.VERSION:
+                raise ValueError(f"Unsupported version {version}")
+            offset = self._HEADER.size + a_size + as_size
+            raw, nonce_size = self._NONCE.unpack_from(data, offset)
+            offset += self._NONCE.size
+            if offset + nonce_size != len(data):
+                raise ValueError("Invalid length")
+            a = data[self._HEADER.size : self._HEADER.size + a_size].decode()
+            as_ = data[self._HEADER.size + a_size : offset - self._NONCE.size].decode()
+            nonce = data[offset:]
+            nonce = nonce.hex() if raw else nonce.decode()
+        except (ValueError, struct.error) as e:
+            raise jwt.DecodeError(f"Invalid payload: {e}") from e
+        return {"a": a, "as": as_, "iat": iat, "rfp": rfp, "exp": exp, "nonce": nonce}
+
+
+class KeyRing(KeyABC):
+    """Set of keys identified by a key ID (`kid`), allowing keys to be rotated without downtime.
+
+    Tokens are signed with the active key, and carry its ID in their `kid`
+    header. They are verified with the key matching this header, found in
+    constant time, so that states signed before a rotation remain valid.
+
+    Retired keys are kept `retention` seconds after being replaced, which
+    should be at least the expiration of the states, then dropped. Tokens
+    without a `kid` header, signed before the key ring was introduced, are
+    verified with the initial key as long as it is kept.
+
+    Keys are JWT keys, which load their material once, so the key ring itself
+    never parses keys on `encode()` or `decode()`. Tokens whose key is
+    unknown or dropped raise `jwt.InvalidSignatureError`.
+
+    Parameters
+    ----------
+    kid: str
+        The ID of the initial active key.
+    key: KeyABC
+        The initial active key.
+    retention: float, optional
+        Time in seconds retired keys can still verify tokens. Default is 600
+        seconds, the default expiration of states.
+    """
+
+    def __init__(self, kid: str, key: KeyABC, retention: float = 600) -> None:
+        self._check(key)
+        self.retention = retention
+        self._initial_kid = kid
+        self._active_kid = kid
+        # Replaced as a whole on rotation, so that lookups never need the lock
+        self._keys: dict[str, tuple[KeyABC, float | None]] = {kid: (key, None)}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, kid: str) -> bool:
+        return self._lookup(kid) is not None
+
+    def __getstate__(self) -> dict[str, Any]:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _check(key: KeyABC) -> None:
+        """Raise `ValueError` if `key` cannot be used in a key ring."""
+        if isinstance(key, (CompactKey, KeyRing)):
+            raise ValueError(f"{key.__class__.__name__} cannot be used in a key ring")
+
+    @property
+    def algorithm(self) -> str:
+        """The algorithm of the active key."""
+        return self._keys[self._active_kid][0].algorithm
+
+    @property
+    def active_kid(self) -> str:
+        """The ID of the active key."""
+        return self._active_kid
+
+    def _lookup(self, kid: str) -> KeyABC | None:
+        """Return the key of `kid`, `None` if it is unknown or its retention is over."""
+        entry = self._keys.get(kid)
+        if entry is None or (entry[1] is not None and entry[1] <= time.time()):
+            return None
+        return entry[0]
+
+    def rotate(self, kid: str, key: KeyABC) -> None:
+        """Sign the next tokens with `key`, retiring the active key.
+
+        The retired key still verifies tokens for `retention` seconds. Keys
+        whose retention is over are dropped.
+
+        Raises
+        ------
+        ValueError
+            If `kid` is already used by a key of the ring.
+        """
+        self._check(key)
+        with self._lock:
+            now = time.time()
+            keys = {k: v for k, v in self._keys.items() if v[1] is None or v[1] > now}
+            if kid in keys:
+                raise ValueError(f"Key ID '{kid}' is already used.")
+            keys[self._active_kid] = (keys[self._active_kid][0], now + self.retention)
+            keys[kid] = (key, None)
+            self._keys, self._active_kid = keys, kid
+
+    def encode(self, payload: dict, headers: dict | None = None) -> str:
+        """Encode a payload into a JWT signed with the active key, with its `kid` header."""
+        kid = self._active_kid
+        return self._keys[kid][0].encode(payload, headers={**(headers or {}), "kid": kid})
+
+    def decode(self, token: str) -> dict:
+        """Decode a JWT with the key of its `kid` header."""
+        import jwt
+
+        kid = jwt.get_unverified_header(token).get("kid", self._initial_kid)
+        if (key := self._lookup(kid)) is None:
+            raise jwt.InvalidSignatureError(f"Unknown or retired key ID '{kid}'")
+        return key.decode(token)
@@ -0,0 +1,217 @@
+import abc
+import hashlib
+import heapq
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Any
+
+from eternaltwin.stores import SQLiteMixin
+
+__all__ = ["NonceTrackerABC", "MemoryNonceTracker", "BloomNonceTracker", "SQLiteNonceTracker"]
+
+
+class NonceTrackerABC(abc.ABC):
+    """Base class for trackers of consumed states, protecting against replays.
+
+    Given as the `nonce_tracker` of a connection, `validate_state()` consumes
+    the nonce of every state it validates, and rejects the states whose nonce
+    has already been consumed. A state is identified by its nonce and its
+    expiration, and is only tracked until it expires, as expired states are
+    rejected anyway. The memory used is therefore bounded by the number of
+    states validated during the expiration window.
+    """
+
+    @abc.abstractmethod
+    def consume(self, nonce: str, exp: int) -> bool:
+        """Mark the state of `nonce` expiring at `exp` as consumed.
+
+        Returns
+        -------
+        bool
+            `True` if it was not consumed yet, `False` if it is a replay.
+        """
+
+
+class BucketedNonceTrackerABC(NonceTrackerABC):
+    """Base class for in-memory trackers grouping states in buckets by expiration.
+
+    States are grouped by slices of `bucket` seconds of their expiration. A
+    bucket is dropped as a whole once every state it contains has expired, so
+    that each consumption only touches a single bucket, in constant time.
+
+    Parameters
+    ----------
+    bucket: int, optional
+        Width of the buckets in seconds. Smaller buckets free memory sooner,
+        at the cost of more buckets. Default is 60 seconds.
+    """
+
+    def __init__(self, bucket: int = 60) -> None:
+        if bucket <= 0:
+            raise ValueError("`bucket` must be positive.")
+        self.bucket = bucket
+        self._buckets: dict[int, Any] = {}
+        self._heap: list[int] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    @abc.abstractmethod
+    def _new_bucket(self) -> Any:
+        """Return a new empty bucket."""
+
+    @abc.abstractmethod
+    def _add(self, bucket: Any, key: bytes) -> bool:
+        """Add `key` to `bucket`, return whether it was absent."""
+
+    def _purge(self) -> None:
+        """Drop the buckets whose states have all expired, the lock must be held."""
+        # States expiring before the current second are expired
+        current = int(time.time()) // self.bucket
+        while self._heap and self._heap[0] < current:
+            del self._buckets[heapq.heappop(self._heap)]
+
+    def consume(self, nonce: str, exp: int) -> bool:
+        """Mark the state of `nonce` expiring at `exp` as consumed.
+
+        Returns
+        -------
+        bool
+            `True` if it was not consumed yet, `False` if it is a replay.
+        """
+        index = exp // self.bucket
+        with self._lock:
+            self._purge()
+            if (bucket := self._buckets.get(index)) is None:
+                bucket = self._buckets[index] = self._new_bucket()
+                heapq.heappush(self._heap, index)
+            return self._add(bucket, f"{exp}:{nonce}".encode())
+
+
+class MemoryNonceTracker(BucketedNonceTrackerABC):
+    """Thread-safe in-memory tracker of consumed states, using a set per bucket.
+
+    Replays are always detected, but states are only tracked within a process.
+
+    Parameters
+    ----------
+    bucket: int, optional
+        Width of the buckets in seconds. Default is 60 seconds.
+    """
+
+    def _new_bucket(self) -> set[bytes]:
+        """Return a new empty bucket."""
+        return set()
+
+    def _add(self, bucket: set[bytes], key: bytes) -> bool:
+        """Add `key` to `bucket`, return whether it was absent."""
+        size = len(bucket)
+        bucket.add(key)
+        return len(bucket) != size
+
+
+class BloomNonceTracker(BucketedNonceTrackerABC):
+    """Thread-safe in-memory tracker of consumed states, using a Bloom filter per bucket.
+
+    Bloom filters use a fixed amount of memory, a few bytes per state instead
+    of the whole nonce, but may report a state that was never consumed as a
+    replay. This happens with a probability of at most `error_rate` as long as
+    no more than `capacity` states expire within the same bucket. Replays are
+    always detected.
+
+    Parameters
+    ----------
+    capacity: int, optional
+        Expected maximum number of states per bucket. Default is 100 000.
+    error_rate: float, optional
+        False positive rate when a bucket holds `capacity` states. Default is
+        0.001.
+    bucket: int, optional
+        Width of the buckets in seconds. Default is 60 seconds.
+    """
+
+    def __init__(self, capacity: int = 100_000, error_rate: float = 0.001, bucket: int = 60) -> None:
+        if not 0 < error_rate < 1:
+            raise ValueError("`error_rate` must be between 0 and 1.")
+        super().__init__(bucket)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self._hashes = max(round(self._bits / capacity * math.log(2)), 1)
+
+    def _new_bucket(self) -> bytearray:
+        """Return a new empty bucket."""
+        return bytearray((self._bits + 7) // 8)
+
+    def _add(self, bucket: bytearray, key: bytes) -> bool:
+        """Add `key` to `bucket`, return whether it was absent."""
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8]), int.from_bytes(digest[8:]) | 1
+        absent = False
+        for i in range(self._hashes):  # Double hashing, see Kirsch & Mitzenmacher
+            position = (h1 + i * h2) % self._bits
+            byte, mask = position >> 3, 1 << (position & 7)
+            if not bucket[byte] & mask:
+                bucket[byte] |= mask
+                absent = True
+        return absent
+
+
+class SQLiteNonceTracker(SQLiteMixin, NonceTrackerABC):
+    """Tracker of consumed states backed by a local SQLite database.
+
+    Every process and thread opening the same file share the same consumed
+    states, which makes it suitable for rejecting replays across the workers
+    of a host. Each consumption is a single atomic statement on an indexed
+    table. Expired states are deleted at most once every `prune_interval`
+    seconds, or with `prune()`.
+
+    Parameters
+    ----------
+    path: str or os.PathLike
+        The path of the database file, created if it does not exist.
+    timeout: float, optional
+        Time in seconds to wait for a lock held by another connection before
+        failing. Default is 5 seconds.
+    prune_interval: float, optional
+        Minimum time in seconds between two automatic deletions of the expired
+        states. Default is 60 seconds.
+    """
+
+    def __init__(self, path: str | os.PathLike, timeout: float = 5, prune_interval: float = 60) -> None:
+        self.prune_interval = prune_interval
+        self._pruned_at = time.monotonic()
+        self._setup(path, timeout)
+
+    def _schema(self, connection: sqlite3.Connection) -> None:
+        """Create the `nonces` table, if it does not exist."""
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS nonces ("
+            "nonce TEXT NOT NULL, "
+            "exp INTEGER NOT NULL, "
+            "PRIMARY KEY (nonce, exp)"
+            ") WITHOUT ROWID"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS nonces_exp ON nonces (exp)")
+
+    def consume(self, nonce: str, exp: int) -> bool:
+        """Mark the state of `nonce` expiring at `exp` as consumed.
+
+        Returns
+        -------
+        bool
+            `True` if it was not consumed yet, `False` if it is a replay.
+        """
+        if time.monotonic() - self._pruned_at >= self.prune_interval:
+            self.prune()
+        cursor = self._connect().execute("INSERT OR IGNORE INTO nonces (nonce, exp) VALUES (?, ?)", (nonce, exp))
+        return cursor.rowcount == 1
+
+    def prune(self) -> int:
+        """Delete the expired states, return how many were deleted."""
+        self._pruned_at = time.monotonic()
+        return self._connect().execute("DELETE FROM nonces WHERE exp < ?", (int(time.time()),)).rowcount
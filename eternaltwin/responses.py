@@ -1,8 +1,44 @@
 import json
-from typing import Any, Mapping, Self
+from typing import TYPE_CHECKING, Any, Callable, Mapping, Self
 
-import aiohttp
-import requests
+if TYPE_CHECKING:
+    import aiohttp
+    import requests
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+__all__ = ["Response", "get_json_decoder", "set_json_decoder"]
+
+JSONDecoder = Callable[[bytes], Any]
+
+_UNSET = object()
+
+
+def _default_json_decoder() -> JSONDecoder:
+    """Return `orjson.loads` if `orjson` is installed, `json.loads` otherwise."""
+    return orjson.loads if orjson is not None else json.loads
+
+
+_json_decoder: JSONDecoder = _default_json_decoder()
+
+
+def get_json_decoder() -> JSONDecoder:
+    """Return the function used by `Response.json()` to decode the content."""
+    return _json_decoder
+
+
+def set_json_decoder(decoder: JSONDecoder | None) -> None:
+    """Set the function used by `Response.json()` to decode the content.
+
+    The function receives the raw content as `bytes`. If `None` is given, the
+    default decoder is restored: `orjson.loads` if `orjson` is installed (see
+    the `fast` extra), `json.loads` otherwise.
+    """
+    global _json_decoder
+    _json_decoder = decoder or _default_json_decoder()
 
 
 class Response:
@@ -13,20 +49,27 @@ class Response:
         self.status_code = status_code
         self.content = content
         self.headers = headers
+        self._json: Any = _UNSET
 
     @classmethod
-    def from_requests(cls, response: requests.Response) -> Self:
+    def from_requests(cls, response: "requests.Response") -> Self:
         """Create a Response from a `requests.Response`."""
         return cls(response.url, response.status_code, response.content, response.headers)
 
     @classmethod
-    async def from_aiohttp(cls, response: aiohttp.ClientResponse) -> Self:
+    async def from_aiohttp(cls, response: "aiohttp.ClientResponse") -> Self:
         """Create a Response from a `aiohttp.ClientResponse`."""
         return cls(str(response.url), response.status, await response.read(), response.headers)
 
     def json(self) -> dict[str, Any]:
-        """Interpret the response content as JSON and return the resulting dict."""
-        return json.loads(self.content.decode())
+        """Interpret the response content as JSON and return the resulting dict.
+
+        The content is only decoded once, subsequent calls return the same
+        object, which must therefore not be modified.
+        """
+        if self._json is _UNSET:
+            self._json = _json_decoder(self.content)
+        return self._json
 
     def __repr__(self) -> str:
         return f"<{self.__class__.__name__} [{self.status_code}]>"
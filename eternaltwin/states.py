@@ -1,10 +1,15 @@
 import secrets
+import threading
 import time
+from collections import deque
 from typing import Any, Self
 
 from eternaltwin.exceptions import InvalidStateError
+from eternaltwin.forks import register_after_fork
 from eternaltwin.keys import KeyABC
 
+__all__ = ["State", "StatePool"]
+
 
 def _generate_nonce(size: int = 128) -> str:
     """Generate a random nonce as an hexadecimal string."""
@@ -14,6 +19,10 @@ def _generate_nonce(size: int = 128) -> str:
 class State:
     """Represents an authorization state.
 
+    States are immutable: they are signed at most once, the first time `jwt` is
+    accessed, and are hashed and compared on their payload. They can therefore
+    be kept in sets or used as dict keys cheaply, whatever the key.
+
     Parameters
     ----------
     a: str
@@ -30,29 +39,47 @@ class State:
         Nonce value.
     key: KeyABC
         Key used to encode the state.
+    jwt: str, optional
+        The state already encoded with `key`, if known, so that it does not
+        have to be signed again.
     """
 
-    def __init__(self, a: str, as_: str, iat: int, rfp: int, exp: int, nonce: str, key: KeyABC):
-        self.a = a
-        self.as_ = as_
-        self.iat = iat
-        self.rfp = rfp
-        self.exp = exp
-        self.nonce = nonce
-        self.key = key
+    __slots__ = ("a", "as_", "iat", "rfp", "exp", "nonce", "key", "_jwt")
+
+    def __init__(self, a: str, as_: str, iat: int, rfp: int, exp: int, nonce: str, key: KeyABC, jwt: str | None = None):
+        for name, value in zip(self.__slots__, (a, as_, iat, rfp, exp, nonce, key, jwt)):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"'{self.__class__.__name__}' object is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"'{self.__class__.__name__}' object is immutable")
+
+    def __reduce__(self) -> tuple[type[Self], tuple]:
+        # Copied and unpickled states are rebuilt with `__init__()`, as slots are read-only
+        return self.__class__, tuple(getattr(self, name) for name in self.__slots__)
+
+    def _fields(self) -> tuple[str, str, int, int, int, str]:
+        """Return the fields of the payload."""
+        return self.a, self.as_, self.iat, self.rfp, self.exp, self.nonce
 
     def __hash__(self) -> int:
-        return hash(self.jwt)
+        return hash(self._fields())
 
     def __eq__(self, other: Any) -> bool:
-        return isinstance(other, self.__class__) and hash(self) == hash(other)
+        return isinstance(other, self.__class__) and self._fields() == other._fields()
+
+    def payload(self) -> dict[str, Any]:
+        """Return the payload encoded in the JWT."""
+        return {"a": self.a, "as": self.as_, "iat": self.iat, "rfp": self.rfp, "exp": self.exp, "nonce": self.nonce}
 
     @property
     def jwt(self) -> str:
-        """Return the state as a JWT."""
-        return self.key.encode(
-            {"a": self.a, "as": self.as_, "iat": self.iat, "rfp": self.rfp, "exp": self.exp, "nonce": self.nonce}
-        )
+        """Return the state as a JWT, signing it on first access."""
+        if self._jwt is None:
+            object.__setattr__(self, "_jwt", self.key.encode(self.payload()))
+        return self._jwt
 
     @classmethod
     def new(cls, url: str, key: KeyABC, expiration: int = 600, nonce: str = None) -> Self:
@@ -92,8 +119,24 @@ class State:
             If action or authorization server does not match, or the JWT is
             expired.
         """
-        payload = key.decode(jwt)
-        state = cls(payload["a"], payload["as"], payload["iat"], payload["rfp"], payload["exp"], payload["nonce"], key)
+        return cls.from_payload(key.decode(jwt), url, key, jwt)
+
+    @classmethod
+    def from_payload(cls, payload: dict[str, Any], url: str, key: KeyABC, jwt: str | None = None) -> Self:
+        """Create a state from the payload of a JWT already decoded with `key`.
+
+        Performs the same checks as `from_jwt()`, for payloads decoded
+        elsewhere, e.g. in an executor.
+
+        Raises
+        ------
+        InvalidStateError
+            If action or authorization server does not match, or the JWT is
+            expired.
+        """
+        state = cls(
+            payload["a"], payload["as"], payload["iat"], payload["rfp"], payload["exp"], payload["nonce"], key, jwt
+        )
 
         if state.a != "authorize":
             raise InvalidStateError(f"Expected action 'authorize', got '{state.a}", state)
@@ -107,3 +150,157 @@ class State:
     def has_expired(self) -> bool:
         """Check if the state has expired."""
         return self.exp < int(time.time())
+
+
+class StatePool:
+    """Thread-safe pool of pre-signed states, refilled in the background.
+
+    Given as the `state_pool` of a connection, `generate_state()` pops a state
+    from the pool instead of signing a new one, unless a `nonce` or another
+    `expiration` is requested. A daemon thread, started on the first pop,
+    signs new states whenever fewer than `low_water` remain. States expiring
+    in less than `min_remaining` seconds are discarded. If the pool is empty,
+    states are signed on demand as usual.
+
+    A pool is bound to the URL and key of the connection it is given to, each
+    alias must have its own pool.
+
+    A process forked from a process using the pool (e.g., the workers of a
+    prefork server) starts with an empty pool and its own background thread.
+
+    Parameters
+    ----------
+    size: int, optional
+        Number of states signed in advance. Default is 64.
+    low_water: int, optional
+        Number of remaining states below which the pool is refilled. Default
+        is 16.
+    expiration: int, optional
+        Expiration time of the states in seconds. Default is 600 seconds, as
+        `generate_state()`.
+    min_remaining: int, optional
+        Minimum time in seconds before their expiration for states to be
+        handed out. Default is 60 seconds.
+
+    Attributes
+    ----------
+    hits: int
+        Number of states handed out from the pool.
+    misses: int
+        Number of pops that found the pool empty.
+    discarded: int
+        Number of states discarded because they were about to expire.
+    """
+
+    def __init__(self, size: int = 64, low_water: int = 16, expiration: int = 600, min_remaining: int = 60) -> None:
+        if not 0 <= low_water <= size:
+            raise ValueError("`low_water` must be between 0 and `size`.")
+        if not 0 <= min_remaining < expiration:
+            raise ValueError("`min_remaining` must be between 0 and `expiration`.")
+        self.size = size
+        self.low_water = low_water
+        self.expiration = expiration
+        self.min_remaining = min_remaining
+        self.hits = 0
+        self.misses = 0
+        self.discarded = 0
+        self._states: deque[State] = deque()
+        self._condition = threading.Condition()
+        self._url: str | None = None
+        self._key: KeyABC | None = None
+        self._thread: threading.Thread | None = None
+        self._closed = False
+        register_after_fork(self)
+
+    def _after_fork(self) -> None:
+        """Empty the pool in the child process, and let it start its own background thread.
+
+        The states signed by the parent are dropped, as they are also held by
+        the parent and its other children: handing them out would give the
+        same state (and nonce) to several users.
+        """
+        self._states = deque()
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def bind(self, url: str, key: KeyABC) -> None:
+        """Bind the pool to the URL and key its states are created with.
+
+        Raises
+        ------
+        ValueError
+            If the pool is already bound to another URL.
+        """
+        with self._condition:
+            if self._url is not None and self._url != url:
+                raise ValueError(f"This pool is already used for '{self._url}', each alias must have its own pool.")
+            self._url, self._key = url, key
+
+    def _purge(self) -> None:
+        """Discard the states about to expire, the lock must be held."""
+        deadline = time.time() + self.min_remaining
+        while self._states and self._states[0].exp < deadline:
+            self._states.popleft()
+            self.discarded += 1
+
+    def pop(self) -> State | None:
+        """Return a pre-signed state, `None` if the pool is empty."""
+        with self._condition:
+            self._purge()
+            state = self._states.popleft() if self._states else None
+            if state is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            if len(self._states) < self.low_water:
+                self._condition.notify()
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(target=self._run, name="eternaltwin-state-pool", daemon=True)
+                self._thread.start()
+        return state
+
+    def fill(self) -> int:
+        """Sign states until the pool holds `size` of them, return how many were added.
+
+        Called by the background thread, it can also be called to fill the pool
+        ahead of the first request.
+
+        Raises
+        ------
+        ValueError
+            If the pool has not been given to a connection yet.
+        """
+        if self._url is None:
+            raise ValueError("This pool is not bound to any connection.")
+        added = 0
+        while len(self._states) < self.size and not self._closed:
+            state = State.new(self._url, self._key, self.expiration)
+            state.jwt  # Sign the state outside the lock
+            with self._condition:
+                self._states.append(state)
+            added += 1
+        return added
+
+    def _run(self) -> None:
+        """Refill the pool whenever it goes below `low_water`."""
+        # Wake up regularly to replace the states about to expire
+        interval = max((self.expiration - self.min_remaining) / 4, 1)
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._closed or len(self._states) < self.low_water, interval)
+                if self._closed:
+                    return
+                self._purge()
+            if len(self._states) < self.low_water:
+                self.fill()
+
+    def close(self) -> None:
+        """Stop the background thread, the remaining states can still be popped."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
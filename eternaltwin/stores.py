@@ -0,0 +1,207 @@
+import abc
+import os
+import sqlite3
+import threading
+import time
+
+from eternaltwin.tokens import Token
+
+__all__ = ["TokenStoreABC", "MemoryTokenStore", "SQLiteTokenStore"]
+
+
+class TokenStoreABC(abc.ABC):
+    """Base class for stores sharing tokens between requests, keyed by session ID.
+
+    Stores keep tokens until they are deleted, even once expired, as long as
+    they can be refreshed. Expired tokens without a refresh token are never
+    returned, and are removed by `prune()`.
+    """
+
+    @staticmethod
+    def _is_usable(token: Token) -> bool:
+        """Return whether `token` can still be used or refreshed."""
+        return token.refresh_token is not None or not token.has_expired()
+
+    @abc.abstractmethod
+    def get(self, session_id: str) -> Token | None:
+        """Return the token of `session_id`, `None` if there is none."""
+
+    @abc.abstractmethod
+    def set(self, session_id: str, token: Token) -> None:
+        """Store `token` for `session_id`, replacing the previous one if any."""
+
+    @abc.abstractmethod
+    def delete(self, session_id: str) -> None:
+        """Delete the token of `session_id`, if any."""
+
+    @abc.abstractmethod
+    def prune(self) -> int:
+        """Delete the expired tokens that cannot be refreshed, return how many were deleted."""
+
+
+class MemoryTokenStore(TokenStoreABC):
+    """Thread-safe in-memory implementation of `TokenStoreABC`.
+
+    Tokens are only shared between the threads of a process. Stored tokens are
+    copies, modifying a token after storing it does not affect the store.
+    """
+
+    def __init__(self) -> None:
+        self._tokens: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    def get(self, session_id: str) -> Token | None:
+        """Return the token of `session_id`, `None` if there is none."""
+        data = self._tokens.get(session_id)
+        if data is None:
+            return None
+        token = Token.from_dict(data)
+        return token if self._is_usable(token) else None
+
+    def set(self, session_id: str, token: Token) -> None:
+        """Store `token` for `session_id`, replacing the previous one if any."""
+        with self._lock:
+            self._tokens[session_id] = token.to_dict()
+
+    def delete(self, session_id: str) -> None:
+        """Delete the token of `session_id`, if any."""
+        with self._lock:
+            self._tokens.pop(session_id, None)
+
+    def prune(self) -> int:
+        """Delete the expired tokens that cannot be refreshed, return how many were deleted."""
+        with self._lock:
+            expired = [k for k, v in self._tokens.items() if not self._is_usable(Token.from_dict(v))]
+            for session_id in expired:
+                del self._tokens[session_id]
+        return len(expired)
+
+
+class SQLiteMixin:
+    """Mixin handling the connections to a local SQLite database.
+
+    The database uses write-ahead logging, so that reads are never blocked by
+    writes, and every write is a single atomic statement. Each thread (and each
+    process, after a fork) uses its own connection.
+
+    Subclasses call `_setup()` from their `__init__()`, and implement
+    `_schema()` to create their tables.
+    """
+
+    path: str
+    timeout: float
+
+    def _setup(self, path: str | os.PathLike, timeout: float) -> None:
+        """Initialize the connection handling, and create the schema."""
+        self.path = os.fspath(path)
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: list[sqlite3.Connection] = []
+        self._generation = 0
+        self._pid = os.getpid()
+        with self._connect() as connection:
+            self._schema(connection)
+
+    @abc.abstractmethod
+    def _schema(self, connection: sqlite3.Connection) -> None:
+        """Create the tables used by the subclass, if they do not exist."""
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return the connection of the current thread, opening it if needed."""
+        if self._pid != os.getpid():  # The connections inherited from a fork belong to the parent
+            with self._lock:
+                self._connections, self._pid = [], os.getpid()
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid() or self._local.generation != self._generation:
+            # Connections must not be shared with a forked child, nor used once closed
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            with self._lock:
+                self._connections.append(connection)
+            self._local.connection, self._local.pid, self._local.generation = connection, os.getpid(), self._generation
+        return connection
+
+    def close(self) -> None:
+        """Close the connections opened by the current process.
+
+        The instance can still be used afterward, new connections will be
+        opened on the next operation.
+        """
+        with self._lock:
+            connections = self._connections if self._pid == os.getpid() else []
+            self._connections, self._pid = [], os.getpid()
+            self._generation += 1
+        for connection in connections:
+            connection.close()
+
+
+class SQLiteTokenStore(SQLiteMixin, TokenStoreABC):
+    """Implementation of `TokenStoreABC` backed by a local SQLite database.
+
+    Every process and thread opening the same file share the same tokens, which
+    makes it suitable for sharing tokens between the workers of a host without
+    an external service. Connections to the database are handled as described
+    in `SQLiteMixin`.
+
+    Parameters
+    ----------
+    path: str or os.PathLike
+        The path of the database file, created if it does not exist.
+    timeout: float, optional
+        Time in seconds to wait for a lock held by another connection before
+        failing. Default is 5 seconds.
+    """
+
+    def __init__(self, path: str | os.PathLike, timeout: float = 5) -> None:
+        self._setup(path, timeout)
+
+    def _schema(self, connection: sqlite3.Connection) -> None:
+        """Create the `tokens` table, if it does not exist."""
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS tokens ("
+            "session_id TEXT PRIMARY KEY, "
+            "access_token TEXT NOT NULL, "
+            "refresh_token TEXT, "
+            "expiration INTEGER NOT NULL, "
+            "token_type TEXT NOT NULL"
+            ")"
+        )
+
+    def get(self, session_id: str) -> Token | None:
+        """Return the token of `session_id`, `None` if there is none."""
+        row = (
+            self._connect()
+            .execute(
+                "SELECT access_token, refresh_token, expiration, token_type FROM tokens WHERE session_id = ?",
+                (session_id,),
+            )
+            .fetchone()
+        )
+        if row is None:
+            return None
+        token = Token.from_dict(dict(zip(("access_token", "refresh_token", "expiration", "token_type"), row)))
+        return token if self._is_usable(token) else None
+
+    def set(self, session_id: str, token: Token) -> None:
+        """Store `token` for `session_id`, replacing the previous one if any."""
+        self._connect().execute(
+            "INSERT OR REPLACE INTO tokens (session_id, access_token, refresh_token, expiration, token_type) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (session_id, token.access_token, token.refresh_token, token.expiration, token.token_type),
+        )
+
+    def delete(self, session_id: str) -> None:
+        """Delete the token of `session_id`, if any."""
+        self._connect().execute("DELETE FROM tokens WHERE session_id = ?", (session_id,))
+
+    def prune(self) -> int:
+        """Delete the expired tokens that cannot be refreshed, return how many were deleted."""
+        cursor = self._connect().execute(
+            "DELETE FROM tokens WHERE refresh_token IS NULL AND expiration <= ?", (int(time.time()),)
+        )
+        return cursor.rowcount
@@ -0,0 +1,150 @@
+import codecs
+import json
+from typing import Any
+
+__all__ = ["JSONStreamParser"]
+
+_WHITESPACES = " \t\n\r"
+_DELIMITERS = ",]}" + _WHITESPACES
+
+
+class JSONStreamParser:
+    """Incremental parser for JSON objects holding an array of items.
+
+    Parse a JSON object fed chunk by chunk, returning the items of the array
+    found under `key` as soon as they are complete. The other members of the
+    object are parsed entirely and stored in `fields`.
+
+    Only the current chunk and the item being parsed are held in memory.
+
+    Examples
+    --------
+    ```python
+    parser = JSONStreamParser("items")
+    parser.feed(b'{"count": 2, "items": [{"id": 1}, {"i')  # [{"id": 1}]
+    parser.feed(b'd": 2}]}')  # [{"id": 2}]
+    parser.close()
+    parser.fields  # {"count": 2}
+    ```
+
+    Parameters
+    ----------
+    key: str
+        The key of the array whose items must be streamed.
+    """
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+        self.fields: dict[str, Any] = {}
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._scan = json.JSONDecoder().raw_decode
+        self._buffer = ""
+        self._pos = 0
+        self._state = "start"
+        self._member: str | None = None
+
+    def _error(self, message: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(message, self._buffer, self._pos)
+
+    def _value(self, final: bool) -> tuple[bool, Any]:
+        """Try to parse the value at the current position.
+
+        A number may be truncated (e.g., `12` of `12.5`), so numbers are only
+        accepted once followed by a delimiter, or when the whole content has
+        been received.
+        """
+        try:
+            value, end = self._scan(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            return False, None
+        number = self._buffer[self._pos] in "-0123456789"
+        if number and not final and (end == len(self._buffer) or self._buffer[end] not in _DELIMITERS):
+            return False, None
+        self._pos = end
+        return True, value
+
+    def _step(self, items: list[Any], final: bool) -> bool:
+        """Consume the next token, return whether the parser made any progress."""
+        while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACES:
+            self._pos += 1
+        if self._pos == len(self._buffer):
+            return False
+        char, state = self._buffer[self._pos], self._state
+
+        if state == "start" and char == "{":
+            self._state = "member_or_end"
+        elif state in ("member", "member_or_end") and char == '"':
+            parsed, self._member = self._value(final)
+            if not parsed:
+                return False
+            self._state = "colon"
+            return True
+        elif state == "member_or_end" and char == "}":
+            self._state = "end"
+        elif state == "colon" and char == ":":
+            self._state = "array" if self._member == self.key else "field"
+        elif state == "field":
+            parsed, value = self._value(final)
+            if not parsed:
+                return False
+            self.fields[self._member] = value
+            self._state = "member_separator"
+            return True
+        elif state == "array" and char == "[":
+            self._state = "item_or_end"
+        elif state in ("item", "item_or_end") and not (state == "item_or_end" and char == "]"):
+            parsed, value = self._value(final)
+            if not parsed:
+                return False
+            items.append(value)
+            self._state = "item_separator"
+            return True
+        elif state in ("item_or_end", "item_separator") and char == "]":
+            self._state = "member_separator"
+        elif state == "item_separator" and char == ",":
+            self._state = "item"
+        elif state == "member_separator" and char == ",":
+            self._state = "member"
+        elif state == "member_separator" and char == "}":
+            self._state = "end"
+        else:
+            raise self._error(f"Unexpected character {char!r}")
+        self._pos += 1
+        return True
+
+    def _parse(self, final: bool) -> list[Any]:
+        """Parse as much of the buffer as possible, discarding what has been consumed."""
+        items = []
+        while self._step(items, final):
+            pass
+        self._buffer, self._pos = self._buffer[self._pos :], 0
+        return items
+
+    def feed(self, data: bytes) -> list[Any]:
+        """Feed a chunk of the content, returning the items completed by it.
+
+        Raises
+        ------
+        json.JSONDecodeError
+            If the content is not a valid JSON object.
+        """
+        self._buffer += self._decoder.decode(data)
+        return self._parse(final=False)
+
+    def close(self) -> None:
+        """Signal the end of the content.
+
+        Items are always followed by the end of their array, so that every
+        item has already been returned by `feed()`.
+
+        Raises
+        ------
+        json.JSONDecodeError
+            If the content is not a valid and complete JSON object.
+        """
+        self._buffer += self._decoder.decode(b"", final=True)
+        self._parse(final=True)
+        if self._state != "end" or self._buffer:
+            raise self._error("Incomplete JSON object" if self._state != "end" else "Extra data")
@@ -1,14 +1,19 @@
+import random
 import time
+from typing import Any, Self
 
 
 class Token:
     """Hold information about a token received from the authorization endpoint."""
 
+    __slots__ = ("access_token", "refresh_token", "expiration", "token_type", "_jitter")
+
     def __init__(self, *, access_token: str, expires_in: int, token_type: str, refresh_token: str = None):
         self.access_token = access_token
         self.refresh_token = refresh_token
         self.expiration = int(time.time()) + expires_in - 60  # Remove a 60 seconds leeway
         self.token_type = token_type
+        self._jitter = random.random()  # Spread the refreshes of tokens expiring at the same time
 
     def __repr__(self) -> str:
         return (
@@ -20,6 +25,42 @@ class Token:
             f")"
         )
 
+    def to_dict(self) -> dict[str, Any]:
+        """Return the token as a JSON serializable dict, loadable with `from_dict()`."""
+        return {
+            "access_token": self.access_token,
+            "refresh_token": self.refresh_token,
+            "expiration": self.expiration,
+            "token_type": self.token_type,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Self:
+        """Create a token from a dict returned by `to_dict()`, keeping its expiration."""
+        token = cls.__new__(cls)
+        token.access_token = data["access_token"]
+        token.refresh_token = data["refresh_token"]
+        token.expiration = data["expiration"]
+        token.token_type = data["token_type"]
+        token._jitter = random.random()
+        return token
+
     def has_expired(self) -> bool:
         """Check if the token has expired."""
         return int(time.time()) >= self.expiration
+
+    def needs_refresh(self, leeway: float = 0, jitter: float = 0) -> bool:
+        """Check if the token should be refreshed.
+
+        The token should be refreshed `leeway` seconds before its expiration,
+        plus a random fraction of `jitter` seconds drawn once per token, so that
+        tokens expiring at the same time are not all refreshed at once.
+        """
+        return time.time() >= self.expiration - leeway - jitter * self._jitter
+
+    def update(self, other: Self) -> None:
+        """Update this token in place with the values of `other`, e.g. after a refresh."""
+        self.access_token = other.access_token
+        self.refresh_token = other.refresh_token
+        self.expiration = other.expiration
+        self.token_type = other.token_type
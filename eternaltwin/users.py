@@ -1,28 +1,66 @@
+import asyncio
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, Self
+from typing import Any, AsyncIterator, Iterable, Iterator, Self
 
+from eternaltwin.clients.abc.clients import ClientABC
 from eternaltwin.connections import async_connections, connections
+from eternaltwin.exceptions import RequestError
+from eternaltwin.stores import TokenStoreABC
 from eternaltwin.tokens import Token
 
 
 class User:
-    """Represents a user."""
+    """Represents a user.
+
+    `created_at` and `deleted_at` can be given as ISO 8601 strings, they are
+    only parsed into `datetime` the first time they are accessed.
+
+    `using` is the name of the connection the user has been retrieved with.
+    """
+
+    __slots__ = ("identifier", "username", "is_administrator", "_created_at", "_deleted_at", "token", "using")
 
     def __init__(
         self,
         identifier: str,
         username: str,
         is_administrator: bool | None,
-        created_at: datetime | None,
-        deleted_at: datetime | None,
+        created_at: datetime | str | None,
+        deleted_at: datetime | str | None,
         token: Token | None = None,
+        using: str | None = None,
     ) -> None:
         self.identifier = identifier
         self.username = username
         self.is_administrator = is_administrator
-        self.created_at = created_at
-        self.deleted_at = deleted_at
+        self._created_at = created_at
+        self._deleted_at = deleted_at
         self.token = token
+        self.using = using
+
+    @property
+    def created_at(self) -> datetime | None:
+        """When the user was created."""
+        if isinstance(self._created_at, str):
+            self._created_at = datetime.fromisoformat(self._created_at)
+        return self._created_at
+
+    @created_at.setter
+    def created_at(self, value: datetime | str | None) -> None:
+        self._created_at = value
+
+    @property
+    def deleted_at(self) -> datetime | None:
+        """When the user was deleted, `None` if they were not."""
+        if isinstance(self._deleted_at, str):
+            self._deleted_at = datetime.fromisoformat(self._deleted_at)
+        return self._deleted_at
+
+    @deleted_at.setter
+    def deleted_at(self, value: datetime | str | None) -> None:
+        self._deleted_at = value
 
     def __str__(self) -> str:
         return f"<User {self.username}>"
@@ -35,7 +73,8 @@ class User:
             f"    is_administrator={self.is_administrator!r},"
             f"    created_at={self.created_at!r},"
             f"    deleted_at={self.deleted_at!r},"
-            f"    token={self.token!r}"
+            f"    token={self.token!r},"
+            f"    using={self.using!r}"
             f")"
         )
 
@@ -49,14 +88,18 @@ class User:
             identifier=data["id"],
             username=data["display_name"]["current"]["value"],
             is_administrator=data.get("is_administrator", None),
-            created_at=data.get("created_at") and datetime.fromisoformat(data["created_at"]),
-            deleted_at=data.get("deleted_at") and datetime.fromisoformat(data["deleted_at"]),
+            created_at=data.get("created_at") or None,
+            deleted_at=data.get("deleted_at") or None,
+            using=using,
         )
 
     @classmethod
     def start_authorization(cls, expiration: int = 600, nonce: str = None, using: str = None) -> tuple[str, str]:
         """Start the authorization process, returning a state and an authorization URL.
 
+        If the connection has a `state_pool`, a state signed in advance is used
+        when possible (see `ClientABC.generate_state()`).
+
         Parameters
         ----------
         expiration: int, optional
@@ -79,21 +122,102 @@ class User:
         return state, url
 
     @classmethod
-    def from_token(cls, token: Token, using: str | None = None) -> Self:
-        """Retrieve the user associated with the provided token."""
-        data = connections.get_connection(using).users.me(token=token).json()
+    async def astart_authorization(cls, expiration: int = 600, nonce: str = None, using: str = None) -> tuple[str, str]:
+        """Start the authorization process, returning a state and an authorization URL.
+
+        The state is signed in the `state_executor` of the connection, see
+        `Eternaltwin.agenerate_state()`. Parameters are the same as
+        `start_authorization()`.
+        """
+        client = async_connections.get_connection(using)
+        state = await client.agenerate_state(expiration, nonce)
+        url = client.authorization_url(state=state)
+        return state, url
+
+    @classmethod
+    def from_token(cls, token: Token, using: str | None = None, use_cache: bool = True) -> Self:
+        """Retrieve the user associated with the provided token.
+
+        The token is refreshed in place beforehand if it is about to expire
+        (see `TokenClient.ensure_fresh()`). If the connection has an
+        `auth_cache`, the user is retrieved from it when possible, unless
+        `use_cache` is False.
+        """
+        client = connections.get_connection(using)
+        client.tokens.ensure_fresh(token)
+        data = client.users.me(token=token, use_cache=use_cache).json()
         user = cls._from_response(using, data["user"])
         user.token = token
         return user
 
     @classmethod
-    async def afrom_token(cls, token: Token, using: str | None = None) -> Self:
-        """Retrieve the user associated with the provided token."""
-        data = (await async_connections.get_connection(using).users.me(token=token)).json()
+    async def afrom_token(cls, token: Token, using: str | None = None, use_cache: bool = True) -> Self:
+        """Retrieve the user associated with the provided token.
+
+        The token is refreshed in place beforehand if it is about to expire
+        (see `TokenClient.ensure_fresh()`). If the connection has an
+        `auth_cache`, the user is retrieved from it when possible, unless
+        `use_cache` is False.
+        """
+        client = async_connections.get_connection(using)
+        await client.tokens.ensure_fresh(token)
+        data = (await client.users.me(token=token, use_cache=use_cache)).json()
         user = cls._from_response(using, data["user"])
         user.token = token
         return user
 
+    @staticmethod
+    def _token_store(client: ClientABC, using: str | None) -> TokenStoreABC:
+        if client.token_store is None:
+            raise ValueError(f"Connection '{using or 'default'}' has no `token_store`.")
+        return client.token_store
+
+    @classmethod
+    def from_session(cls, session_id: str, using: str | None = None) -> Self | None:
+        """Retrieve the user whose token is stored for `session_id`.
+
+        The token is retrieved from the connection's `token_store`, and stored
+        back if it had to be refreshed. Return `None` if there is no token for
+        this session.
+        """
+        store = cls._token_store(connections.get_connection(using), using)
+        token = store.get(session_id)
+        if token is None:
+            return None
+        access_token = token.access_token
+        user = cls.from_token(token, using)
+        if token.access_token != access_token:
+            store.set(session_id, token)
+        return user
+
+    @classmethod
+    async def afrom_session(cls, session_id: str, using: str | None = None) -> Self | None:
+        """Retrieve the user whose token is stored for `session_id`.
+
+        The token is retrieved from the connection's `token_store`, and stored
+        back if it had to be refreshed. Return `None` if there is no token for
+        this session.
+        """
+        store = cls._token_store(async_connections.get_connection(using), using)
+        token = store.get(session_id)
+        if token is None:
+            return None
+        access_token = token.access_token
+        user = await cls.afrom_token(token, using)
+        if token.access_token != access_token:
+            store.set(session_id, token)
+        return user
+
+    def save_session(self, session_id: str, using: str | None = None) -> None:
+        """Store the user's token for `session_id` in the connection's `token_store`.
+
+        The user can then be retrieved by any worker sharing the store with
+        `User.from_session()`.
+        """
+        if self.token is None:
+            raise ValueError("Cannot save the session of an unauthenticated user.")
+        self._token_store(connections.get_connection(using), using).set(session_id, self.token)
+
     @classmethod
     def from_authorization_code(
         cls, authorization_code: str, callback_state: str, expected_state: str | None = None, using: str | None = None
@@ -126,7 +250,8 @@ class User:
         Validate the state received from the authorization server.
 
         An expected state can be provided to check if the state received from the
-        authorization server matches the expected one.
+        authorization server matches the expected one. The state is verified in
+        the `state_executor` of the connection.
 
         Raises
         ------
@@ -136,22 +261,114 @@ class User:
             provided).
         """
         client = async_connections.get_connection(using)
-        client.validate_state(callback_state, expected_state)
+        await client.avalidate_state(callback_state, expected_state)
         token = await async_connections.get_connection(using).token(authorization_code)
         return await cls.afrom_token(token, using)
 
     @classmethod
-    def get(cls, user_id: str, using: str | None = None) -> Self:
-        """Retrieve a specific user."""
-        data = connections.get_connection(using).users.get(user_id=user_id).json()
+    def get(cls, user_id: str, using: str | None = None, use_cache: bool = True) -> Self:
+        """Retrieve a specific user.
+
+        If the connection has a `user_cache`, the user is retrieved from it
+        when possible, unless `use_cache` is False.
+        """
+        data = connections.get_connection(using).users.get(user_id=user_id, use_cache=use_cache).json()
         return cls._from_response(using, data)
 
     @classmethod
-    async def aget(cls, user_id: str, using: str | None = None) -> Self:
-        """Retrieve a specific user."""
-        data = (await async_connections.get_connection(using).users.get(user_id=user_id)).json()
+    async def aget(cls, user_id: str, using: str | None = None, use_cache: bool = True) -> Self:
+        """Retrieve a specific user.
+
+        If the connection has a `user_cache`, the user is retrieved from it
+        when possible, unless `use_cache` is False.
+        """
+        client = async_connections.get_connection(using)
+        data = (await client.users.get(user_id=user_id, use_cache=use_cache)).json()
         return cls._from_response(using, data)
 
+    @classmethod
+    def get_many(
+        cls, user_ids: Iterable[str], concurrency: int = 10, using: str | None = None, use_cache: bool = True
+    ) -> list[Self | RequestError]:
+        """Retrieve several users concurrently, using a pool of threads.
+
+        Duplicated IDs are only retrieved once.
+
+        Parameters
+        ----------
+        user_ids: Iterable[str]
+            The IDs of the users to retrieve.
+        concurrency: int, optional
+            The maximum number of requests sent concurrently, default to `10`.
+        using: str, optional
+            The name of the connection to use, default to `None` for the default
+            connection.
+        use_cache: bool, optional
+            Whether the `user_cache` of the connection can be used, default to
+            `True`.
+
+        Return
+        ------
+        list[User | RequestError]
+            The users in the same order as `user_ids`. Users that could not be
+            retrieved (e.g., unknown IDs) are replaced by the `RequestError`
+            raised while retrieving them.
+        """
+        user_ids = list(user_ids)
+        unique = list(dict.fromkeys(user_ids))
+
+        def fetch(user_id: str) -> Self | RequestError:
+            try:
+                return cls.get(user_id, using, use_cache)
+            except RequestError as error:
+                return error
+
+        with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(unique)))) as executor:
+            users = dict(zip(unique, executor.map(fetch, unique)))
+        return [users[user_id] for user_id in user_ids]
+
+    @classmethod
+    async def aget_many(
+        cls, user_ids: Iterable[str], concurrency: int = 10, using: str | None = None, use_cache: bool = True
+    ) -> list[Self | RequestError]:
+        """Retrieve several users concurrently.
+
+        Duplicated IDs are only retrieved once.
+
+        Parameters
+        ----------
+        user_ids: Iterable[str]
+            The IDs of the users to retrieve.
+        concurrency: int, optional
+            The maximum number of requests sent concurrently, default to `10`.
+        using: str, optional
+            The name of the connection to use, default to `None` for the default
+            connection.
+        use_cache: bool, optional
+            Whether the `user_cache` of the connection can be used, default to
+            `True`.
+
+        Return
+        ------
+        list[User | RequestError]
+            The users in the same order as `user_ids`. Users that could not be
+            retrieved (e.g., unknown IDs) are replaced by the `RequestError`
+            raised while retrieving them.
+        """
+        user_ids = list(user_ids)
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def fetch(user_id: str) -> Self | RequestError:
+            async with semaphore:
+                try:
+                    return await cls.aget(user_id, using, use_cache)
+                except RequestError as error:
+                    return error
+
+        async with asyncio.TaskGroup() as group:
+            tasks = {user_id: group.create_task(fetch(user_id)) for user_id in dict.fromkeys(user_ids)}
+        return [tasks[user_id].result() for user_id in user_ids]
+
     @classmethod
     def search(cls, query: str | None = None, limit: int = 20, offset: int = 0, using: str | None = None) -> list[Self]:
         """Search for users matching the query.
@@ -186,6 +403,231 @@ class User:
         response = await async_connections.get_connection(using).users.search(query=query, limit=limit, offset=offset)
         return [cls._from_response(using, user) for user in response.json()["items"]]
 
+    @classmethod
+    def iter_search(cls, query: str | None = None, page_size: int = 100, using: str | None = None) -> Iterator[Self]:
+        """Iterate over every user matching the query, page by page.
+
+        The next page is retrieved in a background thread while the current one
+        is being consumed, and only these two pages are held in memory.
+
+        Parameters
+        ----------
+        query: str, optional
+            An optional query to use against the user's username, default to `None`.
+        page_size: int, optional
+            The number of users retrieved per request, default to `100`.
+        using: str, optional
+            The name of the connection to use, default to `None` for the default
+            connection.
+        """
+        client = connections.get_connection(using)
+        offset = 0
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            page = executor.submit(client.users.search, query=query, limit=page_size, offset=offset)
+            while page is not None:
+                data = page.result().json()
+                items = data["items"]
+                offset += len(items)
+                page = None
+                if items and offset < data["count"]:
+                    page = executor.submit(client.users.search, query=query, limit=page_size, offset=offset)
+                for item in items:
+                    yield cls._from_response(using, item)
+
+    @classmethod
+    async def aiter_search(
+        cls, query: str | None = None, page_size: int = 100, using: str | None = None, stream: bool = False
+    ) -> AsyncIterator[Self]:
+        """Iterate over every user matching the query, page by page.
+
+        The next page is retrieved in a background task while the current one
+        is being consumed, and only these two pages are held in memory.
+
+        With `stream`, each page is instead parsed incrementally as it is
+        received (see `UserClient.search_stream()`), and users are yielded as
+        soon as they are parsed. Only one user is held in memory at a time,
+        but pages are retrieved one after the other.
+
+        Parameters
+        ----------
+        query: str, optional
+            An optional query to use against the user's username, default to `None`.
+        page_size: int, optional
+            The number of users retrieved per request, default to `100`.
+        using: str, optional
+            The name of the connection to use, default to `None` for the default
+            connection.
+        stream: bool, optional
+            Whether to parse pages incrementally, default to `False`.
+        """
+        client = async_connections.get_connection(using)
+        offset = 0
+        if stream:
+            count = None
+            while count is None or offset < count:
+                fields, received = {}, 0
+                page = client.users.search_stream(query=query, limit=page_size, offset=offset, fields=fields)
+                async with contextlib.aclosing(page):
+                    async for item in page:
+                        received += 1
+                        yield cls._from_response(using, item)
+                if not received:
+                    break
+                offset += received
+                count = fields["count"]
+            return
+
+        page = asyncio.ensure_future(client.users.search(query=query, limit=page_size, offset=offset))
+        try:
+            while page is not None:
+                data = (await page).json()
+                items = data["items"]
+                offset += len(items)
+                page = None
+                if items and offset < data["count"]:
+                    page = asyncio.ensure_future(client.users.search(query=query, limit=page_size, offset=offset))
+                for item in items:
+                    yield cls._from_response(using, item)
+        finally:
+            if page is not None:
+                page.cancel()
+
+    @classmethod
+    async def acrawl(
+        cls,
+        query: str | None = None,
+        page_size: int = 100,
+        concurrency: int = 8,
+        overlap: int = 0,
+        using: str | None = None,
+    ) -> AsyncIterator[Self]:
+        """Iterate over every user matching the query, fetching pages concurrently.
+
+        The first page gives the number of users, which is then split in
+        disjoint offset ranges fetched with up to `concurrency` requests at the
+        same time. Users are yielded as their page arrives, so they are not
+        sorted. If EternalTwin returns fewer users per page than `page_size`,
+        the offsets advance by the number of users returned instead.
+
+        Users created or deleted during the crawl shift the others between
+        pages. Users are deduplicated on their identifier, so that a user
+        shifting to a page not fetched yet is only yielded once, and pages
+        reported after the initial count are fetched at the end. `overlap`
+        can be used to also catch users shifting to a page already fetched.
+
+        Parameters
+        ----------
+        query: str, optional
+            An optional query to use against the user's username, default to `None`.
+        page_size: int, optional
+            The number of users retrieved per request, default to `100`.
+        concurrency: int, optional
+            The maximum number of requests sent concurrently, default to `8`.
+        overlap: int, optional
+            The number of additional users retrieved at the end of each page,
+            default to `0`.
+        using: str, optional
+            The name of the connection to use, default to `None` for the default
+            connection.
+        """
+        client = async_connections.get_connection(using)
+        seen: set[str] = set()
+        pages: dict[asyncio.Future, int] = {}  # The offset of each page being fetched
+        gaps: list[int] = []
+
+        async def fetch(offset: int) -> dict[str, Any]:
+            return (await client.users.search(query=query, limit=page_size + overlap, offset=offset)).json()
+
+        def unseen(items: list[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+            for item in items:
+                if item["id"] not in seen:
+                    seen.add(item["id"])
+                    yield item
+
+        def schedule() -> None:
+            nonlocal next_offset
+            while len(pages) < concurrency and (gaps or next_offset < count):
+                if gaps:
+                    offset = gaps.pop()
+                else:
+                    offset, next_offset = next_offset, next_offset + step
+                pages[asyncio.ensure_future(fetch(offset))] = offset
+
+        first = await fetch(0)
+        count, returned = first["count"], len(first["items"])
+        step = page_size
+        if 0 < returned < min(page_size + overlap, count):
+            # The server caps the size of pages, offsets advance by the number of users returned
+            step = returned - overlap if returned > overlap else returned
+        next_offset = step
+        schedule()
+        try:
+            for item in unseen(first["items"]):
+                yield cls._from_response(using, item)
+            while pages:
+                done, _ = await asyncio.wait(pages, return_when=asyncio.FIRST_COMPLETED)
+                data = []
+                for page in done:
+                    offset, d = pages.pop(page), page.result()
+                    returned = len(d["items"])
+                    if 0 < returned < step and offset + returned < d["count"]:
+                        gaps.append(offset + returned)  # The page came back short, fetch the rest of its range
+                    data.append(d)
+                count = max(count, *(d["count"] for d in data))
+                schedule()
+                for d in data:
+                    for item in unseen(d["items"]):
+                        yield cls._from_response(using, item)
+        finally:
+            for page in pages:
+                page.cancel()
+
+    @classmethod
+    def crawl(
+        cls,
+        query: str | None = None,
+        page_size: int = 100,
+        concurrency: int = 8,
+        overlap: int = 0,
+        using: str | None = None,
+    ) -> Iterator[Self]:
+        """Synchronous wrapper around `acrawl()`.
+
+        The crawl runs on the asynchronous connection `using`, in a private
+        event loop, so it cannot be called from a running event loop. Pages
+        are only fetched while the iterator is being consumed.
+
+        Parameters
+        ----------
+        query: str, optional
+            An optional query to use against the user's username, default to `None`.
+        page_size: int, optional
+            The number of users retrieved per request, default to `100`.
+        concurrency: int, optional
+            The maximum number of requests sent concurrently, default to `8`.
+        overlap: int, optional
+            The number of additional users retrieved at the end of each page,
+            default to `0`.
+        using: str, optional
+            The name of the connection to use, default to `None` for the default
+            connection.
+        """
+        crawler = cls.acrawl(query, page_size, concurrency, overlap, using)
+
+        async def step() -> Self:
+            return await anext(crawler)
+
+        with asyncio.Runner() as runner:
+            try:
+                while True:
+                    try:
+                        user = runner.run(step())
+                    except StopAsyncIteration:
+                        return
+                    yield user
+            finally:
+                runner.run(crawler.aclose())
+
     @classmethod
     def count(cls, query: str | None = None, using: str | None = None) -> int:
         """Search the number of users matching the query.
@@ -208,6 +650,12 @@ class User:
         return self.token is not None
 
     def logout(self) -> None:
-        """Logout the user by deleting their token."""
+        """Logout the user by deleting their token.
+
+        The token is also removed from the `auth_cache` of the user's connection, if any.
+        """
         if self.token is not None:
+            for registry in (connections, async_connections):
+                if registry.is_created(self.using):
+                    registry.get_connection(self.using).users.forget(self.token)
             self.token = None
@@ -1,12 +1,28 @@
+import asyncio
 import base64
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from unittest import mock
 from urllib.parse import urlencode, urljoin
 
 import pytest
 
 from eternaltwin.clients import endpoints
 from eternaltwin.clients.asyncio.clients import Eternaltwin
-from eternaltwin.exceptions import InvalidStateError
-from tests.conftest import ETWIN_CLIENT_ID, ETWIN_CLIENT_SECRET, ETWIN_REDIRECT_URL, ETWIN_URL
+from eternaltwin.clients.asyncio.transports import AiohttpTransport
+from eternaltwin.exceptions import InvalidStateError, RequestError
+from eternaltwin.nonces import MemoryNonceTracker
+from eternaltwin.responses import Response
+from eternaltwin.states import StatePool
+from eternaltwin.tokens import Token
+from tests.conftest import (
+    ETWIN_CLIENT_ID,
+    ETWIN_CLIENT_SECRET,
+    ETWIN_REDIRECT_URL,
+    ETWIN_URL,
+    AsyncFakeTransport,
+    AsyncStreamingFakeTransport,
+)
 
 
 def test_basic_auth_token(hs256_key):
@@ -35,5 +51,149 @@ def test_validate_state(client, hs256_key):
         client.validate_state(client.generate_state(), client.generate_state())
 
 
+@pytest.mark.parametrize("executor", [None, "thread", "process"])
+async def test_agenerate_avalidate_state(rs256_key, executor):
+    if executor == "thread":
+        executor = ThreadPoolExecutor(1)
+    elif executor == "process":
+        executor = ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn"))
+    client = Eternaltwin(
+        ETWIN_CLIENT_ID,
+        ETWIN_CLIENT_SECRET,
+        ETWIN_REDIRECT_URL,
+        rs256_key,
+        url=ETWIN_URL,
+        nonce_tracker=MemoryNonceTracker(),
+        state_executor=executor,
+    )
+    state, other = await client.agenerate_state(), await client.agenerate_state(nonce="nonce")
+    with pytest.raises(InvalidStateError, match="does not match"):
+        await client.avalidate_state(state, other)
+    await client.avalidate_state(state, state)
+    with pytest.raises(InvalidStateError, match="already been used"):
+        await client.avalidate_state(state)
+    client.validate_state(other)  # Consumed in the current process, whatever the executor
+    with pytest.raises(InvalidStateError, match="already been used"):
+        await client.avalidate_state(other)
+    with pytest.raises(InvalidStateError, match="Authorization expired"):
+        await client.avalidate_state(await client.agenerate_state(expiration=-1))
+    if executor is not None:
+        executor.shutdown()
+
+
+async def test_agenerate_avalidate_state_run_in_executor(rs256_key):
+    executor = ThreadPoolExecutor(1)
+    pool = StatePool(size=1, low_water=0)
+    client = Eternaltwin(
+        ETWIN_CLIENT_ID,
+        ETWIN_CLIENT_SECRET,
+        ETWIN_REDIRECT_URL,
+        rs256_key,
+        url=ETWIN_URL,
+        state_pool=pool,
+        state_executor=executor,
+    )
+    pool.fill()
+    with mock.patch.object(executor, "submit", wraps=executor.submit) as submit:
+        pooled = await client.agenerate_state()  # Already signed by the pool
+        submit.assert_not_called()
+        await client.avalidate_state(pooled)
+        await client.avalidate_state(await client.agenerate_state())
+        assert submit.call_count == 3
+    pool.close()
+    executor.shutdown()
+
+
+async def test_transport(async_client, hs256_key):
+    assert isinstance(async_client.transport, AiohttpTransport)
+
+    transport = AsyncFakeTransport()
+    client = Eternaltwin(
+        ETWIN_CLIENT_ID, ETWIN_CLIENT_SECRET, ETWIN_REDIRECT_URL, hs256_key, url=ETWIN_URL, transport=transport
+    )
+    token = Token(access_token="access", expires_in=3600, token_type="Bearer")
+    await client.get("/foo", params={"bar": 1}, token=token)
+    request = transport.requests[0]
+    assert request.method == "get"
+    assert request.url == urljoin(ETWIN_URL, "/foo")
+    assert request.params == {"bar": 1}
+    assert request.headers == {"Authorization": "Bearer access"}
+
+
+async def test_aclose(hs256_key):
+    transport = AsyncFakeTransport()
+    async with Eternaltwin(
+        ETWIN_CLIENT_ID, ETWIN_CLIENT_SECRET, ETWIN_REDIRECT_URL, hs256_key, url=ETWIN_URL, transport=transport
+    ):
+        assert not transport.closed
+    assert transport.closed
+
+
+async def test_coalesce(hs256_key):
+    class SlowTransport(AsyncFakeTransport):
+        async def send(self, request):
+            await asyncio.sleep(0.01)
+            return await super().send(request)
+
+    transport = SlowTransport()
+    client = Eternaltwin(
+        ETWIN_CLIENT_ID,
+        ETWIN_CLIENT_SECRET,
+        ETWIN_REDIRECT_URL,
+        hs256_key,
+        url=ETWIN_URL,
+        transport=transport,
+        coalesce=True,
+    )
+    alice = Token(access_token="alice", expires_in=3600, token_type="Bearer")
+    bob = Token(access_token="bob", expires_in=3600, token_type="Bearer")
+    await asyncio.gather(
+        *(client.get("/foo", token=alice) for _ in range(5)),
+        *(client.get("/foo", token=bob) for _ in range(5)),
+        client.get("/bar"),
+    )
+    assert len(transport.requests) == 3
+
+
+async def test_warmup_is_not_coalesced(hs256_key):
+    class SlowTransport(AsyncFakeTransport):
+        async def send(self, request):
+            await asyncio.sleep(0.01)
+            return await super().send(request)
+
+    transport = SlowTransport()
+    client = Eternaltwin(
+        ETWIN_CLIENT_ID,
+        ETWIN_CLIENT_SECRET,
+        ETWIN_REDIRECT_URL,
+        hs256_key,
+        url=ETWIN_URL,
+        transport=transport,
+        coalesce=True,
+    )
+    await client.warmup(4)
+    assert len(transport.requests) == 4
+
+
+@pytest.mark.parametrize("transport_class", [AsyncFakeTransport, AsyncStreamingFakeTransport])
+async def test_stream(hs256_key, transport_class):
+    def handler(request):
+        status_code = 404 if request.url.endswith("missing") else 200
+        return Response(request.url, status_code, b"0123456789", {})
+
+    transport = transport_class(handler)
+    client = Eternaltwin(
+        ETWIN_CLIENT_ID, ETWIN_CLIENT_SECRET, ETWIN_REDIRECT_URL, hs256_key, url=ETWIN_URL, transport=transport
+    )
+    async with client.stream("/foo", params={"bar": 1}) as chunks:
+        assert b"".join([chunk async for chunk in chunks]) == b"0123456789"
+    assert transport.requests[0].method == "get"
+    assert transport.requests[0].params == {"bar": 1}
+
+    with pytest.raises(RequestError):
+        async with client.stream("/missing"):
+            pass  # pragma: no cover
+
+
 async def test_authenticate_authorization_code(async_client, user1_authorization_code):
     await async_client.token(authorization_code=user1_authorization_code)
@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from eternaltwin.clients.asyncio.singleflight import SingleFlight
+
+
+async def test_do_shares_result():
+    flight = SingleFlight()
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return object()
+
+    results = await asyncio.gather(*(flight.do("key", fn) for _ in range(10)))
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert len(flight) == 0
+
+
+async def test_do_propagates_exception():
+    flight = SingleFlight()
+
+    async def fn():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(*(flight.do("key", fn) for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(result, ValueError) for result in results)
+    assert len(flight) == 0
+
+
+async def test_do_waiter_cancellation():
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def fn():
+        await release.wait()
+        return "result"
+
+    cancelled = asyncio.create_task(flight.do("key", fn))
+    waiter = asyncio.create_task(flight.do("key", fn))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    release.set()
+    assert await waiter == "result"
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled
+
+
+async def test_do_call_cancellation():
+    flight = SingleFlight()
+
+    async def fn():
+        raise asyncio.CancelledError()
+
+    results = await asyncio.gather(*(flight.do("key", fn) for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(result, asyncio.CancelledError) for result in results)
+    assert len(flight) == 0
+
+
+async def test_do_follower_of_failed_call():
+    flight = SingleFlight()
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        if len(calls) == 1:
+            raise ValueError("boom")
+        return "result"
+
+    leader = asyncio.create_task(flight.do("key", fn))
+    follower = asyncio.create_task(flight.do("key", fn))
+    with pytest.raises(ValueError):
+        await leader
+    with pytest.raises(ValueError):
+        await follower
+    assert await flight.do("key", fn) == "result"  # A failed call is not shared with newcomers
+    assert len(calls) == 2
+
+
+async def test_do_forgotten_call_does_not_forget_newer_one():
+    flight = SingleFlight()
+    release, release_newer = asyncio.Event(), asyncio.Event()
+    forgotten = asyncio.create_task(flight.do("key", release.wait))
+    await asyncio.sleep(0)
+    flight._after_fork()  # The call in flight is forgotten, as in a forked child
+    newer = asyncio.create_task(flight.do("key", release_newer.wait))
+    await asyncio.sleep(0)
+    release.set()
+    await forgotten
+    await asyncio.sleep(0)
+    assert len(flight) == 1  # The forgotten call finished without removing the newer one
+    release_newer.set()
+    await newer
+    assert len(flight) == 0
@@ -0,0 +1,92 @@
+import asyncio
+import json
+
+import pytest
+
+from eternaltwin.clients import endpoints
+from eternaltwin.clients.asyncio.clients import Eternaltwin
+from eternaltwin.exceptions import RequestError
+from eternaltwin.responses import Response
+from eternaltwin.tokens import Token
+from tests.conftest import ETWIN_CLIENT_ID, ETWIN_CLIENT_SECRET, ETWIN_REDIRECT_URL, ETWIN_URL, AsyncFakeTransport
+
+
+class SlowTokenTransport(AsyncFakeTransport):
+    async def send(self, request):
+        self.requests.append(request)
+        if request.json["refresh_token"] == "revoked":
+            return Response(request.url, 400, b'{"error": "InvalidGrant"}', {})
+        await asyncio.sleep(0.01)
+        data = {"access_token": "fresh", "expires_in": 3600, "token_type": "Bearer"}
+        if request.json["refresh_token"] == "rotating":
+            data["refresh_token"] = "rotated"
+        return Response(request.url, 200, json.dumps(data).encode(), {})
+
+
+@pytest.fixture
+def transport():
+    return SlowTokenTransport()
+
+
+@pytest.fixture
+def client(hs256_key, transport):
+    return Eternaltwin(
+        ETWIN_CLIENT_ID, ETWIN_CLIENT_SECRET, ETWIN_REDIRECT_URL, hs256_key, url=ETWIN_URL, transport=transport
+    )
+
+
+def expiring(refresh_token: str = "refresh") -> Token:
+    return Token(access_token="stale", refresh_token=refresh_token, expires_in=60, token_type="Bearer")
+
+
+async def test_refresh(client, transport):
+    token = expiring()
+    fresh = await client.tokens.refresh(token)
+    assert (fresh.access_token, fresh.refresh_token) == ("fresh", "refresh")
+    assert token.access_token == "stale"
+
+    request = transport.requests[0]
+    assert (request.method, request.url) == ("post", ETWIN_URL.rstrip("/") + endpoints.TOKEN)
+    assert request.headers == {"Authorization": f"Basic {client._basic_auth_token()}"}
+    assert request.json == {"grant_type": "refresh_token", "refresh_token": "refresh"}
+
+    assert (await client.tokens.refresh(expiring("rotating"))).refresh_token == "rotated"
+    with pytest.raises(RequestError):
+        await client.tokens.refresh(expiring("revoked"))
+
+
+async def test_ensure_fresh(client, transport, token):
+    assert await client.tokens.ensure_fresh(token) is token
+    assert transport.requests == []
+
+    token = expiring()
+    assert await client.tokens.ensure_fresh(token) is token
+    assert token.access_token == "fresh"
+    await client.tokens.ensure_fresh(token)
+    assert len(transport.requests) == 1
+
+
+async def test_ensure_fresh_is_coalesced(client, transport):
+    token = expiring()
+    results = await asyncio.gather(
+        *(client.tokens.ensure_fresh(token) for _ in range(4)),
+        *(client.tokens.ensure_fresh(expiring()) for _ in range(4)),
+    )
+    assert len(transport.requests) == 1
+    assert all(t.access_token == "fresh" for t in results)
+
+    with pytest.raises(RequestError):
+        await asyncio.gather(*(client.tokens.ensure_fresh(expiring("revoked")) for _ in range(2)))
+
+
+@pytest.mark.parametrize("refresh_token", ["refresh", "rotating"])
+async def test_ensure_fresh_copies(client, transport, refresh_token):
+    token, copy = expiring(refresh_token), expiring(refresh_token)  # E.g., retrieved twice from a token store
+    await client.tokens.ensure_fresh(token)
+    assert await client.tokens.ensure_fresh(copy) is copy
+    assert len(transport.requests) == 1
+    assert (copy.access_token, copy.refresh_token, copy.expiration) == (
+        token.access_token,
+        token.refresh_token,
+        token.expiration,
+    )
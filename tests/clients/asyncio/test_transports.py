@@ -0,0 +1,173 @@
+import asyncio
+import threading
+from unittest import mock
+from unittest.mock import AsyncMock, MagicMock
+
+from eternaltwin.clients.abc.transports import Request
+from eternaltwin.clients.asyncio.transports import AiohttpTransport
+from tests.conftest import ETWIN_URL
+
+
+async def test_session_is_reused():
+    transport = AiohttpTransport()
+    session = await transport.get_session()
+    assert await transport.get_session() is session
+    await transport.close()
+
+
+async def test_session_pool_configuration():
+    transport = AiohttpTransport(pool_limit=50, pool_maxsize=20, dns_cache_ttl=60, keep_alive=False)
+    connector = (await transport.get_session()).connector
+    assert connector.limit == 50
+    assert connector.limit_per_host == 20
+    assert connector.use_dns_cache is True
+    assert connector.force_close is True
+    await transport.close()
+
+
+async def test_send():
+    transport = AiohttpTransport(timeout=1, verify_ssl=False, allow_redirects=True)
+    request = Request(
+        "post", ETWIN_URL, params={"q": "user"}, headers={"X-Foo": "bar"}, json={"foo": "bar"}, extra={"cookies": {}}
+    )
+    raw = MagicMock(url=ETWIN_URL, status=200, headers={})
+    raw.read = AsyncMock(return_value=b"{}")
+    raw.__aenter__.return_value = raw
+    session = await transport.get_session()
+    with mock.patch.object(session, "request", return_value=raw) as request_mock:
+        response = await transport.send(request)
+    request_mock.assert_called_once_with(
+        "post",
+        ETWIN_URL,
+        params={"q": "user"},
+        headers={"X-Foo": "bar"},
+        json={"foo": "bar"},
+        data=None,
+        timeout=transport.timeout,
+        ssl=False,
+        allow_redirects=True,
+        cookies={},
+    )
+    assert response.status_code == 200
+    assert response.json() == {}
+    await transport.close()
+
+
+async def test_close():
+    transport = AiohttpTransport()
+    session = await transport.get_session()
+    await transport.close()
+    assert session.closed
+    assert not transport._sessions
+    assert await transport.get_session() is not session
+    await transport.close()
+    await transport.close()
+
+
+def test_session_per_event_loop():
+    transport = AiohttpTransport()
+    loops = [asyncio.new_event_loop() for _ in range(2)]
+    sessions = [loop.run_until_complete(transport.get_session()) for loop in loops]
+    assert sessions[0] is not sessions[1]
+    assert all(loop.run_until_complete(transport.get_session()) is s for loop, s in zip(loops, sessions))
+
+    loops[0].run_until_complete(loops[0].shutdown_asyncgens())
+    loops[0].close()
+    assert sessions[0].closed and not sessions[1].closed
+    assert list(transport._sessions) == [loops[1]]
+
+    loops[1].run_until_complete(transport.close())
+    loops[1].close()
+    assert sessions[1].closed
+
+
+def test_sessions_of_closed_loops_are_dropped():
+    transport = AiohttpTransport()
+    for drop in (transport.get_session, transport.close):
+        loop = asyncio.new_event_loop()
+        session = loop.run_until_complete(transport.get_session())
+        loop.run_until_complete(session.close())
+        loop.close()  # Without shutting down its asynchronous generators
+        asyncio.run(drop())
+        assert not transport._sessions
+
+
+def test_sessions_of_concurrent_threads():
+    transport = AiohttpTransport()
+    barrier = threading.Barrier(8)
+
+    async def use():
+        barrier.wait()
+        await (await transport.get_session()).close()
+
+    def worker():
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(use())
+        loop.close()  # Without shutting down its asynchronous generators, dropped by the other threads
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    asyncio.run(transport.close())
+    assert not transport._sessions
+
+
+async def test_close_sessions_of_other_loops():
+    transport = AiohttpTransport()
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever)
+    thread.start()
+    other = asyncio.run_coroutine_threadsafe(transport.get_session(), loop).result()
+    session = await transport.get_session()
+
+    await transport.close()
+    assert session.closed
+    for _ in range(100):  # Closed in its own event loop
+        if other.closed:
+            break
+        await asyncio.sleep(0.01)
+    assert other.closed
+
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+async def test_stream():
+    transport = AiohttpTransport()
+    request = Request("get", ETWIN_URL)
+    raw = MagicMock(url=ETWIN_URL, status=200, headers={})
+    raw.__aenter__.return_value = raw
+    raw.content.iter_chunked.return_value = chunks = object()
+    session = await transport.get_session()
+    with mock.patch.object(session, "request", return_value=raw):
+        async with transport.stream(request, chunk_size=1024) as (response, iterator):
+            assert response.status_code == 200
+            assert response.content == b""
+            assert iterator is chunks
+    raw.content.iter_chunked.assert_called_once_with(1024)
+    raw.__aexit__.assert_called_once()
+    await transport.close()
+
+
+async def test_stream_error_is_read():
+    transport = AiohttpTransport()
+    raw = MagicMock(url=ETWIN_URL, status=404, headers={})
+    raw.read = AsyncMock(return_value=b'{"error": "UserNotFound"}')
+    raw.__aenter__.return_value = raw
+    session = await transport.get_session()
+    with mock.patch.object(session, "request", return_value=raw):
+        async with transport.stream(Request("get", ETWIN_URL)) as (response, _):
+            assert response.status_code == 404
+            assert response.json() == {"error": "UserNotFound"}
+    await transport.close()
+
+
+async def test_cookies_are_not_kept(cookie_server):
+    transport = AiohttpTransport()
+    responses = [await transport.send(Request("get", cookie_server)) for _ in range(2)]
+    assert [response.content for response in responses] == [b"", b""]
+    assert not list((await transport.get_session()).cookie_jar)
+    await transport.close()
@@ -1,4 +1,18 @@
+import time
+
+from eternaltwin.caches import Cache
+from eternaltwin.clients.asyncio.clients import Eternaltwin
 from eternaltwin.enums import AuthorizationType
+from eternaltwin.responses import Response
+from eternaltwin.tokens import Token
+from tests.conftest import (
+    ETWIN_CLIENT_ID,
+    ETWIN_CLIENT_SECRET,
+    ETWIN_REDIRECT_URL,
+    ETWIN_URL,
+    AsyncFakeTransport,
+    AsyncStreamingFakeTransport,
+)
 
 
 async def test_me_unauthenticated(async_client):
@@ -35,3 +49,75 @@ async def test_search_users(async_client):
     assert data["count"] == 2
     assert len(data["items"]) == 1
     assert data["items"][0]["display_name"]["current"]["value"] == "user2"
+
+
+async def test_get_user_cache(hs256_key, token):
+    transport = AsyncFakeTransport(lambda request: Response(request.url, 200, b'{"id": "1"}', {}))
+    cache = Cache()
+    client = Eternaltwin(
+        ETWIN_CLIENT_ID,
+        ETWIN_CLIENT_SECRET,
+        ETWIN_REDIRECT_URL,
+        hs256_key,
+        url=ETWIN_URL,
+        transport=transport,
+        user_cache=cache,
+    )
+    first = await client.users.get("1")
+    assert await client.users.get("1") is first
+    assert len(transport.requests) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    await client.users.get("1", use_cache=False)
+    await client.users.get("1", token=token)
+    assert len(transport.requests) == 3
+
+    client.users.invalidate("1")
+    await client.users.get("1")
+    assert len(transport.requests) == 4
+
+
+async def test_search_stream(hs256_key, fake_eternaltwin):
+    transport = AsyncStreamingFakeTransport(fake_eternaltwin)
+    client = Eternaltwin(
+        ETWIN_CLIENT_ID, ETWIN_CLIENT_SECRET, ETWIN_REDIRECT_URL, hs256_key, url=ETWIN_URL, transport=transport
+    )
+    items = [item async for item in client.users.search_stream("user", limit=3, offset=2)]
+    assert items == fake_eternaltwin.users[2:5]
+    assert transport.requests[0].params == {"q": "user", "limit": 3, "offset": 2}
+
+    fields = {}
+    assert [item async for item in client.users.search_stream("user7", fields=fields)] == fake_eternaltwin.users[7:]
+    assert fields == {"count": 1}
+
+
+async def test_me_cache(hs256_key, token):
+    transport = AsyncFakeTransport(lambda request: Response(request.url, 200, b'{"user": {}}', {}))
+    cache = Cache(ttl=300)
+    client = Eternaltwin(
+        ETWIN_CLIENT_ID,
+        ETWIN_CLIENT_SECRET,
+        ETWIN_REDIRECT_URL,
+        hs256_key,
+        url=ETWIN_URL,
+        transport=transport,
+        auth_cache=cache,
+    )
+    first = await client.users.me(token)
+    assert await client.users.me(token) is first
+    assert token.access_token not in str(list(cache._entries))
+    await client.users.me()
+    await client.users.me(token, use_cache=False)
+    assert len(transport.requests) == 3
+
+    client.users.forget(token)
+    await client.users.me(token)
+    assert len(transport.requests) == 4
+
+    short = Token(access_token="short", expires_in=62, token_type="Bearer")  # Expires in 2 seconds
+    await client.users.me(short)
+    assert cache._entries[client.users._auth_cache_key(short, True)][1] <= time.monotonic() + 2
+    expired = Token(access_token="expired", expires_in=0, token_type="Bearer")
+    await client.users.me(expired)
+    await client.users.me(expired)
+    assert len(transport.requests) == 7
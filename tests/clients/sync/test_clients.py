@@ -1,12 +1,20 @@
 import base64
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlencode, urljoin
 
 import pytest
 
 from eternaltwin.clients import endpoints
 from eternaltwin.clients.sync.clients import Eternaltwin
+from eternaltwin.clients.sync.transports import RequestsTransport
 from eternaltwin.exceptions import InvalidStateError
-from tests.conftest import ETWIN_CLIENT_ID, ETWIN_CLIENT_SECRET, ETWIN_REDIRECT_URL, ETWIN_URL
+from eternaltwin.nonces import MemoryNonceTracker
+from eternaltwin.responses import Response
+from eternaltwin.states import StatePool
+from eternaltwin.tokens import Token
+from tests.conftest import ETWIN_CLIENT_ID, ETWIN_CLIENT_SECRET, ETWIN_REDIRECT_URL, ETWIN_URL, FakeTransport
 
 
 def test_basic_auth_token(hs256_key):
@@ -35,5 +43,131 @@ def test_validate_state(client, hs256_key):
         client.validate_state(client.generate_state(), client.generate_state())
 
 
+def test_validate_compact_state(compact_key):
+    client = Eternaltwin(ETWIN_CLIENT_ID, ETWIN_CLIENT_SECRET, ETWIN_REDIRECT_URL, compact_key, url=ETWIN_URL)
+    state = client.generate_state()
+    client.validate_state(state, state)
+    with pytest.raises(InvalidStateError):
+        client.validate_state(state, client.generate_state())
+
+
+def test_validate_state_replay(hs256_key):
+    client = Eternaltwin(
+        ETWIN_CLIENT_ID,
+        ETWIN_CLIENT_SECRET,
+        ETWIN_REDIRECT_URL,
+        hs256_key,
+        url=ETWIN_URL,
+        nonce_tracker=MemoryNonceTracker(),
+    )
+    state, other = client.generate_state(), client.generate_state()
+    with pytest.raises(InvalidStateError, match="does not match"):
+        client.validate_state(state, other)
+    client.validate_state(state, state)  # A mismatch does not consume the state
+    with pytest.raises(InvalidStateError, match="already been used"):
+        client.validate_state(state)
+    client.validate_state(other)
+
+
+def test_generate_state_from_pool(hs256_key):
+    pool = StatePool(size=2, low_water=0)
+    client = Eternaltwin(
+        ETWIN_CLIENT_ID, ETWIN_CLIENT_SECRET, ETWIN_REDIRECT_URL, hs256_key, url=ETWIN_URL, state_pool=pool
+    )
+    pool.fill()
+    pooled = list(pool._states)
+    assert client.generate_state() == pooled[0].jwt
+    assert client.generate_state(nonce="nonce") not in {s.jwt for s in pooled}
+    assert client.generate_state(expiration=60) not in {s.jwt for s in pooled}
+    assert client.generate_state() == pooled[1].jwt
+    client.validate_state(client.generate_state())  # Empty pool, signed on demand
+    assert (pool.hits, pool.misses) == (2, 1)
+    pool.close()
+
+
+def test_transport(client, hs256_key):
+    assert isinstance(client.transport, RequestsTransport)
+
+    transport = FakeTransport()
+    client = Eternaltwin(
+        ETWIN_CLIENT_ID, ETWIN_CLIENT_SECRET, ETWIN_REDIRECT_URL, hs256_key, url=ETWIN_URL, transport=transport
+    )
+    client.get("/foo", params={"bar": 1}, token=Token(access_token="access", expires_in=3600, token_type="Bearer"))
+    request = transport.requests[0]
+    assert request.method == "get"
+    assert request.url == urljoin(ETWIN_URL, "/foo")
+    assert request.params == {"bar": 1}
+    assert request.headers == {"Authorization": "Bearer access"}
+    assert request.extra == {}
+
+
+def test_extra_arguments(hs256_key):
+    transport = FakeTransport()
+    client = Eternaltwin(
+        ETWIN_CLIENT_ID, ETWIN_CLIENT_SECRET, ETWIN_REDIRECT_URL, hs256_key, url=ETWIN_URL, transport=transport
+    )
+    client.get("/foo", params={"bar": 1}, cookies={"baz": "qux"})
+    request = transport.requests[0]
+    assert request.params == {"bar": 1}
+    assert request.extra == {"cookies": {"baz": "qux"}}
+    assert client._coalescing_key(request) is None
+
+
+def test_close(hs256_key):
+    transport = FakeTransport()
+    with Eternaltwin(
+        ETWIN_CLIENT_ID, ETWIN_CLIENT_SECRET, ETWIN_REDIRECT_URL, hs256_key, url=ETWIN_URL, transport=transport
+    ):
+        assert not transport.closed
+    assert transport.closed
+
+
+def test_coalesce(hs256_key):
+    release = threading.Event()
+
+    def handler(request):
+        release.wait(5)
+        return Response(request.url, 200, b"{}", {})
+
+    transport = FakeTransport(handler)
+    client = Eternaltwin(
+        ETWIN_CLIENT_ID,
+        ETWIN_CLIENT_SECRET,
+        ETWIN_REDIRECT_URL,
+        hs256_key,
+        url=ETWIN_URL,
+        transport=transport,
+        coalesce=True,
+    )
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        futures = [executor.submit(client.get, "/foo", params={"bar": 1}) for _ in range(4)]
+        futures.append(executor.submit(client.post, "/foo"))
+        while len(transport.requests) < 2:
+            pass
+        release.set()
+        responses = [future.result() for future in futures]
+    assert len(transport.requests) < len(responses)
+    assert sum(request.method == "post" for request in transport.requests) == 1
+
+
+def test_warmup_is_not_coalesced(hs256_key):
+    def handler(request):
+        time.sleep(0.01)
+        return Response(request.url, 200, b"{}", {})
+
+    transport = FakeTransport(handler)
+    client = Eternaltwin(
+        ETWIN_CLIENT_ID,
+        ETWIN_CLIENT_SECRET,
+        ETWIN_REDIRECT_URL,
+        hs256_key,
+        url=ETWIN_URL,
+        transport=transport,
+        coalesce=True,
+    )
+    client.warmup(4)
+    assert len(transport.requests) == 4
+
+
 def test_token(client, user1_authorization_code):
     client.token(authorization_code=user1_authorization_code)
@@ -0,0 +1,56 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from eternaltwin.clients.sync.singleflight import SingleFlight
+
+
+def test_do_shares_result():
+    flight = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def fn():
+        calls.append(1)
+        release.wait(5)
+        return object()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [executor.submit(flight.do, "key", fn) for _ in range(8)]
+        while len(flight) == 0:  # Wait for the leader to start the call
+            pass
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert len(calls) >= 1
+    assert len({id(result) for result in results}) == len(calls)
+    assert len(flight) == 0
+
+
+def test_do_different_keys():
+    flight = SingleFlight()
+    assert flight.do("a", lambda: 1) == 1
+    assert flight.do("b", lambda: 2) == 2
+    assert len(flight) == 0
+
+
+def test_do_propagates_exception():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    def fn():
+        started.set()
+        release.wait(5)
+        raise ValueError("boom")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(flight.do, "key", fn)
+        started.wait(5)
+        follower = executor.submit(flight.do, "key", lambda: pytest.fail("Call should have been shared"))
+        release.set()
+        with pytest.raises(ValueError, match="boom"):
+            leader.result()
+        with pytest.raises(ValueError, match="boom"):
+            follower.result()
+    assert len(flight) == 0
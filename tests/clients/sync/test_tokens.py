@@ -0,0 +1,110 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from eternaltwin.clients import endpoints
+from eternaltwin.clients.sync.clients import Eternaltwin
+from eternaltwin.exceptions import RequestError
+from eternaltwin.responses import Response
+from eternaltwin.tokens import Token
+from tests.conftest import ETWIN_CLIENT_ID, ETWIN_CLIENT_SECRET, ETWIN_REDIRECT_URL, ETWIN_URL, FakeTransport
+
+
+def token_handler(request):
+    if request.json["refresh_token"] == "revoked":
+        return Response(request.url, 400, b'{"error": "InvalidGrant"}', {})
+    time.sleep(0.05)
+    data = {"access_token": "fresh", "expires_in": 3600, "token_type": "Bearer"}
+    if request.json["refresh_token"] == "rotating":
+        data["refresh_token"] = "rotated"
+    return Response(request.url, 200, json.dumps(data).encode(), {})
+
+
+@pytest.fixture
+def transport():
+    return FakeTransport(token_handler)
+
+
+@pytest.fixture
+def client(hs256_key, transport):
+    return Eternaltwin(
+        ETWIN_CLIENT_ID, ETWIN_CLIENT_SECRET, ETWIN_REDIRECT_URL, hs256_key, url=ETWIN_URL, transport=transport
+    )
+
+
+def expiring(refresh_token: str = "refresh") -> Token:
+    return Token(access_token="stale", refresh_token=refresh_token, expires_in=60, token_type="Bearer")
+
+
+def test_refresh(client, transport):
+    token = expiring()
+    fresh = client.tokens.refresh(token)
+    assert (fresh.access_token, fresh.refresh_token) == ("fresh", "refresh")
+    assert token.access_token == "stale"
+
+    request = transport.requests[0]
+    assert (request.method, request.url) == ("post", ETWIN_URL.rstrip("/") + endpoints.TOKEN)
+    assert request.headers == {"Authorization": f"Basic {client._basic_auth_token()}"}
+    assert request.json == {"grant_type": "refresh_token", "refresh_token": "refresh"}
+
+    assert client.tokens.refresh(expiring("rotating")).refresh_token == "rotated"
+    with pytest.raises(RequestError):
+        client.tokens.refresh(expiring("revoked"))
+
+
+def test_ensure_fresh(client, transport, token):
+    assert client.tokens.ensure_fresh(token) is token
+    assert client.tokens.ensure_fresh(Token(access_token="a", expires_in=60, token_type="Bearer")).access_token == "a"
+    assert transport.requests == []
+
+    token = expiring()
+    assert client.tokens.ensure_fresh(token) is token
+    assert token.access_token == "fresh"
+    assert not token.needs_refresh()
+    client.tokens.ensure_fresh(token)
+    assert len(transport.requests) == 1
+
+
+def test_ensure_fresh_jitter(client, transport):
+    token = Token(access_token="stale", refresh_token="refresh", expires_in=100, token_type="Bearer")
+    token._jitter = 0.5
+    client.refresh_jitter = 100
+    client.tokens.ensure_fresh(token)
+    assert token.access_token == "fresh"
+
+    token = Token(access_token="stale", refresh_token="refresh", expires_in=100, token_type="Bearer")
+    token._jitter = 0.5
+    client.refresh_jitter = 60
+    client.tokens.ensure_fresh(token)
+    assert token.access_token == "stale"
+
+
+def test_ensure_fresh_is_coalesced(client, transport):
+    token = expiring()
+    barrier = threading.Barrier(8)
+
+    def ensure_fresh(t):
+        barrier.wait()
+        return client.tokens.ensure_fresh(t)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        copies = [expiring() for _ in range(4)]
+        results = list(executor.map(ensure_fresh, [token] * 4 + copies))
+    assert len(transport.requests) == 1
+    assert all(t.access_token == "fresh" for t in results)
+
+
+@pytest.mark.parametrize("refresh_token", ["refresh", "rotating"])
+def test_ensure_fresh_copies(client, transport, refresh_token):
+    token, copy = expiring(refresh_token), expiring(refresh_token)  # E.g., retrieved twice from a token store
+    client.tokens.ensure_fresh(token)
+    assert client.tokens.ensure_fresh(copy) is copy
+    assert len(transport.requests) == 1
+    assert (copy.access_token, copy.refresh_token, copy.expiration) == (
+        token.access_token,
+        token.refresh_token,
+        token.expiration,
+    )
@@ -0,0 +1,75 @@
+import threading
+import time
+from unittest import mock
+
+from eternaltwin.clients.abc.transports import Request
+from eternaltwin.clients.sync.transports import RequestsTransport
+from tests.conftest import ETWIN_URL
+
+
+def test_session_is_reused():
+    transport = RequestsTransport()
+    assert transport.session is transport.session
+
+
+def test_session_pool_configuration():
+    transport = RequestsTransport(pool_connections=2, pool_maxsize=32, pool_block=True, keep_alive=False)
+    adapter = transport.session.get_adapter(ETWIN_URL)
+    assert adapter._pool_connections == 2
+    assert adapter._pool_maxsize == 32
+    assert adapter._pool_block is True
+    assert transport.session.headers["Connection"] == "close"
+
+
+def test_send():
+    transport = RequestsTransport(timeout=1, verify_ssl=False, allow_redirects=True)
+    request = Request(
+        "post", ETWIN_URL, params={"q": "user"}, headers={"X-Foo": "bar"}, json={"foo": "bar"}, extra={"cookies": {}}
+    )
+    raw = mock.MagicMock(url=ETWIN_URL, status_code=200, content=b"{}", headers={})
+    with mock.patch.object(transport.session, "request", return_value=raw) as request_mock:
+        response = transport.send(request)
+    request_mock.assert_called_once_with(
+        "post",
+        ETWIN_URL,
+        params={"q": "user"},
+        headers={"X-Foo": "bar"},
+        json={"foo": "bar"},
+        data=None,
+        timeout=1,
+        verify=False,
+        allow_redirects=True,
+        cookies={},
+    )
+    assert response.status_code == 200
+    assert response.json() == {}
+
+
+def test_close():
+    transport = RequestsTransport()
+    session = transport.session
+    transport.close()
+    assert transport._session is None
+    assert transport.session is not session
+    transport.close()
+    transport.close()
+
+
+def test_cookies_are_not_kept(cookie_server):
+    transport = RequestsTransport()
+    responses = [transport.send(Request("get", cookie_server)) for _ in range(2)]
+    assert [response.content for response in responses] == [b"", b""]
+    assert not transport.session.cookies
+
+
+def test_session_created_while_waiting_for_the_lock():
+    transport = RequestsTransport()
+    session = object()
+    result = []
+    with transport._session_lock:
+        thread = threading.Thread(target=lambda: result.append(transport.session))
+        thread.start()
+        time.sleep(0.05)  # Let the thread wait for the lock
+        transport._session = session  # Created by another thread in the meantime
+    thread.join()
+    assert result == [session]
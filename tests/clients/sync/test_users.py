@@ -1,4 +1,18 @@
+import time
+
+from eternaltwin.caches import Cache
+from eternaltwin.clients.sync.clients import Eternaltwin
 from eternaltwin.enums import AuthorizationType
+from eternaltwin.responses import Response
+from eternaltwin.tokens import Token
+from tests.conftest import (
+    ETWIN_CLIENT_ID,
+    ETWIN_CLIENT_SECRET,
+    ETWIN_DUMMY_URL,
+    ETWIN_REDIRECT_URL,
+    ETWIN_URL,
+    FakeTransport,
+)
 
 
 def test_me_unauthenticated(client):
@@ -35,3 +49,88 @@ def test_search_users(client):
     assert data["count"] == 2
     assert len(data["items"]) == 1
     assert data["items"][0]["display_name"]["current"]["value"] == "user2"
+
+
+def test_get_user_cache(hs256_key, token):
+    transport = FakeTransport(lambda request: Response(request.url, 200, b'{"id": "1"}', {}))
+    cache = Cache()
+    client = Eternaltwin(
+        ETWIN_CLIENT_ID,
+        ETWIN_CLIENT_SECRET,
+        ETWIN_REDIRECT_URL,
+        hs256_key,
+        url=ETWIN_URL,
+        transport=transport,
+        user_cache=cache,
+    )
+    first = client.users.get("1")
+    assert client.users.get("1") is first
+    assert len(transport.requests) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    client.users.get("1", use_cache=False)
+    client.users.get("1", token=token)
+    assert len(transport.requests) == 3
+
+    client.users.invalidate("1")
+    client.users.get("1")
+    assert len(transport.requests) == 4
+
+
+def test_user_cache_shared_by_servers(hs256_key):
+    cache = Cache()
+    clients = [
+        Eternaltwin(
+            ETWIN_CLIENT_ID,
+            ETWIN_CLIENT_SECRET,
+            ETWIN_REDIRECT_URL,
+            hs256_key,
+            url=url,
+            transport=FakeTransport(lambda request: Response(request.url, 200, b'{"id": "1"}', {})),
+            user_cache=cache,
+        )
+        for url in (ETWIN_URL, ETWIN_DUMMY_URL)
+    ]
+    responses = [client.users.get("1") for client in clients]
+    assert responses[0].url.startswith(ETWIN_URL) and responses[1].url.startswith(ETWIN_DUMMY_URL)
+    assert len(cache) == 2
+
+    clients[0].users.invalidate("1")
+    assert clients[1].users.get("1") is responses[1]
+    assert clients[0].users.get("1") is not responses[0]
+
+
+def test_invalidate_without_cache(client):
+    client.users.invalidate("1")
+
+
+def test_me_cache(hs256_key, token):
+    transport = FakeTransport(lambda request: Response(request.url, 200, b'{"user": {}}', {}))
+    cache = Cache(ttl=300)
+    client = Eternaltwin(
+        ETWIN_CLIENT_ID,
+        ETWIN_CLIENT_SECRET,
+        ETWIN_REDIRECT_URL,
+        hs256_key,
+        url=ETWIN_URL,
+        transport=transport,
+        auth_cache=cache,
+    )
+    first = client.users.me(token)
+    assert client.users.me(token) is first
+    assert token.access_token not in str(list(cache._entries))
+    client.users.me()
+    client.users.me(token, use_cache=False)
+    assert len(transport.requests) == 3
+
+    client.users.forget(token)
+    client.users.me(token)
+    assert len(transport.requests) == 4
+
+    short = Token(access_token="short", expires_in=62, token_type="Bearer")  # Expires in 2 seconds
+    client.users.me(short)
+    assert cache._entries[client.users._auth_cache_key(short, True)][1] <= time.monotonic() + 2
+    expired = Token(access_token="expired", expires_in=0, token_type="Bearer")
+    client.users.me(expired)
+    client.users.me(expired)
+    assert len(transport.requests) == 7
@@ -1,16 +1,24 @@
+import contextlib
+import json
 import os
 import secrets
+import threading
 import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from urllib.parse import parse_qs, urljoin, urlparse
 
 import pytest
 import requests
 
+from eternaltwin.clients import endpoints
 from eternaltwin.clients.abc.clients import ClientABC
+from eternaltwin.clients.abc.transports import Request, StreamingTransportABC, TransportABC
 from eternaltwin.clients.asyncio.clients import Eternaltwin as AsyncEternaltwin
 from eternaltwin.clients.sync.clients import Eternaltwin
-from eternaltwin.keys import EdDSAKey, ES256Key, HS256Key, PS256Key, RS256Key
+from eternaltwin.connections import async_connections, connections
+from eternaltwin.keys import CompactKey, EdDSAKey, ES256Key, HS256Key, PS256Key, RS256Key
+from eternaltwin.responses import Response
 from eternaltwin.states import _generate_nonce
 from eternaltwin.tokens import Token
 
@@ -39,6 +47,157 @@ ETWIN_USER2_USERNAME = "user2"
 ETWIN_USER2_PASSWORD = "31323334353637383932"
 
 
+class FakeTransport(TransportABC):
+    """In-process transport recording the requests and answering with `handler`.
+
+    `handler` receives the request and must return a `Response`, by default an
+    empty JSON object is returned.
+    """
+
+    def __init__(self, handler=None):
+        self.handler = handler or (lambda request: Response(request.url, 200, b"{}", {}))
+        self.requests: list[Request] = []
+        self.closed = False
+
+    def send(self, request: Request) -> Response:
+        self.requests.append(request)
+        return self.handler(request)
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class AsyncFakeTransport(FakeTransport):
+    """Asynchronous version of `FakeTransport`."""
+
+    async def send(self, request: Request) -> Response:
+        return super().send(request)
+
+    async def close(self) -> None:
+        super().close()
+
+
+class AsyncStreamingFakeTransport(AsyncFakeTransport, StreamingTransportABC):
+    """Version of `AsyncFakeTransport` streaming contents in chunks of `chunk_size` bytes.
+
+    `chunks` records every chunk sent.
+    """
+
+    def __init__(self, handler=None, chunk_size: int = 7):
+        super().__init__(handler)
+        self.chunk_size = chunk_size
+        self.chunks: list[bytes] = []
+
+    @contextlib.asynccontextmanager
+    async def stream(self, request: Request, chunk_size: int = 65536):
+        response = await self.send(request)
+        if response.status_code >= 300:
+            yield response, self._chunks(b"")
+            return
+        content, response.content = response.content, b""
+        yield response, self._chunks(content)
+
+    async def _chunks(self, content: bytes):
+        for i in range(0, len(content), self.chunk_size):
+            self.chunks.append(content[i : i + self.chunk_size])
+            yield self.chunks[-1]
+
+
+class FakeEternaltwin:
+    """Transport handler emulating the users endpoints of EternalTwin with `count` users.
+
+    The first user is the authenticated one, authorization codes are exchanged
+    for the access token `"access"`, and refresh tokens can be exchanged for
+    new access tokens, whose number is kept in `refreshes`.
+    """
+
+    def __init__(self, count: int = 8):
+        self.users = [
+            {
+                "id": f"00000000-0000-0000-0000-{i:012}",
+                "display_name": {"current": {"value": f"user{i}"}},
+                "is_administrator": i == 0,
+                "created_at": "2024-01-01T00:00:00.000Z",
+                "deleted_at": None,
+            }
+            for i in range(count)
+        ]
+        self.refreshes = 0
+
+    def __call__(self, request: Request) -> Response:
+        path = urlparse(request.url).path
+        if path == endpoints.USERS:
+            params = request.params or {}
+            items = [u for u in self.users if params.get("q", "") in u["display_name"]["current"]["value"]]
+            offset, limit = int(params.get("offset", 0)), int(params.get("limit", 20))
+            return self._json(request, {"count": len(items), "items": items[offset : offset + limit]})
+        if path == endpoints.SELF:
+            return self._json(request, {"type": "AccessToken", "user": self.users[0]})
+        if path == endpoints.TOKEN and request.json["grant_type"] == "authorization_code":
+            return self._json(
+                request,
+                {"access_token": "access", "refresh_token": "refresh", "expires_in": 3600, "token_type": "Bearer"},
+            )
+        if path == endpoints.TOKEN and request.json["grant_type"] == "refresh_token":
+            self.refreshes += 1
+            return self._json(
+                request, {"access_token": f"access{self.refreshes}", "expires_in": 3600, "token_type": "Bearer"}
+            )
+        for user in self.users:
+            if path == endpoints.USER.format(user_id=user["id"]):
+                return self._json(request, user)
+        return self._json(request, {"error": "UserNotFound"}, 404)
+
+    @staticmethod
+    def _json(request: Request, data: dict, status_code: int = 200) -> Response:
+        return Response(request.url, status_code, json.dumps(data).encode(), {"Content-Type": "application/json"})
+
+
+@pytest.fixture
+def fake_eternaltwin(hs256_key):
+    """Fixture configuring a `"fake"` alias in both registries, served by a `FakeEternaltwin`."""
+    fake = FakeEternaltwin()
+    config = {
+        "url": ETWIN_URL,
+        "client_id": ETWIN_CLIENT_ID,
+        "client_secret": ETWIN_CLIENT_SECRET,
+        "redirect_uri": ETWIN_REDIRECT_URL,
+        "state_key": hs256_key,
+    }
+    connections.create_connection("fake", **config, transport=FakeTransport(fake))
+    async_connections.create_connection("fake", **config, transport=AsyncFakeTransport(fake))
+    yield fake
+    connections.remove_connection("fake")
+    async_connections.remove_connection("fake")
+
+
+class CookieHandler(BaseHTTPRequestHandler):
+    """Set a cookie on every response, whose body is the `Cookie` header of the request."""
+
+    def do_GET(self):
+        body = self.headers.get("Cookie", "").encode()
+        self.send_response(200)
+        self.send_header("Set-Cookie", "session=secret; Path=/")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def cookie_server():
+    """Fixture for the URL of a local HTTP server setting cookies, see `CookieHandler`."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CookieHandler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    yield f"http://localhost:{server.server_port}/"
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
 def _get_authorization_code(client: ClientABC, username: str, password: str) -> str:
     # Authenticate the user on EternalTwin and retrieve the session_id
     session_id = requests.put(
@@ -144,6 +303,12 @@ def hs256_key(scope="session"):
     return HS256Key(secrets.token_hex(32))
 
 
+@pytest.fixture(scope="session")
+def compact_key():
+    """Fixture for compact symmetric key."""
+    return CompactKey(secrets.token_hex(32))
+
+
 @pytest.fixture(scope="session")
 def rs256_key():
     """Fixture for RS256 asymmetric key."""
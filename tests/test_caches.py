@@ -0,0 +1,66 @@
+import time
+from unittest import mock
+
+from eternaltwin.caches import Cache
+
+
+def test_get_set():
+    cache = Cache()
+    assert cache.get("a") is None
+    assert cache.get("a", "default") == "default"
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert len(cache) == 1
+    assert (cache.hits, cache.misses, cache.evictions) == (1, 2, 0)
+
+
+def test_ttl():
+    cache = Cache(ttl=10)
+    now = time.monotonic()
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=100)
+    cache.set("c", 3, ttl=0)
+    with mock.patch("eternaltwin.caches.time.monotonic", return_value=now + 50):
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+        assert cache.get("c") is None
+    assert len(cache) == 1
+
+
+def test_lru_eviction():
+    cache = Cache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_max_bytes():
+    cache = Cache(max_bytes=10)
+    cache.set("a", 1, size=4)
+    cache.set("b", 2, size=4)
+    cache.set("c", 3, size=4)
+    assert cache.get("a") is None
+    assert cache.size == 8
+    cache.set("d", 4, size=11)
+    assert cache.get("d") is None
+    cache.set("b", 5, size=2)
+    assert cache.size == 6
+    assert cache.evictions == 1
+
+
+def test_invalidate_clear():
+    cache = Cache()
+    cache.set("a", 1, size=1)
+    cache.set("b", 2, size=1)
+    cache.invalidate("a")
+    cache.invalidate("unknown")
+    assert cache.get("a") is None
+    assert cache.size == 1
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.size == 0
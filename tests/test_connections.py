@@ -1,7 +1,21 @@
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from urllib.parse import urljoin
+
 import pytest
 
+from eternaltwin.caches import Cache
+from eternaltwin.clients import endpoints
+from eternaltwin.clients.asyncio.clients import Eternaltwin as AsyncEternaltwin
 from eternaltwin.clients.sync.clients import Eternaltwin
-from eternaltwin.connections import Connections
+from eternaltwin.connections import Connections, async_connections, awarmup, configure, connections, warmup
+from eternaltwin.nonces import MemoryNonceTracker
+from eternaltwin.states import StatePool
+from eternaltwin.stores import MemoryTokenStore
 from tests.conftest import (
     ETWIN_CLIENT_ID,
     ETWIN_CLIENT_SECRET,
@@ -17,6 +31,8 @@ from tests.conftest import (
     ETWIN_REDIRECT_URL,
     ETWIN_SCHEME,
     ETWIN_URL,
+    AsyncFakeTransport,
+    FakeTransport,
 )
 
 
@@ -151,3 +167,196 @@ def test_configure_url_parts(hs256_key):
     )
     assert connections["default"] == witness_default
     assert connections["another"] == witness_another
+
+
+def test_warmup(hs256_key):
+    connections = Connections(Eternaltwin)
+    transports = {"default": FakeTransport(), "another": FakeTransport()}
+    for alias, transport in transports.items():
+        connections.create_connection(
+            alias,
+            url=ETWIN_URL,
+            client_id=ETWIN_CLIENT_ID,
+            client_secret=ETWIN_CLIENT_SECRET,
+            redirect_uri=ETWIN_REDIRECT_URL,
+            state_key=hs256_key,
+            transport=transport,
+        )
+
+    durations = connections.warmup(count=3)
+    assert set(durations) == {"default", "another"}
+    assert all(duration >= 0 for duration in durations.values())
+    for transport in transports.values():
+        assert len(transport.requests) == 3
+        assert all(request.url == urljoin(ETWIN_URL, endpoints.SELF) for request in transport.requests)
+
+
+async def test_awarmup(hs256_key):
+    connections = Connections(AsyncEternaltwin)
+    transports = {"default": AsyncFakeTransport(), "another": AsyncFakeTransport()}
+    for alias, transport in transports.items():
+        connections.create_connection(
+            alias,
+            url=ETWIN_URL,
+            client_id=ETWIN_CLIENT_ID,
+            client_secret=ETWIN_CLIENT_SECRET,
+            redirect_uri=ETWIN_REDIRECT_URL,
+            state_key=hs256_key,
+            transport=transport,
+        )
+
+    durations = await connections.awarmup(count=3)
+    assert set(durations) == {"default", "another"}
+    assert all(duration >= 0 for duration in durations.values())
+    for transport in transports.values():
+        assert len(transport.requests) == 3
+        assert all(request.url == urljoin(ETWIN_URL, endpoints.SELF) for request in transport.requests)
+
+
+@pytest.fixture
+def warmup_transports(configuration):
+    """Fixture configuring two aliases in both registries, returning their transports."""
+    transports = {
+        "default": (FakeTransport(), AsyncFakeTransport()),
+        "another": (FakeTransport(), AsyncFakeTransport()),
+    }
+    configure()
+    for alias, (transport, async_transport) in transports.items():
+        connections.create_connection(alias, **configuration["default"], transport=transport)
+        async_connections.create_connection(alias, **configuration["default"], transport=async_transport)
+    yield transports
+    configure()
+
+
+def test_module_warmup(warmup_transports):
+    assert set(warmup(count=0)) == {"default", "another"}
+    durations = warmup(count=2)
+    assert set(durations) == {"default", "another"}
+    for transport, async_transport in warmup_transports.values():
+        assert len(transport.requests) == 2 and not async_transport.requests
+
+
+async def test_module_awarmup(warmup_transports):
+    assert set(await awarmup(count=0)) == {"default", "another"}
+    durations = await awarmup(count=2)
+    assert set(durations) == {"default", "another"}
+    for transport, async_transport in warmup_transports.values():
+        assert len(async_transport.requests) == 2 and not transport.requests
+
+
+def test_configure_shares_values(configuration):
+    values = {
+        "user_cache": Cache(),
+        "token_store": MemoryTokenStore(),
+        "state_pool": StatePool(),
+        "nonce_tracker": MemoryNonceTracker(),
+        "state_executor": ThreadPoolExecutor(1),
+    }
+    configure(**{alias: {**config, **values} for alias, config in configuration.items()})
+    for name, value in values.items():
+        assert getattr(connections.get_connection(), name) is value
+        assert getattr(async_connections.get_connection(), name) is value
+    values["state_pool"].close()
+    values["state_executor"].shutdown()
+
+
+def test_configure_is_lazy(configuration):
+    registry = Connections(Eternaltwin)
+    with mock.patch.object(registry, "_client_class", wraps=Eternaltwin) as client_class:
+        registry.configure(**configuration, other=configuration["default"])
+        client_class.assert_not_called()
+        assert "other" in registry and list(registry) == ["default", "other"]
+        assert not registry.is_created("other")
+
+        client = registry.get_connection("other")
+        assert registry.get_connection("other") is client
+        assert registry.is_created("other") and not registry.is_created()
+        client_class.assert_called_once_with(**configuration["default"])
+        assert list(registry) == ["other", "default"]
+
+        del registry["default"]
+        del registry["other"]
+        assert "default" not in registry and "other" not in registry
+        with pytest.raises(KeyError, match="No connection found for alias 'default'"):
+            registry.get_connection()
+    client_class.assert_called_once()
+
+
+def test_configure_does_not_copy(configuration):
+    config = dict(configuration["default"])
+    configure(default=config)
+    config["timeout"] = 42  # The configuration is copied, not its values
+    assert connections.get_connection().timeout != 42
+    assert connections.get_connection().state_key is async_connections.get_connection().state_key
+
+
+def test_warmup_creates_configured_clients(hs256_key):
+    registry = Connections(Eternaltwin)
+    transport = FakeTransport()
+    config = {
+        "url": ETWIN_URL,
+        "client_id": ETWIN_CLIENT_ID,
+        "client_secret": ETWIN_CLIENT_SECRET,
+        "redirect_uri": ETWIN_REDIRECT_URL,
+        "state_key": hs256_key,
+        "transport": transport,
+    }
+    registry.configure(default=config)
+    assert set(registry.warmup()) == {"default"}
+    assert registry.is_created() and len(transport.requests) == 1
+
+
+def test_configure_flavor_specific_options(configuration):
+    options = {"pool_connections": 2, "pool_block": True, "pool_limit": 50, "dns_cache_ttl": 60, "keepalive_timeout": 5}
+    configure(default={**configuration["default"], **options, "pool_maxsize": 20})
+    transport = connections.get_connection().transport
+    assert (transport.pool_connections, transport.pool_block, transport.pool_maxsize) == (2, True, 20)
+    transport = async_connections.get_connection().transport
+    assert (transport.pool_limit, transport.dns_cache_ttl, transport.keepalive_timeout) == (50, 60, 5)
+    assert transport.pool_maxsize == 20
+
+
+def test_concurrent_creation(configuration):
+    registry = Connections(Eternaltwin)
+    registry.configure(**configuration)
+    barrier = threading.Barrier(8)
+
+    def slow_client(**kwargs):
+        time.sleep(0.01)  # Let the other threads find the client missing
+        return Eternaltwin(**kwargs)
+
+    def get():
+        barrier.wait()
+        return registry.get_connection()
+
+    with mock.patch.object(registry, "_client_class", side_effect=slow_client) as client_class:
+        with ThreadPoolExecutor(8) as executor:
+            clients = list(executor.map(lambda _: get(), range(8)))
+    client_class.assert_called_once()
+    assert all(client is clients[0] for client in clients)
+
+
+def test_failed_creation_keeps_the_configuration(configuration):
+    registry = Connections(Eternaltwin)
+    registry.configure(**configuration)
+    with mock.patch.object(registry, "_client_class", side_effect=ValueError):
+        with pytest.raises(ValueError):
+            registry.get_connection()
+    assert "default" in registry and not registry.is_created()
+    assert registry.get_connection() is registry.get_connection()
+
+
+@pytest.mark.parametrize(
+    "statement, loaded",
+    [
+        ("import eternaltwin.users, eternaltwin.keys", []),
+        ("from eternaltwin.connections import connections; connections.client_class", ["requests"]),
+        ("from eternaltwin.connections import async_connections; async_connections.client_class", ["aiohttp"]),
+        ("from eternaltwin.keys import HS256Key; HS256Key('a' * 32).encode({})", ["jwt"]),
+    ],
+)
+def test_dependencies_are_imported_lazily(statement, loaded):
+    modules = ("requests", "aiohttp", "jwt")
+    code = f"import sys; {statement}; print(*(m for m in {modules} if m in sys.modules))"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert output.split() == loaded
@@ -8,7 +8,7 @@ from eternaltwin.exceptions import RequestError
 def test_bad_request_error_requests(client):
     try:
         side_effect = [SimpleNamespace(status_code=405, content=b"method_not_allowed", url=client.url, headers={})]
-        with mock.patch("eternaltwin.clients.sync.clients.requests.request", side_effect=side_effect):
+        with mock.patch("eternaltwin.clients.sync.transports.requests.Session.request", side_effect=side_effect):
             client.post("/")
     except RequestError as error:
         assert error.response.content == b"method_not_allowed"
@@ -24,7 +24,7 @@ async def test_bad_request_error_aiohttp(async_client):
         mock_response.__aenter__.return_value = mock_response
         mock_response.__aexit__.return_value = AsyncMock()
         with mock.patch(
-            "eternaltwin.clients.asyncio.clients.aiohttp.ClientSession.request", return_value=mock_response
+            "eternaltwin.clients.asyncio.transports.aiohttp.ClientSession.request", return_value=mock_response
         ):
             await async_client.post("/")
     except RequestError as error:
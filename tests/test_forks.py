@@ -0,0 +1,139 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from typing import Any, Callable
+from unittest import mock
+
+import pytest
+
+from eternaltwin.clients.asyncio.singleflight import SingleFlight as AsyncSingleFlight
+from eternaltwin.clients.asyncio.transports import AiohttpTransport
+from eternaltwin.clients.sync.clients import Eternaltwin
+from eternaltwin.clients.sync.singleflight import SingleFlight
+from eternaltwin.clients.sync.transports import RequestsTransport
+from eternaltwin.connections import Connections
+from eternaltwin.forks import _after_fork_in_child, register_after_fork
+from eternaltwin.states import StatePool
+from tests.conftest import ETWIN_URL
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="Processes cannot be forked on this platform")
+
+
+def run_forked(fn: Callable[[], Any]) -> Any:
+    """Return the result of `fn()`, called in a forked child process."""
+    context = multiprocessing.get_context("fork")
+    queue = context.Queue()
+    process = context.Process(target=lambda: queue.put(fn()))
+    process.start()
+    try:
+        return queue.get(timeout=10)
+    finally:
+        process.join(1)
+        process.kill()
+
+
+class Forkable:
+    def __init__(self) -> None:
+        self.forked = False
+        register_after_fork(self)
+
+    def _after_fork(self) -> None:
+        self.forked = True
+
+
+def test_register_after_fork():
+    obj = Forkable()
+    assert run_forked(lambda: obj.forked) is True
+    assert obj.forked is False
+
+
+def test_requests_transport():
+    transport = RequestsTransport()
+    inherited = transport.session
+    assert run_forked(lambda: transport.session is not inherited and transport.session is transport.session)
+    assert transport.session is inherited
+
+
+def test_aiohttp_transport():
+    transport = AiohttpTransport()
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(transport.get_session())
+    assert run_forked(lambda: len(transport._sessions)) == 0
+    assert len(transport._sessions) == 1
+    loop.run_until_complete(transport.close())
+    loop.close()
+
+
+def test_state_pool(hs256_key):
+    pool = StatePool(size=4, low_water=2)
+    pool.bind(ETWIN_URL, hs256_key)
+    pool.fill()
+    inherited = {state.nonce for state in pool._states}
+
+    def child() -> tuple[int, bool]:
+        size = len(pool)
+        pool.pop()  # Starts the background thread of the child
+        deadline = time.monotonic() + 5
+        while len(pool) < pool.size and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return size, inherited.isdisjoint(state.nonce for state in pool._states)
+
+    assert run_forked(child) == (0, True)
+    assert len(pool) == 4
+    pool.close()
+
+
+def test_connections_lock(configuration):
+    registry = Connections(Eternaltwin)
+    registry.configure(**configuration)
+    with registry._lock:  # Held by another thread of the parent during the fork
+        assert run_forked(lambda: registry.get_connection() is registry.get_connection())
+    assert not registry.is_created()
+
+
+def test_singleflight_calls_in_flight():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    thread = threading.Thread(target=flight.do, args=("key", lambda: started.set() or release.wait()))
+    thread.start()
+    started.wait()
+    assert run_forked(lambda: flight.do("key", lambda: 42)) == 42  # Would wait forever for the parent's thread
+    release.set()
+    thread.join()
+
+
+async def test_async_singleflight_calls_in_flight():
+    flight = AsyncSingleFlight()
+    release = asyncio.Event()
+    task = asyncio.create_task(flight.do("key", release.wait))
+    await asyncio.sleep(0)
+    assert run_forked(lambda: len(flight)) == 0
+    release.set()
+    await task
+
+
+async def test_after_fork_in_process(hs256_key):
+    # Forked processes are not measured by coverage, run the hooks in the current process as well
+    obj, transport, async_transport = Forkable(), RequestsTransport(), AiohttpTransport()
+    pool, flight, async_flight = StatePool(size=1, low_water=1), SingleFlight(), AsyncSingleFlight()
+    registry = Connections(Eternaltwin)
+    pool.bind(ETWIN_URL, hs256_key)
+    pool.fill()
+    session, lock = transport.session, registry._lock
+    async_session = await async_transport.get_session()
+    flight._calls["key"] = async_flight._calls["key"] = object()
+
+    with mock.patch(
+        "eternaltwin.forks._objects", [obj, transport, async_transport, pool, flight, async_flight, registry]
+    ):
+        _after_fork_in_child()
+    assert obj.forked
+    assert transport.session is not session
+    assert not async_transport._sessions
+    assert len(pool) == 0 and pool._thread is None
+    assert len(flight) == len(async_flight) == 0
+    assert registry._lock is not lock
+    session.close()
+    await async_session.close()
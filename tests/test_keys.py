@@ -1,3 +1,15 @@
+import base64
+import copy
+import pickle
+import time
+from unittest import mock
+
+import jwt
+import pytest
+
+from eternaltwin.keys import CompactKey, HS256Key, KeyRing
+
+
 def test_hs256key(hs256_key, payload):
     assert hs256_key.decode(hs256_key.encode(payload)) == payload
 
@@ -16,3 +28,160 @@ def test_ps256key(ps256_key, payload):
 
 def test_eddsakey(eddsa_key, payload):
     assert eddsa_key.decode(eddsa_key.encode(payload)) == payload
+
+
+def test_compactkey(compact_key, hs256_key, payload):
+    assert compact_key.decode(compact_key.encode(payload)) == payload
+    assert len(compact_key.encode(payload)) < len(hs256_key.encode(payload)) / 2
+
+
+@pytest.mark.parametrize("nonce", ["", "nonce", "ABCDEF", "abc", "état"])
+def test_compactkey_non_hexadecimal_nonce(compact_key, payload, nonce):
+    payload["nonce"] = nonce
+    assert compact_key.decode(compact_key.encode(payload)) == payload
+
+
+def test_compactkey_only_encodes_states(compact_key, payload):
+    with pytest.raises(ValueError, match="Only state payloads"):
+        compact_key.encode({**payload, "extra": True})
+    del payload["rfp"]
+    with pytest.raises(ValueError, match="Only state payloads"):
+        compact_key.encode(payload)
+
+
+def test_compactkey_invalid_signature(compact_key, payload):
+    token = compact_key.encode(payload)
+    with pytest.raises(jwt.InvalidSignatureError):
+        CompactKey("other").decode(token)
+
+    data = bytearray(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    data[10] ^= 1
+    with pytest.raises(jwt.InvalidSignatureError):
+        compact_key.decode(base64.urlsafe_b64encode(data).rstrip(b"=").decode())
+
+
+def sign(key: CompactKey, data: bytes) -> str:
+    return base64.urlsafe_b64encode(data + key._mac(data)).rstrip(b"=").decode()
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        CompactKey._HEADER.pack(2, 0, 0, 0, 0, 0) + CompactKey._NONCE.pack(False, 0),  # Unknown version
+        CompactKey._HEADER.pack(1, 0, 0, 0, 0, 0) + CompactKey._NONCE.pack(False, 1),  # Truncated
+        CompactKey._HEADER.pack(1, 0, 0, 0, 0, 0) + CompactKey._NONCE.pack(False, 0) + b"trailing",
+        CompactKey._HEADER.pack(1, 0, 0, 0, 40, 0) + CompactKey._NONCE.pack(False, 0),  # Sizes out of bounds
+        CompactKey._HEADER.pack(1, 0, 0, 0, 1, 0) + b"\xff" + CompactKey._NONCE.pack(False, 0),  # Invalid UTF-8
+    ],
+)
+def test_compactkey_malformed(compact_key, data):
+    with pytest.raises(jwt.DecodeError, match="Invalid payload"):
+        compact_key.decode(sign(compact_key, data))
+
+
+@pytest.mark.parametrize("token", ["", "AAAA", "not base64!", "é"])
+def test_compactkey_malformed_token(compact_key, token):
+    with pytest.raises(jwt.DecodeError):
+        compact_key.decode(token)
+
+
+@pytest.mark.parametrize("fixture", ["rs256_key", "es256_key", "ps256_key", "eddsa_key"])
+def test_asymmetric_keys_are_loaded_once(request, fixture, payload):
+    key = request.getfixturevalue(fixture)
+    with (
+        mock.patch("jwt.algorithms.load_pem_private_key", side_effect=AssertionError),
+        mock.patch("jwt.algorithms.load_pem_public_key", side_effect=AssertionError),
+        mock.patch("jwt.algorithms.load_ssh_public_key", side_effect=AssertionError),
+    ):
+        assert key.decode(key.encode(payload)) == payload
+
+
+def test_compactkey_has_no_headers(compact_key, payload):
+    with pytest.raises(ValueError, match="headers"):
+        compact_key.encode(payload, headers={"kid": "key"})
+
+
+def test_keyring(hs256_key, rs256_key, payload):
+    ring = KeyRing("first", hs256_key)
+    token = ring.encode(payload, headers={"typ": "state"})
+    assert jwt.get_unverified_header(token) == {"alg": "HS256", "kid": "first", "typ": "state"}
+    assert ring.decode(token) == payload
+    assert ring.algorithm == "HS256"
+    assert ring.active_kid == "first"
+
+    ring.rotate("second", rs256_key)
+    assert ring.algorithm == "RS256"
+    assert jwt.get_unverified_header(ring.encode(payload))["kid"] == "second"
+    assert ring.decode(ring.encode(payload)) == payload
+    assert ring.decode(token) == payload  # Signed before the rotation
+    assert "first" in ring and "second" in ring and len(ring) == 2
+
+
+def test_keyring_selects_the_key_from_the_header(hs256_key, rs256_key, payload):
+    ring = KeyRing("first", hs256_key)
+    ring.rotate("second", rs256_key)
+    token = ring.encode(payload)
+    with mock.patch.object(hs256_key, "decode", side_effect=AssertionError):
+        assert ring.decode(token) == payload
+
+
+def test_keyring_retention(hs256_key, rs256_key, es256_key, payload):
+    ring = KeyRing("first", hs256_key, retention=60)
+    legacy, token = hs256_key.encode(payload), ring.encode(payload)
+    now = time.time()
+    with mock.patch("time.time", return_value=now):
+        ring.rotate("second", rs256_key)
+    with mock.patch("time.time", return_value=now + 59):
+        assert ring.decode(token) == payload
+        assert ring.decode(legacy) == payload  # Without `kid`, verified with the initial key
+    with mock.patch("time.time", return_value=now + 60):
+        assert "first" not in ring
+        with pytest.raises(jwt.InvalidSignatureError, match="'first'"):
+            ring.decode(token)
+        with pytest.raises(jwt.InvalidSignatureError, match="'first'"):
+            ring.decode(legacy)
+        ring.rotate("third", es256_key)
+    assert len(ring) == 2  # The first key is dropped on rotation
+
+
+def test_keyring_invalid(hs256_key, compact_key, payload):
+    ring = KeyRing("first", hs256_key)
+    with pytest.raises(ValueError, match="already used"):
+        ring.rotate("first", hs256_key)
+    with pytest.raises(ValueError, match="CompactKey"):
+        ring.rotate("compact", compact_key)
+    with pytest.raises(ValueError, match="KeyRing"):
+        KeyRing("ring", ring)
+    with pytest.raises(jwt.InvalidSignatureError, match="'unknown'"):
+        ring.decode(hs256_key.encode(payload, headers={"kid": "unknown"}))
+    with pytest.raises(jwt.DecodeError):
+        ring.decode("invalid")
+
+
+def test_keyring_copy_and_pickle(hs256_key, rs256_key, payload):
+    ring = KeyRing("first", hs256_key)
+    ring.rotate("second", rs256_key)
+    unpickled = pickle.loads(pickle.dumps(ring))
+    assert unpickled.decode(ring.encode(payload)) == payload
+    unpickled.rotate("third", hs256_key)
+    assert unpickled.active_kid == "third"
+    assert ring.active_kid == "second"
+
+
+def test_asymmetric_keys_are_unpickled_once(rs256_key, payload):
+    data = pickle.dumps(rs256_key)
+    unpickled = pickle.loads(data)
+    with mock.patch("jwt.algorithms.load_pem_private_key", side_effect=AssertionError):
+        assert pickle.loads(data) is unpickled
+
+
+@pytest.mark.parametrize("fixture", ["hs256_key", "rs256_key", "es256_key", "ps256_key", "eddsa_key", "compact_key"])
+def test_copy_and_pickle(request, fixture, payload):
+    key = request.getfixturevalue(fixture)
+    copied = copy.deepcopy(key)
+    assert copied.decode(key.encode(payload)) == payload
+
+    unpickled = pickle.loads(pickle.dumps(key))
+    assert type(unpickled) is type(key)
+    assert unpickled.decode(key.encode(payload)) == payload
+    assert key.decode(unpickled.encode(payload)) == payload
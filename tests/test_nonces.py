@@ -0,0 +1,117 @@
+import multiprocessing
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+from eternaltwin.nonces import BloomNonceTracker, MemoryNonceTracker, SQLiteNonceTracker
+
+
+@pytest.fixture(params=["memory", "bloom", "sqlite"])
+def tracker(request, tmp_path):
+    if request.param == "memory":
+        yield MemoryNonceTracker()
+    elif request.param == "bloom":
+        yield BloomNonceTracker(capacity=1000)
+    else:
+        tracker = SQLiteNonceTracker(tmp_path / "nonces.sqlite3")
+        yield tracker
+        tracker.close()
+
+
+def test_consume(tracker):
+    exp = int(time.time()) + 600
+    assert tracker.consume("nonce", exp) is True
+    assert tracker.consume("nonce", exp) is False
+    assert tracker.consume("other", exp) is True
+    assert tracker.consume("nonce", exp + 1) is True  # Another state with the same nonce
+
+
+def test_threads(tracker):
+    exp = int(time.time()) + 600
+    results = []
+    barrier = threading.Barrier(8)
+
+    def worker():
+        barrier.wait()
+        results.extend(tracker.consume(f"nonce{i}", exp) for i in range(50))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results.count(True) == 50
+
+
+@pytest.mark.parametrize("cls", [MemoryNonceTracker, BloomNonceTracker])
+def test_expired_buckets_are_dropped(cls):
+    tracker = cls(bucket=60)
+    now = 6000
+    with mock.patch("time.time", return_value=now):
+        tracker.consume("nonce", now + 10)
+        tracker.consume("nonce", now + 60)
+        tracker.consume("nonce", now + 600)
+        assert len(tracker) == 3
+    with mock.patch("time.time", return_value=now + 59):
+        tracker.consume("other", now + 600)
+        assert len(tracker) == 3  # States expiring at `now + 10` are not expired yet
+    with mock.patch("time.time", return_value=now + 60):
+        tracker.consume("other", now + 600)
+        assert len(tracker) == 2
+    with mock.patch("time.time", return_value=now + 120):
+        tracker.consume("other", now + 600)
+        assert len(tracker) == 1
+        assert tracker.consume("nonce", now + 600) is False
+
+
+def test_invalid_parameters():
+    with pytest.raises(ValueError, match="bucket"):
+        MemoryNonceTracker(bucket=0)
+    with pytest.raises(ValueError, match="error_rate"):
+        BloomNonceTracker(error_rate=1)
+
+
+def test_bloom_false_positive_rate():
+    tracker = BloomNonceTracker(capacity=2000, error_rate=0.01)
+    exp = 4_000_000_000  # Fixed, so that the hashes, and therefore the false positives, are deterministic
+    false_positives = sum(not tracker.consume(f"nonce{i}", exp) for i in range(2000))
+    assert false_positives < 2000 * 0.01
+    assert not any(tracker.consume(f"nonce{i}", exp) for i in range(2000))  # Replays are always detected
+    assert all(tracker.consume(f"nonce{i}", exp + 1000) for i in range(100))  # Another bucket
+    false_positives = sum(not tracker.consume(f"unseen{i}", exp) for i in range(200))
+    assert false_positives < 200 * 0.01 * 2  # The bucket keeps filling beyond its capacity while probing
+
+
+def test_sqlite_prune(tmp_path):
+    tracker = SQLiteNonceTracker(tmp_path / "nonces.sqlite3", prune_interval=0)
+    now = int(time.time())
+    tracker.consume("expired", now - 10)
+    assert tracker.consume("valid", now + 600) is True  # Prunes the expired state
+    assert tracker.prune() == 0
+    assert tracker.consume("expired", now - 10) is True
+
+    tracker.prune_interval = 60
+    tracker.consume("expired", now - 5)
+    assert tracker.prune() == 2
+    tracker.close()
+
+
+def _consume(path: str, queue: multiprocessing.Queue, exp: int) -> None:
+    tracker = SQLiteNonceTracker(path)
+    queue.put(sum(tracker.consume(f"nonce{i}", exp) for i in range(50)))
+
+
+def test_sqlite_is_shared_between_processes(tmp_path):
+    path = str(tmp_path / "nonces.sqlite3")
+    exp = int(time.time()) + 600
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    processes = [context.Process(target=_consume, args=(path, queue, exp)) for _ in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+    assert sum(queue.get() for _ in processes) == 50
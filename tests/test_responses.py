@@ -0,0 +1,29 @@
+import json
+from unittest import mock
+
+from eternaltwin import responses
+from eternaltwin.responses import Response, get_json_decoder, set_json_decoder
+
+
+def test_json_is_memoized():
+    response = Response("", 200, b'{"count": 1}', {})
+    assert response.json() == {"count": 1}
+    assert response.json() is response.json()
+
+
+def test_set_json_decoder():
+    default = get_json_decoder()
+    decoder = mock.Mock(side_effect=json.loads)
+    try:
+        set_json_decoder(decoder)
+        assert get_json_decoder() is decoder
+        assert Response("", 200, b'{"count": 1}', {}).json() == {"count": 1}
+        decoder.assert_called_once_with(b'{"count": 1}')
+    finally:
+        set_json_decoder(None)
+    assert get_json_decoder() is default
+
+
+def test_default_json_decoder():
+    with mock.patch.object(responses, "orjson", None):
+        assert responses._default_json_decoder() is json.loads
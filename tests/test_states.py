@@ -1,7 +1,13 @@
+import copy
+import pickle
+import time
+from unittest import mock
+
 import pytest
 
 from eternaltwin.exceptions import InvalidStateError
-from eternaltwin.states import State
+from eternaltwin.keys import KeyRing
+from eternaltwin.states import State, StatePool
 from tests.conftest import ETWIN_URL
 
 
@@ -10,6 +16,23 @@ def test_encoding_decoding_state(rs256_key):
     assert state == state.from_jwt(state.jwt, ETWIN_URL, rs256_key)
 
 
+def test_compact_state(compact_key, payload):
+    state = State.new(ETWIN_URL, compact_key)
+    assert state == State.from_jwt(state.jwt, ETWIN_URL, compact_key)
+
+    payload["as"] = "invalid"
+    with pytest.raises(InvalidStateError, match="Expected authorization server"):
+        State.from_jwt(compact_key.encode(payload), ETWIN_URL, compact_key)
+
+
+def test_state_survives_key_rotation(hs256_key, rs256_key):
+    ring = KeyRing("first", hs256_key)
+    state = State.new(ETWIN_URL, ring)
+    jwt = state.jwt
+    ring.rotate("second", rs256_key)
+    assert State.from_jwt(jwt, ETWIN_URL, ring) == state
+
+
 def test_invalid_state_action(rs256_key, payload):
     payload["a"] = "invalid"
     jwt = rs256_key.encode(payload)
@@ -29,3 +52,129 @@ def test_invalid_state_expiration(rs256_key, payload):
     jwt = rs256_key.encode(payload)
     with pytest.raises(InvalidStateError, match="Authorization expired"):
         State.from_jwt(jwt, ETWIN_URL, rs256_key)
+
+
+def test_state_is_signed_once(rs256_key):
+    state = State.new(ETWIN_URL, rs256_key)
+    with mock.patch.object(rs256_key, "encode", wraps=rs256_key.encode) as encode:
+        jwt = state.jwt
+        assert state.jwt is jwt
+    encode.assert_called_once()
+
+
+def test_state_hash_and_eq_do_not_sign(rs256_key):
+    state = State.new(ETWIN_URL, rs256_key)
+    with mock.patch.object(rs256_key, "encode", side_effect=AssertionError):
+        same = State(state.a, state.as_, state.iat, state.rfp, state.exp, state.nonce, rs256_key)
+        assert state == same
+        assert len({state, same, State.new(ETWIN_URL, rs256_key)}) == 2
+        assert state != State.new(ETWIN_URL, rs256_key, nonce="other")
+        assert state != "state"
+
+
+def test_from_jwt_keeps_the_received_jwt(rs256_key):
+    jwt = State.new(ETWIN_URL, rs256_key).jwt
+    with mock.patch.object(rs256_key, "encode", side_effect=AssertionError):
+        assert State.from_jwt(jwt, ETWIN_URL, rs256_key).jwt is jwt
+
+
+def test_state_is_immutable(hs256_key):
+    state = State.new(ETWIN_URL, hs256_key)
+    with pytest.raises(AttributeError):
+        state.nonce = "other"
+    with pytest.raises(AttributeError):
+        del state.exp
+    with pytest.raises(AttributeError):
+        state.unknown = True
+
+
+@pytest.mark.parametrize("signed", [False, True])
+def test_state_copy_and_pickle(rs256_key, signed):
+    state = State.new(ETWIN_URL, rs256_key)
+    if signed:
+        state.jwt
+    for other in (copy.copy(state), copy.deepcopy(state), pickle.loads(pickle.dumps(state))):
+        assert other == state and other._jwt == state._jwt
+        assert State.from_jwt(other.jwt, ETWIN_URL, rs256_key) == state
+
+
+def wait_until(predicate, timeout: float = 5) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "Timed out"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def pool(hs256_key):
+    pool = StatePool(size=8, low_water=4, expiration=600, min_remaining=60)
+    pool.bind(ETWIN_URL, hs256_key)
+    yield pool
+    pool.close()
+
+
+def test_pool_parameters():
+    with pytest.raises(ValueError):
+        StatePool(size=4, low_water=8)
+    with pytest.raises(ValueError):
+        StatePool(expiration=60, min_remaining=60)
+    pool = StatePool()
+    with pytest.raises(ValueError):
+        pool.fill()
+
+
+def test_pool_bind(pool, hs256_key):
+    pool.bind(ETWIN_URL, hs256_key)
+    with pytest.raises(ValueError):
+        pool.bind("https://other.org/", hs256_key)
+
+
+def test_pool_pop_and_refill(pool, hs256_key):
+    assert pool.fill() == 8
+    assert pool.fill() == 0
+    states = {pool.pop() for _ in range(5)}
+    assert len(states) == 5
+    for state in states:
+        assert State.from_jwt(state.jwt, ETWIN_URL, hs256_key) == state
+    wait_until(lambda: len(pool) == 8)  # Refilled by the background thread
+    assert (pool.hits, pool.misses) == (5, 0)
+
+
+def test_pool_discards_states_about_to_expire(pool):
+    pool.fill()
+    stale = State.new(ETWIN_URL, pool._key, expiration=30)
+    pool._states.appendleft(stale)
+    assert pool.pop() != stale
+    assert pool.discarded == 1
+
+
+def test_pool_empty(pool):
+    assert pool.pop() is None
+    assert pool.misses == 1
+    wait_until(lambda: len(pool) == 8)
+
+
+def test_pool_wakes_up_to_purge_without_refilling(pool):
+    pool.fill()
+    pool._states.appendleft(State.new(ETWIN_URL, pool._key, expiration=30))
+    closed = iter([False, True])  # Woken up by the interval, then by `close()`
+
+    def wait_for(predicate, timeout):
+        pool._closed = next(closed)
+        return predicate()
+
+    with mock.patch.object(pool._condition, "wait_for", side_effect=wait_for), mock.patch.object(pool, "fill") as fill:
+        pool._run()
+    assert (pool.discarded, len(pool)) == (1, 8)
+    fill.assert_not_called()
+
+
+def test_pool_close(pool):
+    pool.fill()
+    pool.pop()
+    pool.close()
+    assert not pool._thread.is_alive()
+    for _ in range(7):
+        assert pool.pop() is not None
+    assert pool.pop() is None
+    assert pool.fill() == 0
@@ -0,0 +1,121 @@
+import multiprocessing
+import threading
+import time
+
+import pytest
+
+from eternaltwin.stores import MemoryTokenStore, SQLiteTokenStore
+from eternaltwin.tokens import Token
+
+
+def make_token(i: int = 0, refresh_token: str | None = "refresh", expires_in: int = 3600) -> Token:
+    return Token(access_token=f"access{i}", refresh_token=refresh_token, expires_in=expires_in, token_type="Bearer")
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        yield MemoryTokenStore()
+    else:
+        store = SQLiteTokenStore(tmp_path / "tokens.sqlite3")
+        yield store
+        store.close()
+
+
+def test_set_get_delete(store):
+    assert store.get("session") is None
+    token = make_token()
+    store.set("session", token)
+    stored = store.get("session")
+    assert stored is not token
+    assert stored.to_dict() == token.to_dict()
+
+    store.set("session", make_token(1))
+    assert store.get("session").access_token == "access1"
+    if isinstance(store, MemoryTokenStore):
+        assert len(store) == 1
+
+    store.delete("session")
+    store.delete("session")
+    assert store.get("session") is None
+
+
+def test_stored_token_is_a_copy(store):
+    token = make_token()
+    store.set("session", token)
+    token.access_token = "modified"
+    assert store.get("session").access_token == "access0"
+
+
+def test_expired_tokens(store):
+    store.set("refreshable", make_token(expires_in=0))
+    store.set("expired", make_token(refresh_token=None, expires_in=0))
+    store.set("valid", make_token(refresh_token=None))
+    assert store.get("refreshable").has_expired()
+    assert store.get("expired") is None
+    assert store.get("valid") is not None
+
+    assert store.prune() == 1
+    assert store.prune() == 0
+    assert store.get("refreshable") is not None
+
+
+def test_threads(store):
+    def worker(i):
+        for j in range(20):
+            store.set(f"session{i}-{j}", make_token(j))
+            assert store.get(f"session{i}-{j}").access_token == f"access{j}"
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(store.get(f"session{i}-19") is not None for i in range(4))
+
+
+def _write_tokens(path: str, worker: int) -> None:
+    store = SQLiteTokenStore(path)
+    for i in range(20):
+        store.set(f"session{worker}-{i}", make_token(i))
+    store.set("shared", make_token(worker))
+
+
+def test_sqlite_is_shared_between_processes(tmp_path):
+    path = str(tmp_path / "tokens.sqlite3")
+    store = SQLiteTokenStore(path)
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=_write_tokens, args=(path, worker)) for worker in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+    assert all(store.get(f"session{worker}-19").access_token == "access19" for worker in range(4))
+    assert store.get("shared").access_token in {f"access{worker}" for worker in range(4)}
+    store.close()
+
+
+def test_sqlite_keeps_expiration(tmp_path):
+    store = SQLiteTokenStore(tmp_path / "tokens.sqlite3")
+    token = make_token()
+    token.expiration = int(time.time()) + 42
+    store.set("session", token)
+    assert store.get("session").expiration == token.expiration
+    store.close()
+    store.close()
+    assert store.get("session") is not None
+    store.close()
+
+
+def test_sqlite_after_fork(tmp_path):
+    store = SQLiteTokenStore(tmp_path / "tokens.sqlite3")
+    store.set("session", make_token())
+    parent = store._connect()
+    store._pid = -1  # Emulate a fork, the connections of the "parent" must not be reused nor closed
+    store._local.pid = -1
+    assert store._connect() is not parent
+    assert store.get("session") is not None
+    store.close()
+    parent.execute("SELECT 1")
+    parent.close()
@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from eternaltwin.streaming import JSONStreamParser
+
+PAYLOAD = {
+    "count": 12345,
+    "items": [{"id": 1, "name": 'é"}]'}, [], "x", 3.25, None, True, {"nested": {"items": [1, 2]}}],
+    "next": None,
+}
+
+
+def parse(content: bytes, chunk_size: int) -> tuple[list, dict]:
+    parser = JSONStreamParser("items")
+    items = []
+    for i in range(0, len(content), chunk_size):
+        items.extend(parser.feed(content[i : i + chunk_size]))
+    parser.close()
+    return items, parser.fields
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+def test_every_chunk_size(indent):
+    content = json.dumps(PAYLOAD, indent=indent, ensure_ascii=False).encode()
+    for chunk_size in range(1, len(content) + 1):
+        items, fields = parse(content, chunk_size)
+        assert items == PAYLOAD["items"]
+        assert fields == {"count": 12345, "next": None}
+
+
+def test_items_are_returned_as_soon_as_complete():
+    parser = JSONStreamParser("items")
+    assert parser.feed(b'{"items": [{"id": 1}, {"i') == [{"id": 1}]
+    assert parser.feed(b'd": 2}, 12') == [{"id": 2}]
+    assert parser.feed(b"3") == []
+    assert parser.feed(b"]") == [123]
+    assert parser.feed(b', "count": 3}') == []
+    parser.close()
+    assert parser.fields == {"count": 3}
+
+
+def test_buffer_only_holds_the_current_item():
+    parser = JSONStreamParser("items")
+    parser.feed(b'{"items": [')
+    for i in range(100):
+        parser.feed(json.dumps({"id": i}).encode() + b", ")
+        assert len(parser._buffer) < 16
+
+
+def test_empty():
+    assert parse(b'{"count": 0, "items": []}', 3) == ([], {"count": 0})
+    assert parse(b"{}", 1) == ([], {})
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        b"[]",
+        b'{"items": [1 2]}',
+        b'{"items": {}}',
+        b'{"count" 1}',
+        b'{"items": [1]} {}',
+        b'{"items": [1]',
+        b'{"items": ["ab',
+    ],
+)
+def test_invalid(content):
+    with pytest.raises(json.JSONDecodeError):
+        parse(content, 4)
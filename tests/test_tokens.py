@@ -1,7 +1,58 @@
 import time
 
+import pytest
+
+from eternaltwin.tokens import Token
+
 
 def test_has_expired(token):
     assert not token.has_expired()
     token.expiration = int(time.time()) - 120
     assert token.has_expired()
+
+
+def test_slots(token):
+    assert not hasattr(token, "__dict__")
+    with pytest.raises(AttributeError):
+        token.unknown = True
+
+
+def test_needs_refresh():
+    token = Token(access_token="access", expires_in=600, token_type="Bearer")
+    assert not token.needs_refresh()
+    assert token.needs_refresh(leeway=540)
+    assert not token.needs_refresh(leeway=500, jitter=30)
+
+    token._jitter = 0.5
+    assert token.needs_refresh(leeway=500, jitter=100)
+    assert not token.needs_refresh(leeway=500, jitter=60)
+
+
+def test_jitter_is_drawn_per_token():
+    jitters = {Token(access_token="access", expires_in=600, token_type="Bearer")._jitter for _ in range(10)}
+    assert len(jitters) == 10
+    assert all(0 <= jitter < 1 for jitter in jitters)
+
+
+def test_update(token):
+    fresh = Token(access_token="fresh", refresh_token="refresh2", expires_in=60, token_type="Bearer")
+    jitter = token._jitter
+    token.update(fresh)
+    assert (token.access_token, token.refresh_token, token.expiration) == ("fresh", "refresh2", fresh.expiration)
+    assert token._jitter == jitter
+
+
+def test_dict_round_trip(token):
+    token.expiration = 1234
+    loaded = Token.from_dict(token.to_dict())
+    assert (
+        loaded.to_dict()
+        == token.to_dict()
+        == {
+            "access_token": "access",
+            "refresh_token": "refresh",
+            "expiration": 1234,
+            "token_type": "Bearer",
+        }
+    )
+    assert 0 <= loaded._jitter < 1
@@ -1,10 +1,17 @@
+import asyncio
+from datetime import datetime, timezone
 from urllib.parse import parse_qs, urljoin, urlparse
 
+import pytest
 import requests
 
+from eternaltwin.caches import Cache
 from eternaltwin.connections import async_connections, configure, connections
+from eternaltwin.exceptions import RequestError
+from eternaltwin.stores import MemoryTokenStore
+from eternaltwin.tokens import Token
 from eternaltwin.users import User
-from tests.conftest import ETWIN_USER1_PASSWORD, ETWIN_USER1_USERNAME
+from tests.conftest import ETWIN_USER1_PASSWORD, ETWIN_USER1_USERNAME, AsyncStreamingFakeTransport
 
 
 def test_synchronous_authorization_process(configuration):
@@ -134,3 +141,232 @@ def test_logout(configuration, user1_token):
     assert not user.is_authenticated
     user.logout()
     assert not user.is_authenticated
+
+
+async def test_asynchronous_authorization_process_offloaded(fake_eternaltwin):
+    state, url = await User.astart_authorization(using="fake")
+    assert f"state={state}" in url
+    user = await User.afrom_authorization_code("code", state, state, using="fake")
+    assert user.is_authenticated
+    assert user.username == "user0"
+
+
+def test_get_many(fake_eternaltwin):
+    ids = [fake_eternaltwin.users[2]["id"], "unknown", fake_eternaltwin.users[0]["id"], fake_eternaltwin.users[2]["id"]]
+    users = User.get_many(ids, concurrency=2, using="fake")
+    assert [user.username for user in (users[0], users[2], users[3])] == ["user2", "user0", "user2"]
+    assert users[0] is users[3]
+    assert isinstance(users[1], RequestError)
+    assert users[1].response.status_code == 404
+    assert len(connections.get_connection("fake").transport.requests) == 3
+    assert User.get_many([], using="fake") == []
+    assert [user.username for user in User.get_many(ids[:1], concurrency=0, using="fake")] == ["user2"]
+
+
+async def test_aget_many(fake_eternaltwin):
+    ids = [fake_eternaltwin.users[2]["id"], "unknown", fake_eternaltwin.users[0]["id"], fake_eternaltwin.users[2]["id"]]
+    users = await User.aget_many(ids, concurrency=2, using="fake")
+    assert [user.username for user in (users[0], users[2], users[3])] == ["user2", "user0", "user2"]
+    assert users[0] is users[3]
+    assert isinstance(users[1], RequestError)
+    assert users[1].response.status_code == 404
+    assert len(async_connections.get_connection("fake").transport.requests) == 3
+    assert await User.aget_many([], using="fake") == []
+    assert [user.username for user in await User.aget_many(ids[:1], concurrency=0, using="fake")] == ["user2"]
+
+
+def test_iter_search(fake_eternaltwin):
+    usernames = [user.username for user in User.iter_search(page_size=3, using="fake")]
+    assert usernames == [f"user{i}" for i in range(8)]
+    assert len(connections.get_connection("fake").transport.requests) == 3
+
+    assert [user.username for user in User.iter_search("user7", using="fake")] == ["user7"]
+    assert list(User.iter_search("unknown", using="fake")) == []
+
+    iterator = User.iter_search(page_size=2, using="fake")
+    assert next(iterator).username == "user0"
+    iterator.close()
+
+
+async def test_aiter_search(fake_eternaltwin):
+    usernames = [user.username async for user in User.aiter_search(page_size=3, using="fake")]
+    assert usernames == [f"user{i}" for i in range(8)]
+    assert len(async_connections.get_connection("fake").transport.requests) == 3
+
+    assert [user.username async for user in User.aiter_search("user7", using="fake")] == ["user7"]
+    assert [user async for user in User.aiter_search("unknown", using="fake")] == []
+
+    iterator = User.aiter_search(page_size=2, using="fake")
+    assert (await anext(iterator)).username == "user0"
+    await iterator.aclose()
+
+
+async def test_acrawl(fake_eternaltwin):
+    users = [user async for user in User.acrawl(page_size=3, concurrency=2, using="fake")]
+    assert sorted(user.username for user in users) == [f"user{i}" for i in range(8)]
+    assert len(async_connections.get_connection("fake").transport.requests) == 3
+
+    crawler = User.acrawl(page_size=1, using="fake")
+    assert (await anext(crawler)).username == "user0"
+    await crawler.aclose()
+
+
+async def test_acrawl_shifting_users(fake_eternaltwin):
+    transport = async_connections.get_connection("fake").transport
+    original = transport.handler
+
+    def handler(request):  # Users are created and deleted at the start of the directory after the first page
+        if len(transport.requests) == 2:
+            fake_eternaltwin.users[0:0] = [dict(fake_eternaltwin.users[0], id=f"new{i}") for i in range(2)]
+        if len(transport.requests) == 3:
+            del fake_eternaltwin.users[3]
+        return original(request)
+
+    transport.handler = handler
+    ids = [user.identifier async for user in User.acrawl(page_size=3, concurrency=1, overlap=1, using="fake")]
+    assert len(ids) == len(set(ids))
+    # Every user existing during the whole crawl must have been found
+    assert set(ids) >= {user["id"] for user in fake_eternaltwin.users} - {"new0", "new1"}
+
+
+@pytest.mark.parametrize("capped_after", [0, 1])
+async def test_acrawl_capped_page_size(fake_eternaltwin, capped_after):
+    transport = async_connections.get_connection("fake").transport
+    original = transport.handler
+
+    def handler(request):  # The server returns at most 2 users per page, from the request `capped_after`
+        if len(transport.requests) > capped_after:
+            request.params["limit"] = min(int(request.params["limit"]), 2)
+        return original(request)
+
+    transport.handler = handler
+    users = [user async for user in User.acrawl(page_size=5, concurrency=2, using="fake")]
+    assert sorted(user.username for user in users) == [f"user{i}" for i in range(8)]
+
+
+def test_crawl(fake_eternaltwin):
+    usernames = [user.username for user in User.crawl(page_size=3, concurrency=2, using="fake")]
+    assert sorted(usernames) == [f"user{i}" for i in range(8)]
+
+    crawler = User.crawl(page_size=1, using="fake")
+    assert next(crawler).username == "user0"
+    crawler.close()
+
+
+def test_lazy_timestamps(fake_eternaltwin):
+    user = User._from_response(None, dict(fake_eternaltwin.users[0], deleted_at="2024-02-01T00:00:00Z"))
+    assert isinstance(user._created_at, str)
+    assert user.created_at == datetime(2024, 1, 1, tzinfo=timezone.utc)
+    assert user._created_at is user.created_at
+    assert user.deleted_at == datetime(2024, 2, 1, tzinfo=timezone.utc)
+
+    user.deleted_at = None
+    assert user.deleted_at is None
+    user.created_at = "2025-01-01T00:00:00Z"
+    assert user.created_at == datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+    with pytest.raises(AttributeError):
+        user.unknown = True
+
+
+async def test_aiter_search_stream(fake_eternaltwin):
+    client = async_connections.get_connection("fake")
+    client.transport = transport = AsyncStreamingFakeTransport(fake_eternaltwin)
+
+    usernames = [user.username async for user in User.aiter_search(page_size=3, using="fake", stream=True)]
+    assert usernames == [f"user{i}" for i in range(8)]
+    assert len(transport.requests) == 3
+    assert len(transport.chunks) > 3 * 8  # Users were parsed from several chunks
+
+    assert [user.username async for user in User.aiter_search("user7", using="fake", stream=True)] == ["user7"]
+    assert [user async for user in User.aiter_search("unknown", using="fake", stream=True)] == []
+
+    iterator = User.aiter_search(page_size=2, using="fake", stream=True)
+    assert (await anext(iterator)).username == "user0"
+    await iterator.aclose()
+
+
+def test_from_token_refreshes_expiring_token(fake_eternaltwin):
+    token = Token(access_token="stale", refresh_token="refresh", expires_in=60, token_type="Bearer")
+    user = User.from_token(token, using="fake")
+    assert user.username == "user0"
+    assert user.token is token
+    assert token.access_token == "access1"
+    assert connections.get_connection("fake").transport.requests[-1].headers == {"Authorization": "Bearer access1"}
+
+    User.from_token(token, using="fake")
+    assert fake_eternaltwin.refreshes == 1
+
+
+async def test_afrom_token_refreshes_expiring_token(fake_eternaltwin):
+    token = Token(access_token="stale", refresh_token="refresh", expires_in=60, token_type="Bearer")
+    users = await asyncio.gather(*(User.afrom_token(token, using="fake") for _ in range(3)))
+    assert [user.username for user in users] == ["user0"] * 3
+    assert token.access_token == "access1"
+    assert fake_eternaltwin.refreshes == 1
+
+
+def test_sessions(fake_eternaltwin):
+    client = connections.get_connection("fake")
+    with pytest.raises(ValueError):
+        User.from_session("session", using="fake")
+
+    client.token_store = store = MemoryTokenStore()
+    assert User.from_session("session", using="fake") is None
+
+    token = Token(access_token="access", refresh_token="refresh", expires_in=3600, token_type="Bearer")
+    user = User.from_token(token, using="fake")
+    user.save_session("session", using="fake")
+    assert User.from_session("session", using="fake").token.access_token == "access"
+
+    store.set("session", Token(access_token="stale", refresh_token="refresh", expires_in=60, token_type="Bearer"))
+    assert User.from_session("session", using="fake").token.access_token == "access1"
+    assert store.get("session").access_token == "access1"
+    assert fake_eternaltwin.refreshes == 1
+
+    user.logout()
+    with pytest.raises(ValueError):
+        user.save_session("session", using="fake")
+
+
+async def test_asessions(fake_eternaltwin):
+    client = async_connections.get_connection("fake")
+    with pytest.raises(ValueError):
+        await User.afrom_session("session", using="fake")
+
+    client.token_store = store = MemoryTokenStore()
+    assert await User.afrom_session("session", using="fake") is None
+
+    store.set("session", Token(access_token="stale", refresh_token="refresh", expires_in=60, token_type="Bearer"))
+    assert (await User.afrom_session("session", using="fake")).token.access_token == "access1"
+    assert store.get("session").access_token == "access1"
+    assert (await User.afrom_session("session", using="fake")).token.access_token == "access1"
+    assert fake_eternaltwin.refreshes == 1
+
+
+def test_logout_invalidates_auth_cache(fake_eternaltwin):
+    client = connections.get_connection("fake")
+    client.auth_cache = cache = Cache()
+    token = Token(access_token="access", refresh_token="refresh", expires_in=3600, token_type="Bearer")
+    user = User.from_token(token, using="fake")
+    assert user.using == "fake"
+    User.from_token(token, using="fake")
+    assert cache.hits == 1
+    assert len(cache) == 1
+
+    user.logout()
+    assert user.token is None
+    assert len(cache) == 0
+
+    User(identifier="1", username="1", is_administrator=None, created_at=None, deleted_at=None, token=token).logout()
+
+
+async def test_afrom_token_auth_cache(fake_eternaltwin):
+    client = async_connections.get_connection("fake")
+    client.auth_cache = cache = Cache()
+    token = Token(access_token="access", refresh_token="refresh", expires_in=3600, token_type="Bearer")
+    await User.afrom_token(token, using="fake")
+    await User.afrom_token(token, using="fake")
+    await User.afrom_token(token, using="fake", use_cache=False)
+    assert len(client.transport.requests) == 2
+    assert cache.hits == 1